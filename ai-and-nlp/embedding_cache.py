@@ -0,0 +1,253 @@
+"""Embedding cache for the triage service.
+
+Symptom texts collapse to a small set of cleaned strings ("headache fever",
+"chest pain"), and encoding is the costliest step, so vectors are cached by
+a hash of the cleaned text:
+
+- memory: bounded LRU of row vectors
+- disk (optional): an append-only matrix opened with `np.memmap`
+  plus a key file, so vectors survive restarts and are shared read-only
+  between workers through the page cache
+
+Entries are namespaced by `fingerprint(EMBEDDER_PATH)`, a hash of the model
+files. Replacing the embedder changes the namespace and a different on-disk
+store is used, so stale vectors are never served.
+
+With an `EmbeddingCodec` (embedding_quant.py) entries are kept in its compact
+form (PCA-projected, float16/int8) and decoded on the way out; the codec tag
+is part of the namespace.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def fingerprint(model_path: str) -> str:
+    """Content hash of a saved SentenceTransformer directory (or of a model name)."""
+    digest = hashlib.sha256()
+    if not os.path.isdir(model_path):
+        digest.update(model_path.encode("utf-8"))
+        return digest.hexdigest()[:16]
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, model_path).encode("utf-8"))
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _lock_exclusive(f) -> None:
+    """Block until this process holds the exclusive lock on open file `f`."""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10 s, then raises
+            return
+        except OSError:
+            continue
+
+
+def _unlock(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def text_key(cleaned: str) -> str:
+    return hashlib.sha256(cleaned.encode("utf-8")).hexdigest()[:32]
+
+
+class DiskStore:
+    """Append-only `[n, dim]` matrix (`vectors.bin`) + one key per line (`keys.txt`).
+
+    Several workers may append to the same store: appends hold an exclusive
+    lock on `.lock` (`flock`, or `msvcrt.locking` on Windows) and first pick up rows other processes added, so row numbers in
+    `keys.txt` and `vectors.bin` always line up.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, dtype: str = "float32"):
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.bin")
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self.lock_path = os.path.join(directory, ".lock")
+        self.dim_path = os.path.join(directory, "dim")
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self.index: dict[str, int] = {}
+        self.rows = 0
+        self._keys_offset = 0
+        self._matrix: Optional[np.memmap] = None
+        if os.path.exists(self.dim_path):
+            with open(self.dim_path) as f:
+                self.dim = int(f.read())
+        elif dim is not None:
+            self._set_dim(dim)
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _set_dim(self, dim: int) -> None:
+        self.dim = dim
+        with open(self.dim_path, "w") as f:
+            f.write(str(dim))
+
+    def _refresh(self) -> None:
+        """Index rows appended since the last read (by this or another process)."""
+        if not self.dim or not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            tail = f.read()
+        # Only complete lines; a row is valid once its key line is written.
+        tail = tail[: tail.rfind(b"\n") + 1]
+        self._keys_offset += len(tail)
+        for key in tail.decode("ascii").split():
+            self.index.setdefault(key, self.rows)
+            self.rows += 1
+
+    def _map(self) -> np.ndarray:
+        if self._matrix is None or self._matrix.shape[0] < self.rows:
+            self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self.rows, self.dim))
+        return self._matrix
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.index.get(key)
+        if row is None:
+            return None
+        return np.asarray(self._map()[row])
+
+    def get_many(self, keys: list[str]) -> np.ndarray:
+        return np.asarray(self._map()[[self.index[k] for k in keys]])
+
+    def add(self, keys: list[str], vectors: np.ndarray) -> None:
+        if not keys:
+            return
+        if self.dim is None:
+            self._set_dim(vectors.shape[1])
+        with open(self.lock_path, "a+") as lock:
+            _lock_exclusive(lock)
+            try:
+                self._refresh()
+                new = {k: v for k, v in zip(keys, vectors) if k not in self.index}
+                if not new:
+                    return
+                row_bytes = self.dim * self.dtype.itemsize
+                with open(self.vectors_path, "ab") as f:
+                    # Drop a partial row left by a crash so rows stay aligned.
+                    f.truncate(self.rows * row_bytes)
+                    f.write(np.asarray(list(new.values()), dtype=self.dtype).tobytes())
+                with open(self.keys_path, "a") as f:
+                    f.write("".join(f"{k}\n" for k in new))
+                self._refresh()
+            finally:
+                _unlock(lock)
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        encode: Callable[[list[str]], np.ndarray],
+        namespace: str,
+        maxsize: int = 20000,
+        store_dir: Optional[str] = None,
+        codec=None,
+    ):
+        """`encode` maps cleaned texts to an `[n, dim]` array (e.g. `embedder.encode`)."""
+        self._encode = encode
+        self.codec = codec if codec is not None and not codec.identity else None
+        self.namespace = f"{namespace}-{self.codec.tag}" if self.codec else namespace
+        self.maxsize = maxsize
+        dtype = self.codec.dtype if self.codec else "float32"
+        self.store = DiskStore(os.path.join(store_dir, self.namespace), dtype=dtype) if store_dir else None
+        # Width of the returned vectors, once known (needed for empty batches).
+        self.dim: Optional[int] = self.store.dim if self.store else None
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "size": len(self._memory),
+            "stored": len(self.store) if self.store else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vec = self._memory.get(key)
+        if vec is not None:
+            self._memory.move_to_end(key)
+            return vec
+        if self.store is not None:
+            vec = self.store.get(key)
+            if vec is not None:
+                self._remember(key, vec)
+        return vec
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        # Own copy: a row view would keep its whole batch (or store) array alive.
+        self._memory[key] = vec.copy()
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def encode(self, cleaned: list[str]) -> np.ndarray:
+        """Vectors for `cleaned` in order; only unseen texts are encoded (once each)."""
+        if not cleaned:
+            return np.empty((0, self._width()), dtype=np.float32)
+        keys = [text_key(t) for t in cleaned]
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                if key not in found:
+                    vec = self._lookup(key)
+                    if vec is not None:
+                        found[key] = vec
+            missing = list(dict.fromkeys((k, t) for k, t in zip(keys, cleaned) if k not in found))
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            vectors = np.asarray(self._encode([t for _, t in missing]), dtype=np.float32)
+            if self.codec:
+                vectors = self.codec.encode(vectors)
+            with self._lock:
+                for (key, _), vec in zip(missing, vectors):
+                    found[key] = vec
+                    self._remember(key, vec)
+                if self.store is not None:
+                    self.store.add([k for k, _ in missing], vectors)
+        stacked = np.stack([found[k] for k in keys])
+        self.dim = stacked.shape[1]
+        return self.codec.decode(stacked) if self.codec else stacked
+
+    def _width(self) -> int:
+        if self.dim is None:
+            probe = np.asarray(self._encode([""]), dtype=np.float32)
+            self.dim = (self.codec.encode(probe) if self.codec else probe).shape[1]
+        return self.dim
@@ -0,0 +1,79 @@
+"""Compact embedding storage for the triage classifier.
+
+`EmbeddingCodec` turns float32 `all-MiniLM-L6-v2` vectors (384 dims, 1.5 KiB
+each) into what is kept in caches and on disk:
+
+- optional PCA projection to `n_components` dims, fitted on the training split
+- `float16` (2 bytes/dim) or `int8` (1 byte/dim, symmetric per-dimension
+  scale fitted on the training split; values beyond it are clipped)
+
+`decode` returns float32 for the classifier, which is trained on decoded
+training vectors so it sees the same precision at serving time. The
+`train_triage.py` CLI reports the held-out accuracy against a full-precision
+model on the same split, and stores the codec next to the classifier.
+"""
+
+import hashlib
+from typing import Optional
+
+import numpy as np
+
+DTYPES = ("float32", "float16", "int8")
+
+
+class EmbeddingCodec:
+    def __init__(self, dtype: str = "float32", n_components: Optional[int] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}")
+        self.dtype = dtype
+        self.n_components = n_components
+        self.pca = None
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def identity(self) -> bool:
+        return self.dtype == "float32" and self.pca is None
+
+    def fit(self, X: np.ndarray) -> "EmbeddingCodec":
+        X = np.asarray(X, dtype=np.float32)
+        if self.n_components:
+            from sklearn.decomposition import PCA
+
+            self.pca = PCA(n_components=self.n_components, random_state=42).fit(X)
+            X = self.pca.transform(X).astype(np.float32)
+        if self.dtype == "int8":
+            self.scale = np.maximum(np.abs(X).max(axis=0), 1e-8).astype(np.float32) / 127.0
+        return self
+
+    def encode(self, X: np.ndarray) -> np.ndarray:
+        """float32 `[n, 384]` -> stored form `[n, dim]`."""
+        X = np.asarray(X, dtype=np.float32)
+        if self.pca is not None:
+            X = self.pca.transform(X).astype(np.float32)
+        if self.dtype == "float16":
+            return X.astype(np.float16)
+        if self.dtype == "int8":
+            return np.clip(np.rint(X / self.scale), -127, 127).astype(np.int8)
+        return X
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Stored form -> float32 classifier input."""
+        if self.dtype == "int8":
+            return codes.astype(np.float32) * self.scale
+        return np.asarray(codes, dtype=np.float32)
+
+    @property
+    def tag(self) -> str:
+        """Identifies the stored format (and fitted parameters) for cache namespacing."""
+        if self.identity:
+            return "f32"
+        digest = hashlib.sha256(self.dtype.encode())
+        if self.pca is not None:
+            digest.update(self.pca.components_.tobytes())
+            digest.update(self.pca.mean_.tobytes())
+        if self.scale is not None:
+            digest.update(self.scale.tobytes())
+        return f"{self.dtype}-{self.n_components or 'full'}-{digest.hexdigest()[:8]}"
+
+    def bytes_per_vector(self, input_dim: int = 384) -> int:
+        return (self.n_components or input_dim) * np.dtype(self.dtype).itemsize
@@ -1,19 +1,24 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sentence_transformers import SentenceTransformer
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import pandas as pd
-import numpy as np
-import spacy
+import asyncio
 import joblib
+import json
 import logging
 import os
+import time
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from micro_batcher import MicroBatcher, QueueFullError
+from triage_preprocess import Preprocessor, load_nlp
+from embedding_cache import EmbeddingCache, fingerprint
+from embedding_quant import EmbeddingCodec
 
 
 # CONFIGURATION
@@ -30,12 +35,48 @@ app.add_middleware(
 # Globals for model and embedder
 clf = None
 embedder = None
+embedding_cache = None
+preprocessor = None
+
+# Readiness: models load in a background thread after the server starts, so
+# liveness answers at once and /health/ready flips to true when loaded.
+model_state = {"ready": False, "stage": "starting", "error": None, "load_seconds": None}
+_load_task = None
 
 LOG_FILE = "triage_logs.txt"
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "triage2.csv")
-MODEL_PATH = "severity_classifier.joblib"
-EMBEDDER_PATH = "embedder_model"
+# Point these at pre-built artefacts to skip training; with
+# TRIAGE_ALLOW_TRAINING=false a missing artefact fails readiness instead.
+MODEL_PATH = os.getenv("TRIAGE_MODEL_PATH", "severity_classifier.joblib")
+EMBEDDER_PATH = os.getenv("TRIAGE_EMBEDDER_PATH", "embedder_model")
+# Or serve the newest version written by train_triage.py (`<dir>/LATEST`).
+ARTEFACTS_DIR = os.getenv("TRIAGE_ARTEFACTS_DIR")
+if ARTEFACTS_DIR and os.path.exists(os.path.join(ARTEFACTS_DIR, "LATEST")):
+    with open(os.path.join(ARTEFACTS_DIR, "LATEST")) as _f:
+        _version_dir = os.path.join(ARTEFACTS_DIR, _f.read().strip())
+    with open(os.path.join(_version_dir, "manifest.json")) as _f:
+        EMBEDDER_PATH = json.load(_f)["embedder"]["path"]
+    MODEL_PATH = os.path.join(_version_dir, "classifier.joblib")
+ALLOW_TRAINING = os.getenv("TRIAGE_ALLOW_TRAINING", "true").lower() in ("1", "true", "yes")
+# Encoded once after loading to populate caches and warm up code paths.
+WARMUP_TEXTS = [
+    "I have a mild headache",
+    "Severe chest pain spreading to my left arm",
+    "Fever and a sore throat since yesterday",
+]
+MAX_BATCH_TEXTS = 5000  # per /predict/batch request
+ENCODE_BATCH_SIZE = 64  # SentenceTransformer mini-batch size
+
+# Embedding cache keyed by cleaned text (see embedding_cache.py); set
+# TRIAGE_EMBEDDING_STORE to a directory to also keep vectors on disk (memmap).
+EMBEDDING_CACHE_SIZE = int(os.getenv("TRIAGE_EMBEDDING_CACHE_SIZE", "20000"))
+EMBEDDING_STORE_DIR = os.getenv("TRIAGE_EMBEDDING_STORE") or None
+
+# Micro-batching of concurrent /predict calls (see micro_batcher.py)
+PREDICT_MAX_BATCH = int(os.getenv("TRIAGE_MAX_BATCH", "32"))
+PREDICT_MAX_WAIT_MS = float(os.getenv("TRIAGE_MAX_WAIT_MS", "10"))
+PREDICT_MAX_QUEUE = int(os.getenv("TRIAGE_MAX_QUEUE", "1024"))
 
 # Logging setup
 logging.basicConfig(
@@ -49,17 +90,53 @@ logging.basicConfig(
 class TriageInput(BaseModel):
     text: str
 
+
+class TriageBatchInput(BaseModel):
+    texts: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_TEXTS)
+
 # TEXT PREPROCESSING
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# Trimmed spaCy pipeline + memoised, batched lemmatisation (triage_preprocess.py).
+# Loaded by `load_models` rather than at import, since it may download the model.
+def load_preprocessor() -> Preprocessor:
+    return Preprocessor(load_nlp(), n_process=int(os.getenv("TRIAGE_SPACY_N_PROCESS", "1")))
+
 
 def preprocess(text: str) -> str:
-    doc = nlp(text.lower())
-    return " ".join([t.lemma_ for t in doc if t.is_alpha and not t.is_stop])
+    return preprocessor(text)
+
+
+def preprocess_batch(texts: list[str]) -> list[str]:
+    """`preprocess` for many texts in one streamed `nlp.pipe` pass."""
+    return preprocessor.batch(texts)
+
+
+def classify(cleaned: list[str]) -> list[tuple[str, float]]:
+    """Severity and confidence for preprocessed texts.
+
+    One batched `encode` and one `predict_proba` for the whole list; the label
+    is the argmax of the probabilities (what `clf.predict` would return).
+    """
+    vectors = embedding_cache.encode(cleaned)
+    probs = clf.predict_proba(vectors)
+    best = probs.argmax(axis=1)
+    return [(clf.classes_[i], float(p[i])) for i, p in zip(best, probs)]
+
+
+def load_codec() -> EmbeddingCodec:
+    """Compact embedding mode saved by train_triage.py next to the classifier (float32 otherwise)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(MODEL_PATH)), "codec.joblib")
+    return joblib.load(path) if os.path.exists(path) else EmbeddingCodec()
+
+
+def make_embedding_cache(embedder_local, codec: EmbeddingCodec = None) -> EmbeddingCache:
+    """Cache for vectors of `embedder_local`, namespaced by the saved model at EMBEDDER_PATH."""
+    return EmbeddingCache(
+        lambda texts: embedder_local.encode(texts, batch_size=ENCODE_BATCH_SIZE),
+        fingerprint(EMBEDDER_PATH),
+        maxsize=EMBEDDING_CACHE_SIZE,
+        store_dir=EMBEDDING_STORE_DIR,
+        codec=codec,
+    )
 
 
 # LOAD OR TRAIN MODEL
@@ -67,18 +144,26 @@ def load_or_train_model():
     if os.path.exists(MODEL_PATH) and os.path.exists(EMBEDDER_PATH):
         clf_local = joblib.load(MODEL_PATH)
         embedder_local = SentenceTransformer(EMBEDDER_PATH)
+        cache_local = make_embedding_cache(embedder_local, load_codec())
         print("✅ Model and embedder loaded.")
+    elif not ALLOW_TRAINING:
+        raise RuntimeError(f"Missing artefacts {MODEL_PATH} / {EMBEDDER_PATH} and TRIAGE_ALLOW_TRAINING is off")
     else:
         print(" Training model for the first time...")
         df = pd.read_csv(DATA_PATH)
         df["text"] = df["text"].astype(str).fillna("")
-        df["cleaned"] = df["text"].apply(preprocess)
+        df["cleaned"] = preprocess_batch(df["text"].tolist())
 
         X = df["cleaned"].tolist()
         y = df["severity"].tolist()
 
         embedder_local = SentenceTransformer("all-MiniLM-L6-v2")
-        X_embeddings = embedder_local.encode(X, show_progress_bar=True)
+        # Save first so the cache namespace matches what serving loads; the
+        # training vectors are then reused by /predict (and across restarts
+        # with an on-disk store). Duplicate cleaned texts are encoded once.
+        embedder_local.save(EMBEDDER_PATH)
+        cache_local = make_embedding_cache(embedder_local)
+        X_embeddings = cache_local.encode(X)
 
         X_train, X_test, y_train, y_test = train_test_split(
             X_embeddings, y, test_size=0.2, random_state=42, stratify=y
@@ -91,17 +176,63 @@ def load_or_train_model():
         print("\n🔍 Classification Report:\n", classification_report(y_test, y_pred))
 
         joblib.dump(clf_local, MODEL_PATH)
-        embedder_local.save(EMBEDDER_PATH)
         print("✅ Model and embedder saved.")
 
-    return clf_local, embedder_local
+    return clf_local, embedder_local, cache_local
+
+
+def _classify_texts(texts: list[str]) -> list[tuple[str, float]]:
+    return classify(preprocess_batch(texts))
+
+
+batcher = MicroBatcher(
+    _classify_texts,
+    max_batch_size=PREDICT_MAX_BATCH,
+    max_wait_ms=PREDICT_MAX_WAIT_MS,
+    max_queue=PREDICT_MAX_QUEUE,
+)
+
+
+def load_models() -> None:
+    """Load spaCy, the classifier and the embedder, then warm up (blocking)."""
+    global clf, embedder, embedding_cache, preprocessor
+    started = time.perf_counter()
+    try:
+        model_state["stage"] = "loading spacy"
+        preprocessor = load_preprocessor()
+        model_state["stage"] = "loading model"
+        clf, embedder, embedding_cache = load_or_train_model()
+        model_state["stage"] = "warming up"
+        _classify_texts(WARMUP_TEXTS)
+    except Exception as e:
+        model_state.update(stage="failed", error=str(e))
+        logging.error(f"Model loading failed: {e}")
+        return
+    model_state.update(ready=True, stage="ready", load_seconds=round(time.perf_counter() - started, 2))
+    logging.info(f"Models ready in {model_state['load_seconds']}s")
 
 
 # STARTUP EVENT
 @app.on_event("startup")
-def startup_event():
-    global clf, embedder
-    clf, embedder = load_or_train_model()
+async def startup_event():
+    # Load in the background so the server accepts connections (and liveness
+    # checks pass) immediately; /predict answers 503 until ready.
+    global _load_task
+    _load_task = asyncio.create_task(asyncio.to_thread(load_models))
+    batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+
+
+def _not_ready() -> JSONResponse:
+    return JSONResponse(
+        content={"error": "Model is not ready", "stage": model_state["stage"]},
+        status_code=503,
+        headers={"Retry-After": "5"},
+    )
 
 
 # ROUTES
@@ -109,15 +240,28 @@ def startup_event():
 def home():
     return {"message": "🩺 Triage Severity Classifier is running", "version": "1.0"}
 
+
+@app.get("/health/live")
+def live():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def ready():
+    """200 once the model is loaded and warmed up, 503 before (or if loading failed)."""
+    body = dict(model_state)
+    if embedding_cache is not None:
+        body["embedding_cache"] = embedding_cache.stats()
+    return JSONResponse(content=body, status_code=200 if model_state["ready"] else 503)
+
 @app.post("/predict")
 async def predict(data: TriageInput):
+    if not model_state["ready"]:
+        return _not_ready()
     try:
         user_input = data.text.strip()
-        cleaned = preprocess(user_input)
-        user_vec = embedder.encode([cleaned])
-        pred = clf.predict(user_vec)[0]
-        probs = clf.predict_proba(user_vec)[0]
-        conf = float(np.max(probs))
+        # Grouped with concurrent requests and run in a worker thread.
+        pred, conf = await batcher.submit(user_input)
 
         # Log to file
         logging.info(f"Input: {user_input} | Prediction: {pred} | Confidence: {conf:.2f}")
@@ -130,10 +274,38 @@ async def predict(data: TriageInput):
 
         return JSONResponse(content=result)
 
+    except QueueFullError:
+        logging.warning("Rejected input: prediction queue full")
+        return JSONResponse(content={"error": "Server busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
     except Exception as e:
         logging.error(f"Error processing input: {e}")
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+
+@app.post("/predict/batch")
+async def predict_batch(data: TriageBatchInput):
+    """Classify many texts at once (e.g. nightly re-triage).
+
+    Preprocesses with `nlp.pipe` and embeds/classifies in single batched
+    calls; results come back in input order, same shape as `/predict`.
+    """
+    if not model_state["ready"]:
+        return _not_ready()
+    try:
+        inputs = [t.strip() for t in data.texts]
+        predictions = await asyncio.to_thread(_classify_texts, inputs)
+        logging.info(f"Batch: {len(inputs)} inputs")
+
+        results = [
+            {"input": text, "predicted_severity": pred, "confidence": round(conf, 2)}
+            for text, (pred, conf) in zip(inputs, predictions)
+        ]
+        return JSONResponse(content={"results": results})
+
+    except Exception as e:
+        logging.error(f"Error processing batch: {e}")
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
 # RUN APP
 if __name__ == "__main__":
     # Run Uvicorn server directly
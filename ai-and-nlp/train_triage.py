@@ -0,0 +1,216 @@
+"""Offline training for the triage severity classifier.
+
+    python train_triage.py --data triage2.csv --out artefacts
+
+- Streams the CSV in chunks (`--chunksize`) and preprocesses each chunk with
+  the trimmed spaCy pipeline.
+- Embeds only rows whose cleaned text is not yet in the persisted embedding
+  store (`--store`, the same format the API uses through
+  TRIAGE_EMBEDDING_STORE). The embedder is not even loaded when nothing is
+  new, so retraining after adding a few hundred rows takes seconds.
+- Fits the `LogisticRegression` on the combined matrix (same split and
+  hyper-parameters as `load_or_train_model`) and reports held-out metrics.
+- Optionally serves compact embeddings (`--embedding-dtype float16|int8`,
+  `--pca-components N`, see embedding_quant.py): the codec is fitted on the
+  training split, the classifier is trained on decoded vectors, and
+  `metrics.json` reports the accuracy delta against a full-precision model
+  on the same held-out split.
+- Writes a versioned artefact directory `<out>/<version>/` containing
+  `classifier.joblib`, `codec.joblib`, `manifest.json` (embedder reference,
+  label map, data summary, embedding mode) and `metrics.json`. It is built
+  in a temp dir, renamed into place, and then `<out>/LATEST` is switched with
+  an atomic replace, so readers never see a partial version.
+
+Serve a version with TRIAGE_ARTEFACTS_DIR=<out> (or TRIAGE_MODEL_PATH /
+TRIAGE_EMBEDDER_PATH) and TRIAGE_ALLOW_TRAINING=false.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+from sklearn.model_selection import train_test_split
+
+from embedding_cache import EmbeddingCache, fingerprint
+from embedding_quant import DTYPES, EmbeddingCodec
+from triage_preprocess import Preprocessor, load_nlp
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_MODEL = "all-MiniLM-L6-v2"
+
+
+class LazyEncoder:
+    """Loads the SentenceTransformer on first use (only if some rows are new)."""
+
+    def __init__(self, path: str, batch_size: int):
+        self.path = path
+        self.batch_size = batch_size
+        self.model = None
+        self.encoded = 0
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        if self.model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self.model = SentenceTransformer(self.path)
+        self.encoded += len(texts)
+        return self.model.encode(texts, batch_size=self.batch_size, show_progress_bar=len(texts) > 1000)
+
+
+def ensure_embedder(path: str) -> None:
+    """Save the base model to `path` once, so its fingerprint is stable."""
+    if not os.path.isdir(path):
+        from sentence_transformers import SentenceTransformer
+
+        SentenceTransformer(BASE_MODEL).save(path)
+
+
+def embed_corpus(args) -> tuple[np.ndarray, list[str], dict]:
+    """Stream the CSV and return `(X, y, summary)` using the embedding store."""
+    preprocessor = Preprocessor(load_nlp(), n_process=args.n_process, cache_size=0)
+    encoder = LazyEncoder(args.embedder, args.batch_size)
+    cache = EmbeddingCache(encoder, fingerprint(args.embedder), maxsize=0, store_dir=args.store)
+    data_hash = hashlib.sha256()
+    blocks, labels = [], []
+    for chunk in pd.read_csv(args.data, chunksize=args.chunksize):
+        chunk = chunk.dropna(subset=["severity"])
+        texts = chunk["text"].astype(str).fillna("").tolist()
+        data_hash.update(pd.util.hash_pandas_object(chunk[["text", "severity"]], index=False).values.tobytes())
+        blocks.append(cache.encode(preprocessor.batch(texts)))
+        labels.extend(chunk["severity"].astype(str).tolist())
+    summary = {
+        "rows": len(labels),
+        "data_sha256": data_hash.hexdigest(),
+        "newly_embedded": encoder.encoded,
+        "reused_embeddings": cache.hits,
+    }
+    return np.vstack(blocks), labels, summary
+
+
+def _evaluate(X_train, X_test, y_train, y_test) -> tuple[LogisticRegression, dict]:
+    clf = LogisticRegression(max_iter=2000, class_weight="balanced", C=2.0)
+    clf.fit(X_train, y_train)
+    y_pred = clf.predict(X_test)
+    return clf, {
+        "accuracy": round(float(accuracy_score(y_test, y_pred)), 4),
+        "macro_f1": round(float(f1_score(y_test, y_pred, average="macro")), 4),
+        "train_rows": len(y_train),
+        "test_rows": len(y_test),
+        "report": classification_report(y_test, y_pred, output_dict=True),
+    }
+
+
+def fit(X: np.ndarray, y: list[str], codec: EmbeddingCodec, args) -> tuple[LogisticRegression, dict]:
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=42, stratify=y
+    )
+    clf, metrics = _evaluate(X_train, X_test, y_train, y_test)
+    if codec.identity:
+        return clf, metrics
+
+    full = metrics
+    codec.fit(X_train)
+    clf, metrics = _evaluate(
+        codec.decode(codec.encode(X_train)), codec.decode(codec.encode(X_test)), y_train, y_test
+    )
+    metrics["full_precision"] = {k: full[k] for k in ("accuracy", "macro_f1")}
+    metrics["accuracy_delta"] = round(metrics["accuracy"] - full["accuracy"], 4)
+    metrics["macro_f1_delta"] = round(metrics["macro_f1"] - full["macro_f1"], 4)
+    return clf, metrics
+
+
+def write_artefacts(out_dir: str, clf, codec: EmbeddingCodec, manifest: dict, metrics: dict) -> str:
+    """Write a new version directory and point `LATEST` at it, atomically.
+
+    Versions are UTC timestamps to the microsecond; if the name is taken
+    anyway (concurrent runs), a `-N` suffix is added.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    tmp = tempfile.mkdtemp(prefix=f".{stamp}-", dir=out_dir)
+    try:
+        joblib.dump(clf, os.path.join(tmp, "classifier.joblib"))
+        joblib.dump(codec, os.path.join(tmp, "codec.joblib"))
+        with open(os.path.join(tmp, "metrics.json"), "w") as f:
+            json.dump(metrics, f, indent=2)
+        for attempt in itertools.count():
+            version = stamp if attempt == 0 else f"{stamp}-{attempt}"
+            final = os.path.join(out_dir, version)
+            if os.path.exists(final):
+                continue
+            with open(os.path.join(tmp, "manifest.json"), "w") as f:
+                json.dump({**manifest, "version": version}, f, indent=2)
+            try:
+                os.rename(tmp, final)
+                break
+            except OSError:
+                if not os.path.exists(final):
+                    raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    pointer = os.path.join(out_dir, "LATEST")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    return final
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, "triage2.csv"))
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "artefacts"), help="Versioned artefact root")
+    parser.add_argument("--embedder", default=os.path.join(BASE_DIR, "embedder_model"), help="Saved SentenceTransformer dir")
+    parser.add_argument("--store", default=os.path.join(BASE_DIR, "embedding_store"), help="Persisted embedding store")
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--embedding-dtype", choices=DTYPES, default="float32", help="Served/cached embedding precision")
+    parser.add_argument("--pca-components", type=int, default=None, help="Project embeddings to N dims (fitted on the training split)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    ensure_embedder(args.embedder)
+    X, y, summary = embed_corpus(args)
+    embedded_at = time.perf_counter()
+    codec = EmbeddingCodec(args.embedding_dtype, args.pca_components)
+    clf, metrics = fit(X, y, codec, args)
+
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "embedder": {"path": os.path.abspath(args.embedder), "fingerprint": fingerprint(args.embedder), "dim": int(X.shape[1])},
+        "embedding": {
+            "dtype": codec.dtype,
+            "pca_components": codec.n_components,
+            "bytes_per_vector": codec.bytes_per_vector(int(X.shape[1])),
+        },
+        "labels": {str(label): i for i, label in enumerate(clf.classes_)},
+        "data": {"path": os.path.abspath(args.data), **summary},
+    }
+    metrics["timings_s"] = {
+        "embed": round(embedded_at - started, 2),
+        "fit": round(time.perf_counter() - embedded_at, 2),
+    }
+    path = write_artefacts(args.out, clf, codec, manifest, metrics)
+    delta = f" ({metrics['accuracy_delta']:+.3f} vs float32)" if "accuracy_delta" in metrics else ""
+    print(
+        f"{summary['rows']} rows ({summary['newly_embedded']} newly embedded, {summary['reused_embeddings']} reused) | "
+        f"{codec.dtype}/{codec.n_components or X.shape[1]}d: accuracy {metrics['accuracy']:.3f}{delta}, "
+        f"macro F1 {metrics['macro_f1']:.3f} | {time.perf_counter() - started:.1f}s -> {path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Text preprocessing for the triage classifier.
+
+`preprocess()` only needs tokens, lemmas, `is_alpha` and `is_stop`, so the
+spaCy pipeline is loaded without the dependency parser, NER and sentence
+segmenter. It keeps tok2vec, tagger, attribute_ruler and lemmatizer, because
+the rule-based English lemmatizer needs POS tags. That is roughly half the
+work per doc and a smaller resident model.
+
+`Preprocessor` streams batches through `nlp.pipe` (optionally with several
+processes for large offline jobs) and memoises results in a bounded LRU,
+since symptom texts repeat a lot.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+SPACY_MODEL = "en_core_web_sm"
+# Components `preprocess` does not use; the lemmatizer still gets its POS tags.
+UNUSED_COMPONENTS = ["parser", "ner", "senter"]
+
+
+def load_nlp(model: str = SPACY_MODEL, trimmed: bool = True):
+    """Load the spaCy pipeline, downloading the model on first use."""
+    import spacy
+
+    exclude = UNUSED_COMPONENTS if trimmed else []
+    try:
+        return spacy.load(model, exclude=exclude)
+    except OSError:
+        from spacy.cli import download
+
+        download(model)
+        return spacy.load(model, exclude=exclude)
+
+
+def lemmas(doc) -> str:
+    return " ".join([t.lemma_ for t in doc if t.is_alpha and not t.is_stop])
+
+
+class Preprocessor:
+    def __init__(self, nlp, n_process: int = 1, batch_size: int = 256, cache_size: int = 65536):
+        self.nlp = nlp
+        self.n_process = max(1, n_process)
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Called from worker threads; spaCy holds the GIL anyway, so one lock
+        # around a whole batch costs nothing and keeps the LRU consistent.
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str) -> str:
+        return self.batch([text])[0]
+
+    def batch(self, texts: Iterable[str], n_process: Optional[int] = None) -> list[str]:
+        """Cleaned text for each input, in order; only unseen texts hit spaCy."""
+        with self._lock:
+            return self._batch([t.lower() for t in texts], n_process)
+
+    def _batch(self, keys: list[str], n_process: Optional[int]) -> list[str]:
+        todo = list(dict.fromkeys(k for k in keys if k not in self._cache))
+        # One miss per text spaCy has to process; every other input, cached
+        # or a repeat within this batch, is served without it and is a hit.
+        self.misses += len(todo)
+        self.hits += len(keys) - len(todo)
+        fresh = {}
+        if todo:
+            # Multiprocessing only pays off on large batches.
+            procs = (n_process or self.n_process) if len(todo) >= 4 * self.batch_size else 1
+            docs = self.nlp.pipe(todo, batch_size=self.batch_size, n_process=procs)
+            fresh = {key: lemmas(doc) for key, doc in zip(todo, docs)}
+        out = [fresh[key] if key in fresh else self._cache[key] for key in keys]
+        for key in keys:
+            if key not in fresh:
+                self._cache.move_to_end(key)
+        for key, cleaned in fresh.items():
+            self._remember(key, cleaned)
+        return out
+
+    def _remember(self, key: str, cleaned: str) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = cleaned
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
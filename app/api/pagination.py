@@ -0,0 +1,40 @@
+"""Keyset (cursor) pagination helpers shared by list routes.
+
+A cursor is an opaque, URL-safe token encoding the sort key of the last row
+on a page (e.g. `(starts_at, id)` for appointments, `id` for FAQs). Passing it
+back as `after=` lets the next query seek straight to that key through an
+index instead of skipping `OFFSET` rows, so deep pages cost the same as the
+first one.
+
+Routes return the token for the next page in the `X-Next-Cursor` header
+whenever a page comes back full.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*key: Any) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, types: tuple[type, ...]) -> tuple:
+    """Decode `token` into a tuple matching `types`; 400 if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError("wrong arity")
+        if not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(key, types)):
+            raise ValueError("wrong types")
+        return tuple(key)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
@@ -1,16 +1,64 @@
+import json
+import time
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
 from fastapi import APIRouter, HTTPException, Query, Response
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
-from app.db_adapter import get_db
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, field_validator
+from typing import Any, Iterable, Optional
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.availability import (
+    availability,
+    clinic_windows,
+    merge_intervals,
+    parse_clock,
+    parse_weekdays,
+    to_epoch,
+    to_iso,
+    window_bounds,
+    windows_from,
+)
+from app.config import get_settings
+from app.db_adapter import IntegrityError, get_db
+from app.schedule_index import schedule_index
 
 router = APIRouter(prefix="/appointments")
 
+# Bounds for GET /slots so one request cannot ask for unbounded work.
+MAX_SLOT_CLINICIANS = 500
+MAX_SLOT_DAYS = 62
+# Slots returned per clinician (earliest first) unless `limit` asks otherwise;
+# keeps a many-clinician, month-long request well under 100 ms end to end.
+DEFAULT_SLOTS_PER_CLINICIAN = 50
+MAX_SLOTS_PER_CLINICIAN = 2000
+# Opening-day windows whose bookings GET /slots loads per query.
+_SLOT_WINDOWS_PER_QUERY = 5
+# POST /bulk: rows per request, and clinicians per `IN (...)` lookup.
+MAX_BULK_APPOINTMENTS = 5000
+_IN_LIST_CHUNK = 500
+
+
+def _canonical_time(value: Optional[str]) -> Optional[str]:
+    """Validate an ISO8601 timestamp and normalise it to UTC `...Z` (seconds).
+
+    Offsets are applied (`09:00+02:00` -> `07:00Z`); naive times are UTC.
+    """
+    if value is None:
+        return None
+    try:
+        return to_iso(to_epoch(value))
+    except ValueError:
+        raise ValueError("must be an ISO8601 timestamp, e.g. 2025-10-13T09:00:00Z")
+
 
 class AppointmentCreate(BaseModel):
     """Request model to create a new appointment.
 
-    Times are ISO8601 strings (e.g., 2025-10-13T09:00:00Z). We store them as
-    TEXT in SQLite; ISO8601 compares correctly lexicographically.
+    Times are ISO8601 strings in any offset (e.g., 2025-10-13T09:00:00Z or
+    2025-10-13T11:00:00+02:00), normalised to UTC `...Z`. They are stored as
+    that string plus integer epochs (`starts_epoch`/`ends_epoch`), which the
+    conflict checks and indexes use.
     """
     patient_name: str = Field(min_length=1, max_length=100)
     clinician: str = Field(min_length=1, max_length=100)
@@ -25,6 +73,16 @@ class AppointmentCreate(BaseModel):
         }
     })
 
+    _normalise_times = field_validator("starts_at", "ends_at")(_canonical_time)
+
+    @property
+    def starts_epoch(self) -> int:
+        return to_epoch(self.starts_at)
+
+    @property
+    def ends_epoch(self) -> int:
+        return to_epoch(self.ends_at)
+
 
 class AppointmentUpdate(BaseModel):
     """Partial update model. Any field can be provided.
@@ -44,6 +102,16 @@ class AppointmentUpdate(BaseModel):
         }
     })
 
+    _normalise_times = field_validator("starts_at", "ends_at")(_canonical_time)
+
+    @property
+    def starts_epoch(self) -> Optional[int]:
+        return to_epoch(self.starts_at) if self.starts_at else None
+
+    @property
+    def ends_epoch(self) -> Optional[int]:
+        return to_epoch(self.ends_at) if self.ends_at else None
+
 
 class Appointment(BaseModel):
     id: int
@@ -63,10 +131,11 @@ class Appointment(BaseModel):
 
 
 class Slot(BaseModel):
+    clinician: Optional[str] = None
     starts_at: str
     ends_at: str
     model_config = ConfigDict(json_schema_extra={
-        "example": {"starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"}
+        "example": {"clinician": "DR.B", "starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"}
     })
 
 
@@ -75,14 +144,151 @@ class Slots(BaseModel):
     model_config = ConfigDict(json_schema_extra={
         "example": {
             "slots": [
-                {"starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"},
-                {"starts_at": "2025-10-13T10:00:00Z", "ends_at": "2025-10-13T10:30:00Z"}
+                {"clinician": "DR.B", "starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"},
+                {"clinician": "DR.B", "starts_at": "2025-10-13T10:00:00Z", "ends_at": "2025-10-13T10:30:00Z"}
             ]
         }
     })
 
 
-# _row_to_dict helper removed - DB adapter returns dicts directly
+class BulkAppointments(BaseModel):
+    # Rows shaped like `AppointmentCreate`, validated one by one in the route
+    # so a malformed row is reported as `invalid` instead of failing the batch.
+    appointments: list[dict[str, Any]] = Field(
+        min_length=1,
+        max_length=MAX_BULK_APPOINTMENTS,
+        description="AppointmentCreate objects; each row is validated on its own",
+    )
+
+
+class BulkResult(BaseModel):
+    index: int = Field(description="Position in the request")
+    status: str = Field(description="created | conflict | invalid")
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    created: int
+    rejected: int
+    results: list[BulkResult]
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "created": 1,
+            "rejected": 1,
+            "results": [
+                {"index": 0, "status": "created", "id": 41},
+                {"index": 1, "status": "conflict", "detail": "Overlaps row 0 of this request"}
+            ]
+        }
+    })
+
+
+# Overlap rule for one clinician: NOT (ends <= start OR starts >= end),
+# written as the equivalent range form `ends > start AND starts < end` on the
+# integer epoch columns (`idx_appointments_clinician_schedule`).
+_CONFLICT_EXISTS = (
+    "EXISTS (SELECT 1 FROM appointments AS other\n"
+    "WHERE other.clinician = ? AND other.ends_epoch > ? AND other.starts_epoch < ?{extra})"
+)
+
+_COLUMNS = "patient_name, clinician, starts_at, ends_at, starts_epoch, ends_epoch"
+
+
+def _insert_if_free_sql(dialect: str) -> str:
+    """INSERT that only writes the row when the slot is free (conflict check and
+    write in one statement); params: the 6 columns, then clinician/start/end epochs."""
+    source = "SELECT ?, ?, ?, ?, ?, ? FROM DUAL" if dialect == "mysql" else "SELECT ?, ?, ?, ?, ?, ?"
+    return (
+        f"INSERT INTO appointments ({_COLUMNS})\n"
+        f"{source} WHERE NOT {_CONFLICT_EXISTS.format(extra='')}"
+    )
+
+
+# SQLite: merge partial fields (COALESCE with the stored values), re-check
+# conflicts for the merged interval and write, all in one statement.
+_UPDATE_IF_FREE_SQLITE = (
+    "UPDATE appointments\n"
+    "SET patient_name = COALESCE(?, patient_name), clinician = COALESCE(?, clinician),\n"
+    "    starts_at = COALESCE(?, starts_at), ends_at = COALESCE(?, ends_at),\n"
+    "    starts_epoch = COALESCE(?, starts_epoch), ends_epoch = COALESCE(?, ends_epoch)\n"
+    "WHERE id = ? AND NOT EXISTS (SELECT 1 FROM appointments AS other\n"
+    "    WHERE other.clinician = COALESCE(?, appointments.clinician) AND other.id <> appointments.id\n"
+    "    AND other.ends_epoch > COALESCE(?, appointments.starts_epoch)\n"
+    "    AND other.starts_epoch < COALESCE(?, appointments.ends_epoch))\n"
+    "RETURNING id, patient_name, clinician, starts_at, ends_at, starts_epoch, ends_epoch"
+)
+
+_INVALID_INTERVAL = "starts_at must be before ends_at"
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    """One line per field error, e.g. `starts_at: Value error, must be ...`."""
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+    )
+
+
+async def _index_conflict(db, clinician: str, span: tuple[int, int], exclude_id: Optional[int] = None) -> bool:
+    """True when the schedule index finds a conflict and the database confirms it.
+
+    The index answers in O(log n) without a write transaction; the conflicting
+    row is re-read by primary key so entries made stale by other workers are
+    refreshed (or dropped) instead of producing a false 409.
+    """
+    if span[0] >= span[1]:
+        return False  # invalid: the database decides (400)
+    other = schedule_index.conflict(clinician, span[0], span[1], exclude_id)
+    while other is not None:
+        indexed = schedule_index.get(other)
+        row = await db.fetchone("SELECT clinician, starts_epoch, ends_epoch FROM appointments WHERE id = ?", (other,))
+        if row:
+            schedule_index.add(other, *row)
+            if schedule_index.get(other) == indexed:
+                schedule_index.hits += 1
+                return True
+        else:
+            schedule_index.remove(other)
+        schedule_index.stale += 1
+        other = schedule_index.conflict(clinician, span[0], span[1], exclude_id)
+    return False
+
+
+def _merged_span(appt_id: int, req: "AppointmentUpdate") -> tuple[Optional[str], Optional[tuple[int, int]]]:
+    """Clinician and interval an update would produce, from the indexed booking."""
+    entry = schedule_index.get(appt_id)
+    if entry is None:
+        return None, None
+    clinician, start, end = entry
+    start = req.starts_epoch or start
+    end = req.ends_epoch or end
+    if start >= end:
+        return None, None
+    return req.clinician or clinician, (start, end)
+
+
+async def _index_update_conflict(db, appt_id: int, req: "AppointmentUpdate") -> bool:
+    """`_index_conflict` for an update; the booking itself is re-read first
+    when the index suspects a conflict, since unchanged fields come from it."""
+    clinician, span = _merged_span(appt_id, req)
+    if clinician is None or schedule_index.conflict(clinician, span[0], span[1], appt_id) is None:
+        return False
+    row = await db.fetchone("SELECT clinician, starts_epoch, ends_epoch FROM appointments WHERE id = ?", (appt_id,))
+    if not row:
+        schedule_index.remove(appt_id)
+        return False  # the write path reports 404
+    schedule_index.add(appt_id, *row)
+    clinician, span = _merged_span(appt_id, req)
+    return clinician is not None and await _index_conflict(db, clinician, span, exclude_id=appt_id)
+
+
+def _query_epoch(name: str, value: str, detail: Optional[str] = None) -> int:
+    """Epoch of an ISO8601 query value; 400 if it does not parse."""
+    try:
+        return to_epoch(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=detail or f"{name} must be an ISO8601 timestamp")
+
 
 def _row_to_dict(row: tuple) -> dict:
     """Convert a DB tuple `(id, patient_name, clinician, starts_at, ends_at)` to dict."""
@@ -103,10 +309,14 @@ def _row_to_dict(row: tuple) -> dict:
             "description": "List of appointments",
             "headers": {
                 "X-Total-Count": {
-                    "description": "Total appointments matching filters",
+                    "description": "Total appointments matching filters (omitted when include_total=false)",
                     "schema": {"type": "integer"},
                     "example": 42,
-                }
+                },
+                NEXT_CURSOR_HEADER: {
+                    "description": "Cursor for the next page (pass as `after`); only set when the page is full",
+                    "schema": {"type": "string"},
+                },
             },
             "content": {
                 "application/json": {
@@ -129,43 +339,66 @@ async def list_appointments(
     start_from: Optional[str] = Query(None, description="Filter appointments starting at or after ISO8601"),
     end_to: Optional[str] = Query(None, description="Filter appointments ending at or before ISO8601"),
     limit: int = Query(20, ge=1, le=100, description="Max items to return"),
-    offset: int = Query(0, ge=0, description="Items to skip"),
+    offset: int = Query(0, ge=0, description="Items to skip (ignored when `after` is set)"),
+    after: Optional[str] = Query(None, description="Cursor from `X-Next-Cursor`; seeks past that (starts_at, id)"),
+    include_total: bool = Query(True, description="Set false to skip the COUNT query behind X-Total-Count"),
     response: Response = None,
 ):
     """List appointments with filters and pagination.
 
     - Filters: `clinician`, `starts_at >= start_from`, `ends_at <= end_to`.
-    - Sets `X-Total-Count` header for UI pagination.
-    - Ordered by `starts_at`.
+    - Ordered by `(starts_at, id)`; times compare as UTC epochs, so filters
+      may use any offset.
+    - Pagination: `limit`/`offset`, or keyset mode with `after`, which seeks
+      on `(starts_epoch, id)` through `idx_appointments_clinician_schedule`
+      (or `idx_appointments_schedule` without a clinician filter). Full pages
+      set `X-Next-Cursor`.
+    - Sets `X-Total-Count` header for UI pagination unless `include_total=false`.
     """
+    conds: list[str] = []
+    filter_params: list = []
+    if clinician:
+        conds.append("clinician = ?")
+        filter_params.append(clinician)
+    if start_from:
+        conds.append("starts_epoch >= ?")
+        filter_params.append(_query_epoch("start_from", start_from))
+    if end_to:
+        end_epoch = _query_epoch("end_to", end_to)
+        # `starts_epoch < ends_epoch` (table CHECK), so the redundant start
+        # bound is equivalent and turns the filter into an index range seek.
+        conds.append("starts_epoch < ? AND ends_epoch <= ?")
+        filter_params.extend((end_epoch, end_epoch))
     async with get_db() as db:
-        conds: list[str] = []
-        filter_params: list = []
-        if clinician:
-            conds.append("clinician = ?")
-            filter_params.append(clinician)
-        if start_from:
-            conds.append("starts_at >= ?")
-            filter_params.append(start_from)
-        if end_to:
-            conds.append("ends_at <= ?")
-            filter_params.append(end_to)
-
-        count_sql = "SELECT COUNT(*) FROM appointments"
-        if conds:
-            count_sql += " WHERE " + " AND ".join(conds)
-        total_row = await db.fetchone(count_sql, filter_params)
-        total = total_row[0] if total_row else 0
-        if response is not None:
-            response.headers["X-Total-Count"] = str(total)
+        if include_total:
+            count_sql = "SELECT COUNT(*) FROM appointments"
+            if conds:
+                count_sql += " WHERE " + " AND ".join(conds)
+            total_row = await db.fetchone(count_sql, filter_params)
+            total = total_row[0] if total_row else 0
+            if response is not None:
+                response.headers["X-Total-Count"] = str(total)
+
+        if after:
+            after_starts_at, after_id = decode_cursor(after, (str, int))
+            conds.append("(starts_epoch, id) > (?, ?)")
+            filter_params.extend([_query_epoch("after", after_starts_at, "Invalid pagination cursor"), after_id])
 
         sql = "SELECT id, patient_name, clinician, starts_at, ends_at FROM appointments"
         if conds:
             sql += " WHERE " + " AND ".join(conds)
-        sql += " ORDER BY starts_at LIMIT ? OFFSET ?"
-        params = filter_params + [limit, offset]
+        sql += " ORDER BY starts_epoch, id"
+        if after:
+            sql += " LIMIT ?"
+            params = filter_params + [limit]
+        else:
+            sql += " LIMIT ? OFFSET ?"
+            params = filter_params + [limit, offset]
         rows = await db.fetchall(sql, params)
-    return [_row_to_dict(r) for r in rows]
+    items = [_row_to_dict(r) for r in rows]
+    if response is not None and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1]["starts_at"], items[-1]["id"])
+    return items
 
 
 @router.post(
@@ -183,35 +416,149 @@ async def create_appointment(req: AppointmentCreate):
 
     Conflict rule:
     - For the same clinician, intervals must not overlap.
-    - Overlap detection: NOT (existing.ends_at <= starts OR existing.starts_at >= ends)
+    - Overlap detection: NOT (existing.ends <= starts OR existing.starts >= ends),
+      compared on UTC epochs.
     - Returns 409 on conflict.
+
+    The check and the insert are one conditional `INSERT ... SELECT ... WHERE
+    NOT EXISTS` inside a serialised write transaction (`BEGIN IMMEDIATE` on
+    SQLite, a per-clinician lock on MySQL), so two concurrent bookings of the
+    same slot cannot both succeed. The new id comes back via `RETURNING`
+    where supported, so no read-back query is needed.
+
+    Conflicts already in the schedule index (`app.schedule_index`) are
+    rejected before the write transaction is opened.
     """
-    async with get_db() as db:
-        # Check for overlap: NOT (existing.ends_at <= starts OR existing.starts_at >= ends)
-        count_row = await db.fetchone(
-            "SELECT COUNT(*) FROM appointments\n"
-            "WHERE clinician = ?\n"
-            "AND NOT (ends_at <= ? OR starts_at >= ?)",
-            (req.clinician, req.starts_at, req.ends_at),
-        )
-        count = count_row[0] if count_row else 0
-        if count > 0:
-            raise HTTPException(status_code=409, detail="Appointment conflicts with existing booking")
-
-        new_id = await db.insert(
-            "INSERT INTO appointments (patient_name, clinician, starts_at, ends_at)\n"
-            "VALUES (?, ?, ?, ?)",
-            (req.patient_name, req.clinician, req.starts_at, req.ends_at),
-        )
-        await db.commit()
+    span = (req.starts_epoch, req.ends_epoch)
+    if span[0] >= span[1]:
+        # Also a table CHECK, except on tables migrated to epoch columns.
+        raise HTTPException(status_code=400, detail=_INVALID_INTERVAL)
+    params = (req.patient_name, req.clinician, req.starts_at, req.ends_at, *span, req.clinician, *span)
+    await schedule_index.ensure_loaded()
+    try:
+        async with get_db() as db:
+            if await _index_conflict(db, req.clinician, span):
+                raise HTTPException(status_code=409, detail="Appointment conflicts with existing booking")
+            sql = _insert_if_free_sql(db.dialect)
+            async with db.transaction(lock=f"appointments:{req.clinician}"):
+                if db.supports_returning:
+                    row = await db.fetchone(sql + " RETURNING id", params)
+                    new_id = row[0] if row else 0
+                else:
+                    new_id = await db.insert(sql, params)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail=_INVALID_INTERVAL)
+    if not new_id:
+        raise HTTPException(status_code=409, detail="Appointment conflicts with existing booking")
+    schedule_index.add(new_id, req.clinician, *span)
+    return {"id": new_id, **req.model_dump()}
+
+
+async def _bookings_between(db, clinicians: list[str], lo: int, hi: int) -> list[tuple]:
+    """`(id, clinician, starts_epoch, ends_epoch)` of `clinicians`' bookings
+    overlapping `[lo, hi)`."""
+    rows: list[tuple] = []
+    for i in range(0, len(clinicians), _IN_LIST_CHUNK):
+        chunk = clinicians[i:i + _IN_LIST_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows.extend(await db.fetchall(
+            "SELECT id, clinician, starts_epoch, ends_epoch FROM appointments\n"
+            f"WHERE clinician IN ({placeholders})\n"
+            "AND starts_epoch < ? AND ends_epoch > ?",
+            (*chunk, hi, lo),
+        ))
+    return rows
 
-        # Return the newly created record
-        row = await db.fetchone(
-            "SELECT id, patient_name, clinician, starts_at, ends_at\n"
-            "FROM appointments WHERE id = ?",
-            (new_id,)
-        )
-    return _row_to_dict(row)
+
+@router.post(
+    "/bulk",
+    response_model=BulkResponse,
+    responses={
+        200: {"description": "Per-row outcome; valid rows are committed together, rejected rows are skipped"},
+    },
+)
+async def bulk_create_appointments(req: BulkAppointments):
+    """Create many appointments in one transaction (imports, migrations).
+
+    - Rows are grouped per clinician and sorted by start. One sweep per
+      clinician checks each row against the existing bookings (loaded with
+      one range query per 500 clinicians) and against rows accepted before
+      it, so when two rows of the request overlap the earlier-starting one
+      wins (ties: the earlier row in the request).
+    - Accepted rows are inserted with one `executemany` inside a write
+      transaction holding the clinicians' booking locks, so concurrent
+      single bookings cannot slip in between check and insert.
+    - The response lists every row as `created` (with `id`), `conflict` or
+      `invalid`; rejected rows do not fail the batch. Rows are validated one
+      by one, so a malformed row (bad timestamp, missing field) is `invalid`
+      with the validation message and the other rows still go in.
+    """
+    items: list[Optional[AppointmentCreate]] = [None] * len(req.appointments)
+    results: list[Optional[dict]] = [None] * len(items)
+    by_clinician: dict[str, list[tuple[int, int, int]]] = {}
+    for i, raw in enumerate(req.appointments):
+        try:
+            appt = items[i] = AppointmentCreate.model_validate(raw)
+        except ValidationError as exc:
+            results[i] = {"index": i, "status": "invalid", "detail": _validation_detail(exc)}
+            continue
+        if appt.starts_epoch >= appt.ends_epoch:
+            results[i] = {"index": i, "status": "invalid", "detail": _INVALID_INTERVAL}
+        else:
+            by_clinician.setdefault(appt.clinician, []).append((appt.starts_epoch, appt.ends_epoch, i))
+
+    accepted: list[int] = []
+    if by_clinician:
+        clinicians = list(by_clinician)
+        lo = min(start for rows in by_clinician.values() for start, _, _ in rows)
+        hi = max(end for rows in by_clinician.values() for _, end, _ in rows)
+        async with get_db() as db:
+            async with db.transaction(lock=[f"appointments:{c}" for c in clinicians]):
+                existing: dict[str, list[tuple[int, int]]] = {}
+                for _, name, start, end in await _bookings_between(db, clinicians, lo, hi):
+                    existing.setdefault(name, []).append((start, end))
+
+                for name, rows in by_clinician.items():
+                    rows.sort()
+                    busy = merge_intervals(existing.get(name, ()))
+                    j = 0
+                    last_end, last_index = None, None
+                    for start, end, i in rows:
+                        while j < len(busy) and busy[j][1] <= start:
+                            j += 1
+                        if j < len(busy) and busy[j][0] < end:
+                            results[i] = {"index": i, "status": "conflict", "detail": "Conflicts with existing booking"}
+                        elif last_end is not None and start < last_end:
+                            results[i] = {"index": i, "status": "conflict", "detail": f"Overlaps row {last_index} of this request"}
+                        else:
+                            accepted.append(i)
+                            last_end, last_index = end, i
+
+                if accepted:
+                    await db.executemany(
+                        f"INSERT INTO appointments ({_COLUMNS})\n"
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                items[i].patient_name, items[i].clinician, items[i].starts_at, items[i].ends_at,
+                                items[i].starts_epoch, items[i].ends_epoch,
+                            )
+                            for i in accepted
+                        ],
+                    )
+                    # executemany does not report ids; accepted rows are
+                    # disjoint per clinician, so (clinician, start) finds them.
+                    pending = {(items[i].clinician, items[i].starts_epoch): i for i in accepted}
+                    for appt_id, name, start, _ in await _bookings_between(db, clinicians, lo, hi):
+                        i = pending.pop((name, start), None)
+                        if i is not None:
+                            results[i] = {"index": i, "status": "created", "id": appt_id}
+
+    for i in accepted:
+        appt = items[i]
+        schedule_index.add(results[i]["id"], appt.clinician, appt.starts_epoch, appt.ends_epoch)
+    # Built from validated values; skip re-validating thousands of rows.
+    return JSONResponse({"created": len(accepted), "rejected": len(items) - len(accepted), "results": results})
 
 
 @router.get(
@@ -252,46 +599,104 @@ async def update_appointment(appt_id: int, req: AppointmentUpdate):
 
     - Merges provided fields onto current record.
     - Applies same overlap rule against other appointments for the clinician.
+    - Atomic like `create_appointment`: on SQLite one `UPDATE ... RETURNING`
+      merges, checks and writes; on MySQL the row is read `FOR UPDATE` and
+      checked under the target clinician's lock, and SQLite without
+      `RETURNING` runs the same read-check-write in `BEGIN IMMEDIATE`.
+    - Conflicts visible in the schedule index are rejected up front.
     """
-    async with get_db() as db:
-        # Load existing appointment
-        row = await db.fetchone(
-            "SELECT id, patient_name, clinician, starts_at, ends_at\n"
-            "FROM appointments WHERE id = ?",
-            (appt_id,),
-        )
-        if not row:
-            raise HTTPException(status_code=404, detail="Appointment not found")
+    data = req.model_dump()
+    await schedule_index.ensure_loaded()
+    updated, span = None, None
+    try:
+        async with get_db() as db:
+            if await _index_update_conflict(db, appt_id, req):
+                exists = True
+            elif db.dialect == "sqlite" and db.supports_returning:
+                async with db.transaction():
+                    row = await db.fetchone(
+                        _UPDATE_IF_FREE_SQLITE,
+                        (
+                            data["patient_name"], data["clinician"], data["starts_at"], data["ends_at"],
+                            req.starts_epoch, req.ends_epoch,
+                            appt_id,
+                            data["clinician"], req.starts_epoch, req.ends_epoch,
+                        ),
+                    )
+                    if row:
+                        updated = _row_to_dict(row)
+                        span = row[5:]
+                    else:
+                        exists = await db.fetchone("SELECT 1 FROM appointments WHERE id = ?", (appt_id,))
+            else:
+                updated = await _update_locked(db, appt_id, req)
+                exists = updated is not None
+                if updated:
+                    span = (to_epoch(updated["starts_at"]), to_epoch(updated["ends_at"]))
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail=_INVALID_INTERVAL)
+    if updated:
+        schedule_index.add(appt_id, updated["clinician"], *span)
+        return updated
+    if not exists:
+        schedule_index.remove(appt_id)
+        raise HTTPException(status_code=404, detail="Appointment not found")
+    raise HTTPException(status_code=409, detail="Updated appointment conflicts with existing booking")
 
-        current = _row_to_dict(row)
-        data = req.model_dump(exclude_none=True)
-        updated = {**current, **data}
 
-        # Conflict check against other appointments for same clinician
-        count_row = await db.fetchone(
-            "SELECT COUNT(*) FROM appointments\n"
-            "WHERE clinician = ? AND id <> ?\n"
-            "AND NOT (ends_at <= ? OR starts_at >= ?)",
-            (updated["clinician"], appt_id, updated["starts_at"], updated["ends_at"]),
-        )
-        count = count_row[0] if count_row else 0
-        if count > 0:
-            raise HTTPException(status_code=409, detail="Updated appointment conflicts with existing booking")
-
-        await db.execute(
-            "UPDATE appointments\n"
-            "SET patient_name = ?, clinician = ?, starts_at = ?, ends_at = ?\n"
-            "WHERE id = ?",
-            (
-                updated["patient_name"],
-                updated["clinician"],
-                updated["starts_at"],
-                updated["ends_at"],
-                appt_id,
-            ),
-        )
-        await db.commit()
-    return updated
+async def _update_locked(db, appt_id: int, req: AppointmentUpdate) -> Optional[dict]:
+    """Check-then-write update in a serialised transaction (engines without RETURNING).
+
+    MySQL reads the row `FOR UPDATE` under the clinician's lock; SQLite runs
+    the same steps inside `BEGIN IMMEDIATE` (SQLite before 3.35).
+
+    Returns the updated row, `{}` on conflict, or None if the id is missing.
+    """
+    while True:
+        clinician = req.clinician
+        if clinician is None:
+            row = await db.fetchone("SELECT clinician FROM appointments WHERE id = ?", (appt_id,))
+            if not row:
+                return None
+            clinician = row[0]
+        # `BEGIN IMMEDIATE` already serialises SQLite writers; `FOR UPDATE`
+        # is MySQL-only syntax.
+        lock_row = " FOR UPDATE" if db.dialect == "mysql" else ""
+        async with db.transaction(lock=f"appointments:{clinician}"):
+            row = await db.fetchone(
+                "SELECT id, patient_name, clinician, starts_at, ends_at\n"
+                "FROM appointments WHERE id = ?" + lock_row,
+                (appt_id,),
+            )
+            if not row:
+                return None
+            if req.clinician is None and row[2] != clinician:
+                continue  # reassigned meanwhile; retry under the new clinician's lock
+            updated = {**_row_to_dict(row), **req.model_dump(exclude_none=True)}
+            span = (to_epoch(updated["starts_at"]), to_epoch(updated["ends_at"]))
+            if span[0] >= span[1]:
+                raise HTTPException(status_code=400, detail=_INVALID_INTERVAL)
+            conflict = await db.fetchone(
+                "SELECT " + _CONFLICT_EXISTS.format(extra=" AND other.id <> ?"),
+                (updated["clinician"], *span, appt_id),
+            )
+            if conflict and conflict[0]:
+                return {}
+            await db.execute(
+                "UPDATE appointments\n"
+                "SET patient_name = ?, clinician = ?, starts_at = ?, ends_at = ?,\n"
+                "    starts_epoch = ?, ends_epoch = ?\n"
+                "WHERE id = ?",
+                (
+                    updated["patient_name"],
+                    updated["clinician"],
+                    updated["starts_at"],
+                    updated["ends_at"],
+                    *span,
+                    appt_id,
+                ),
+            )
+            return updated
 
 
 @router.delete(
@@ -310,11 +715,13 @@ async def delete_appointment(appt_id: int):
         # Check existence first
         row = await db.fetchone("SELECT 1 FROM appointments WHERE id = ?", (appt_id,))
         if not row:
+            schedule_index.remove(appt_id)
             raise HTTPException(status_code=404, detail="Appointment not found")
 
         # Perform delete
         await db.execute("DELETE FROM appointments WHERE id = ?", (appt_id,))
         await db.commit()
+    schedule_index.remove(appt_id)
     return {"status": "deleted", "id": appt_id}
 
 
@@ -328,8 +735,8 @@ async def delete_appointment(appt_id: int):
                 "application/json": {
                     "example": {
                         "slots": [
-                            {"starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"},
-                            {"starts_at": "2025-10-13T10:00:00Z", "ends_at": "2025-10-13T10:30:00Z"}
+                            {"clinician": "DR.B", "starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"},
+                            {"clinician": "DR.B", "starts_at": "2025-10-13T10:00:00Z", "ends_at": "2025-10-13T10:30:00Z"}
                         ]
                     }
                 }
@@ -337,13 +744,100 @@ async def delete_appointment(appt_id: int):
         }
     },
 )
-async def slots():
-    """Stub availability endpoint returning a static list of free slots."""
-    # Stub availability endpoint, returns a simple block of free slots.
-    return {
-        "slots": [
-            {"starts_at": "2025-10-13T09:00:00Z", "ends_at": "2025-10-13T09:30:00Z"},
-            {"starts_at": "2025-10-13T10:00:00Z", "ends_at": "2025-10-13T10:30:00Z"},
-            {"starts_at": "2025-10-13T11:00:00Z", "ends_at": "2025-10-13T11:30:00Z"},
-        ]
-    }
\ No newline at end of file
+async def slots(
+    clinician: list[str] = Query(..., min_length=1, max_length=MAX_SLOT_CLINICIANS, description="Clinician(s); repeat the parameter for several"),
+    date_from: Optional[date] = Query(None, description="First day (clinic-local date); defaults to today"),
+    date_to: Optional[date] = Query(None, description="Last day, inclusive; defaults to `date_from`"),
+    slot_minutes: int = Query(30, ge=5, le=480, description="Slot length in minutes"),
+    limit: int = Query(
+        DEFAULT_SLOTS_PER_CLINICIAN,
+        ge=1,
+        le=MAX_SLOTS_PER_CLINICIAN,
+        description="Earliest slots returned per clinician; ask again with a later `date_from` for more",
+    ),
+):
+    """Free appointment slots per clinician within clinic opening hours.
+
+    - Opening hours/days come from `Settings` (`clinic_opens_at`,
+      `clinic_closes_at`, `clinic_days`) in the clinic timezone `Settings.tz`.
+    - Bookings are loaded with range queries on
+      `idx_appointments_clinician_schedule`, a few opening days at a time for
+      the clinicians still short of `limit` slots, merged per clinician, and
+      swept against the opening windows (see `app.availability`).
+    - Slots are aligned to opening time and returned as UTC, ordered by
+      clinician then start; slots that have already started are left out.
+    - At most `limit` slots per clinician (the earliest ones); loading and
+      sweeping stop there, which bounds the work for long date ranges.
+    """
+    settings = get_settings()
+    zone = ZoneInfo(settings.tz)
+    date_from = date_from or datetime.now(zone).date()
+    date_to = date_to or date_from
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    if (date_to - date_from).days >= MAX_SLOT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_SLOT_DAYS} days")
+
+    clinicians = list(dict.fromkeys(clinician))
+    windows = clinic_windows(
+        date_from,
+        date_to,
+        settings.tz,
+        parse_clock(settings.clinic_opens_at),
+        parse_clock(settings.clinic_closes_at),
+        parse_weekdays(settings.clinic_days),
+    )
+    slot_seconds = slot_minutes * 60
+    windows = windows_from(windows, int(time.time()), slot_seconds)
+    if not windows:
+        return JSONResponse({"slots": []})
+
+    found: dict[str, list[tuple[int, int]]] = {name: [] for name in clinicians}
+    async with get_db() as db:
+        # Bookings are loaded a few opening days at a time, and only for
+        # clinicians still short of `limit` slots: with the default limit a
+        # month-long request usually needs the first week or two, not all rows.
+        for i in range(0, len(windows), _SLOT_WINDOWS_PER_QUERY):
+            pending = [name for name in clinicians if len(found[name]) < limit]
+            if not pending:
+                break
+            chunk = windows[i:i + _SLOT_WINDOWS_PER_QUERY]
+            lo, hi = window_bounds(chunk)
+            placeholders = ", ".join("?" for _ in pending)
+            rows = await db.fetchall(
+                "SELECT clinician, starts_epoch, ends_epoch FROM appointments\n"
+                f"WHERE clinician IN ({placeholders})\n"
+                "AND starts_epoch < ? AND ends_epoch > ?",
+                (*pending, hi, lo),
+            )
+            bookings: dict[str, list[tuple[int, int]]] = {}
+            for name, start, end in rows:
+                bookings.setdefault(name, []).append((start, end))
+            for name in pending:
+                slots_so_far = found[name]
+                for _, start, end in availability(bookings, [name], chunk, slot_seconds, limit=limit - len(slots_so_far)):
+                    slots_so_far.append((start, end))
+
+    # Returned as ready-made JSON: re-validating tens of thousands of slots
+    # against `Slots` would cost more than computing them.
+    return Response(
+        _slots_json((name, start, end) for name in clinicians for start, end in found[name]),
+        media_type="application/json",
+    )
+
+
+def _slots_json(free: Iterable[tuple[str, int, int]]) -> bytes:
+    """`{"slots": [...]}` as `JSONResponse` would render it, built by templating.
+
+    Every value is trusted (a clinician name from the request, escaped once,
+    and `to_iso` timestamps), so the per-slot dicts and the generic encoder
+    pass are skipped; they cost more than the availability sweep itself.
+    """
+    quoted: dict[str, str] = {}
+    parts = []
+    for name, start, end in free:
+        q = quoted.get(name)
+        if q is None:
+            q = quoted[name] = json.dumps(name, ensure_ascii=False)
+        parts.append(f'{{"clinician":{q},"starts_at":"{to_iso(start)}","ends_at":"{to_iso(end)}"}}')
+    return ('{"slots":[' + ",".join(parts) + "]}").encode("utf-8")
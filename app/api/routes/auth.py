@@ -1,22 +1,46 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Query, Request, Depends, Response
 from pydantic import BaseModel, Field
+from typing import Optional
 
 from app.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    needs_rehash,
     create_access_token,
-    decode_access_token,
+    get_bearer_token,
+    get_current_user,
     require_roles,
 )
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.cache import TTLCache
 from app.config import get_settings
+from app.db_adapter import IntegrityError, get_db
 import jwt
 
 
 router = APIRouter(prefix="/auth")
 
-# Simple in-memory user store for scaffolding.
-# Replace with a real database in production.
-_USERS: dict[str, dict] = {}
+# Users live in the `users` table (see app.db), so every worker sees the same
+# accounts. Login lookups go through a short read-through cache of
+# `email -> {"password", "role"}`; writes on this worker invalidate it, and the
+# TTL bounds staleness for writes made by other workers. Unknown emails are
+# not cached, so a user registered elsewhere can log in immediately.
+_settings = get_settings()
+_users_by_email = TTLCache("auth_users", _settings.user_cache_max_entries, _settings.user_cache_ttl_seconds)
+
+
+async def _get_user(email: str) -> Optional[dict]:
+    cached = _users_by_email.get(email)
+    if cached is not None:
+        return cached
+    generation = _users_by_email.generation
+    async with get_db() as db:
+        row = await db.fetchone("SELECT password_hash, role FROM users WHERE email = ?", (email,))
+    if not row:
+        return None
+    user = {"password": row[0], "role": row[1]}
+    _users_by_email.set(email, user, generation=generation)
+    return user
 
 
 class RegisterRequest(BaseModel):
@@ -38,34 +62,43 @@ class TokenResponse(BaseModel):
 @router.post("/register")
 async def register(req: RegisterRequest):
     email = req.email.lower().strip()
-    if email in _USERS:
+    if await _get_user(email) is not None:
         raise HTTPException(status_code=409, detail="User already exists")
-    hashed = hash_password(req.password)
-    _USERS[email] = {"password": hashed, "role": req.role}
+    hashed = await hash_password_async(req.password)
+    try:
+        async with get_db() as db:
+            await db.insert(
+                "INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)",
+                (email, hashed, req.role),
+            )
+            await db.commit()
+    except IntegrityError:
+        # Registered concurrently (possibly on another worker).
+        raise HTTPException(status_code=409, detail="User already exists")
+    _users_by_email.pop(email)
     return {"status": "registered", "email": email, "role": req.role}
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(req: LoginRequest):
     email = req.email.lower().strip()
-    user = _USERS.get(email)
-    if not user or not verify_password(req.password, user["password"]):
+    user = await _get_user(email)
+    if not user or not await verify_password_async(req.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if needs_rehash(user["password"]):
+        # Iteration count changed since this hash was made: upgrade it now that
+        # we have the plaintext, so old accounts follow the configured cost.
+        hashed = await hash_password_async(req.password)
+        async with get_db() as db:
+            await db.execute("UPDATE users SET password_hash = ? WHERE email = ?", (hashed, email))
+            await db.commit()
+        _users_by_email.pop(email)
     token = create_access_token(subject=email, role=user.get("role", "user"))
     return TokenResponse(access_token=token)
 
 
-def _auth_header_to_token(request: Request) -> str:
-    header = request.headers.get("Authorization") or ""
-    if not header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing bearer token")
-    return header.split(" ", 1)[1].strip()
-
-
 @router.get("/me")
-async def me(request: Request):
-    token = _auth_header_to_token(request)
-    payload = decode_access_token(token)
+async def me(payload: dict = Depends(get_current_user)):
     email = payload.get("sub")
     role = payload.get("role")
     return {"email": email, "role": role}
@@ -73,13 +106,33 @@ async def me(request: Request):
 
 @router.get("/debug/me")
 async def debug_me(request: Request):
-    token = _auth_header_to_token(request)
+    token = get_bearer_token(request)
     settings = get_settings()
     payload = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"], options={"verify_exp": False})
     return payload
 
 
 @router.get("/users")
-async def list_users(_: dict = Depends(require_roles(["admin"]))):
-    # Expose the in-memory user store for debugging; admin-only.
-    return {"users": [{"email": e, "role": u.get("role")} for e, u in _USERS.items()]}
\ No newline at end of file
+async def list_users(
+    limit: int = Query(50, ge=1, le=500, description="Max users to return"),
+    after: Optional[str] = Query(None, description="Cursor from `X-Next-Cursor`; seeks past that user id"),
+    response: Response = None,
+    _: dict = Depends(require_roles(["admin"])),
+):
+    """List registered users (admin-only), ordered by id with keyset pagination.
+
+    Full pages set `X-Next-Cursor`; pass it back as `after` for the next page.
+    """
+    sql = "SELECT id, email, role FROM users"
+    params: list = []
+    if after:
+        (after_id,) = decode_cursor(after, (int,))
+        sql += " WHERE id > ?"
+        params.append(after_id)
+    sql += " ORDER BY id LIMIT ?"
+    params.append(limit)
+    async with get_db() as db:
+        rows = await db.fetchall(sql, params)
+    if response is not None and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][0])
+    return {"users": [{"id": r[0], "email": r[1], "role": r[2]} for r in rows]}
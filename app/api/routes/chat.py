@@ -8,26 +8,44 @@ AI backend. It supports two styles of backends:
    `{ model, messages: [{ role, content }], ... }` and reply with
    `choices[0].message.content`.
 
+`POST /chat/stream` relays the same backends token by token as Server-Sent
+Events, so clients can render the reply as it is generated.
+
+Both routes answer repeated prompts from an in-process reply cache (see
+`_cache_key`); clients can bypass it with `Cache-Control: no-cache`.
+
 If the AI backend is unreachable or errors, we return a graceful stub
 response so the rest of the API and docs remain functional.
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from typing import AsyncIterator, Optional
+import hashlib
 import httpx
+import json
 import logging
-from time import monotonic
+import re
+from app.cache import TTLCache
 from app.config import get_settings
+from app.http_client import get_http_client
+from app.rate_limit import client_ip, rate_limit
 
 
 router = APIRouter(prefix="/chat")
 logger = logging.getLogger("chat")
 
-# Naive in-memory rate limiter (per-IP), suitable for beginner local dev.
-# For production, use a proper store (Redis) and sliding window algorithm.
-RATE_LIMIT_WINDOW_SECONDS = 60
-RATE_LIMIT_MAX_REQUESTS = 30
-_rate_state: dict[str, tuple[float, int]] = {}
+# Replies to repeated prompts ("clinic hours?") are served from memory without
+# calling the AI backend. Only real backend replies are cached, never stubs.
+CACHE_STATUS_HEADER = "X-Chat-Cache"
+_settings = get_settings()
+_reply_cache = TTLCache("chat_replies", _settings.chat_cache_max_entries, _settings.chat_cache_ttl_seconds)
+_reply_cache.counters["tokens_saved"] = 0
+_WHITESPACE = re.compile(r"\s+")
+
+# Per-IP sliding-window limit shared by `/chat` and `/chat/stream` (app.rate_limit).
+_chat_rate_limit = rate_limit("chat", _settings.chat_rate_limit_requests, _settings.chat_rate_limit_window_seconds)
 
 
 class ChatRequest(BaseModel):
@@ -47,83 +65,279 @@ class ChatResponse(BaseModel):
     reply: str
 
 
-@router.post("", response_model=ChatResponse)
-async def chat(req: ChatRequest, request: Request) -> ChatResponse:
-    # Load runtime configuration (reads from `.env` via pydantic-settings)
-    settings = get_settings()
-    base = settings.ai_service_url.rstrip("/")
+def _prepare(req: ChatRequest, request: Request) -> tuple[str, str]:
+    """Validate the prompt (the rate limit runs earlier as a dependency).
 
+    Shared by `/chat` and `/chat/stream`; returns `(prompt, client_ip)`.
+    """
     # Basic input validation (extra safety beyond Pydantic constraints)
     p = req.prompt.strip()
     if not p:
         raise HTTPException(status_code=400, detail="Prompt cannot be empty")
     if len(p) > 1000:
         raise HTTPException(status_code=400, detail="Prompt exceeds 1000 characters")
+    return p, client_ip(request)
 
-    # Naive per-IP rate limiting (in-memory, resets every window)
-    ip = request.client.host if request.client else "unknown"
-    now = monotonic()
-    start, count = _rate_state.get(ip, (now, 0))
-    if now - start > RATE_LIMIT_WINDOW_SECONDS:
-        start, count = now, 0
-    count += 1
-    _rate_state[ip] = (start, count)
-    if count > RATE_LIMIT_MAX_REQUESTS:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again later.")
-
-    # Log inbound prompt length and client IP for team visibility
-    logger.info(f"/api/chat request ip=%s prompt_len=%d", ip, len(p))
 
-    # Local AI hook removed to avoid confusion; relying on external AI or stub.
+def _target(base: str) -> tuple[bool, str]:
+    """Decide protocol: OpenAI-compatible vs simple `/chat`.
 
-    # Decide protocol: OpenAI-compatible vs simple `/chat`.
-    # We detect `/v1` in the URL to decide payload/response parsing.
+    We detect `/v1` in the URL to decide payload/response parsing.
+    Returns `(use_openai, target_url)`.
+    """
     use_openai = base.endswith("/v1") or "/v1" in base or base.endswith("/v1/chat/completions")
     if use_openai:
         target = base if base.endswith("/v1/chat/completions") else f"{base}/chat/completions"
     else:
         target = f"{base}/chat"
+    return use_openai, target
+
+
+def _auth_headers(settings) -> dict[str, str]:
+    # Include Authorization header if AI_API_KEY is configured.
+    headers = {}
+    if settings.ai_api_key:
+        headers["Authorization"] = f"Bearer {settings.ai_api_key}"
+    return headers
+
+
+def _cache_key(prompt: str, target: str, model: str) -> tuple[str, str, str]:
+    """Key replies by backend, model and the normalised prompt.
+
+    Normalisation collapses whitespace and case-folds, so "Clinic  hours?"
+    and "clinic hours?" share an entry. The prompt is stored as a digest.
+    """
+    normalised = _WHITESPACE.sub(" ", prompt).strip().casefold()
+    return target, model, hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def _cache_bypassed(request: Request) -> bool:
+    """Clients opt out with `Cache-Control: no-cache` or `X-Chat-Cache: bypass`."""
+    cache_control = (request.headers.get("Cache-Control") or "").lower()
+    return (
+        not get_settings().chat_cache_enabled
+        or "no-cache" in cache_control
+        or "no-store" in cache_control
+        or (request.headers.get(CACHE_STATUS_HEADER) or "").lower() == "bypass"
+    )
+
+
+def _cached_reply(key: tuple) -> Optional[str]:
+    entry = _reply_cache.get(key)
+    if entry is None:
+        return None
+    reply, tokens = entry
+    _reply_cache.counters["tokens_saved"] += tokens
+    return reply
+
+
+def _estimate_tokens(*texts: str) -> int:
+    # Rough fallback (~4 characters per token) when the backend reports no usage.
+    return sum(max(1, len(t) // 4) for t in texts)
+
+
+@router.post("", response_model=ChatResponse, dependencies=[Depends(_chat_rate_limit)])
+async def chat(req: ChatRequest, request: Request, response: Response = None) -> ChatResponse:
+    # Load runtime configuration (reads from `.env` via pydantic-settings)
+    settings = get_settings()
+    base = settings.ai_service_url.rstrip("/")
+
+    p, ip = _prepare(req, request)
+
+    # Log inbound prompt length and client IP for team visibility
+    logger.info(f"/api/chat request ip=%s prompt_len=%d", ip, len(p))
+
+    # Local AI hook removed to avoid confusion; relying on external AI or stub.
+
+    use_openai, target = _target(base)
+
+    # Serve repeated prompts from the reply cache unless the client bypasses it.
+    bypass = _cache_bypassed(request)
+    key = _cache_key(p, target, settings.ai_model if use_openai else "")
+    if response is not None:
+        response.headers[CACHE_STATUS_HEADER] = "BYPASS" if bypass else "MISS"
+    if not bypass:
+        cached = _cached_reply(key)
+        if cached is not None:
+            if response is not None:
+                response.headers[CACHE_STATUS_HEADER] = "HIT"
+            logger.info("/api/chat cache-hit ip=%s reply_len=%d", ip, len(cached))
+            return ChatResponse(reply=cached)
+    generation = _reply_cache.generation
 
     try:
-        # Single outbound call with a short timeout; increase if your backend is slow.
-        # Include Authorization header if AI_API_KEY is configured.
-        headers = {}
-        if settings.ai_api_key:
-            headers["Authorization"] = f"Bearer {settings.ai_api_key}"
-
-        async with httpx.AsyncClient(timeout=20, headers=headers) as client:
-            if use_openai:
-                payload = {
-                    "model": settings.ai_model,
-                    "messages": [{"role": "user", "content": p}],
-                    "stream": False,
-                }
-            else:
-                payload = {"prompt": p}
-
-            r = await client.post(target, json=payload)
-            r.raise_for_status()
-            data = r.json()
-
-            if use_openai:
-                try:
-                    reply = (
-                        data.get("choices", [{}])[0]
-                        .get("message", {})
-                        .get("content")
-                    )
-                except Exception:
-                    reply = None
-            else:
-                reply = data.get("reply") or data.get("text")
-
-            if not reply:
-                reply = str(data)
-            logger.info("/api/chat response ip=%s reply_len=%d", ip, len(reply))
-            return ChatResponse(reply=reply)
+        # Single outbound call over the shared keep-alive client; timeouts and
+        # pool limits come from Settings (AI_READ_TIMEOUT etc.).
+        headers = _auth_headers(settings)
+
+        client = await get_http_client()
+        if use_openai:
+            payload = {
+                "model": settings.ai_model,
+                "messages": [{"role": "user", "content": p}],
+                "stream": False,
+            }
+        else:
+            payload = {"prompt": p}
+
+        r = await client.post(target, json=payload, headers=headers)
+        r.raise_for_status()
+        data = r.json()
+
+        if use_openai:
+            try:
+                reply = (
+                    data.get("choices", [{}])[0]
+                    .get("message", {})
+                    .get("content")
+                )
+            except Exception:
+                reply = None
+        else:
+            reply = data.get("reply") or data.get("text")
+
+        if not reply:
+            reply = str(data)
+        else:
+            usage = data.get("usage") or {}
+            tokens = usage.get("total_tokens") or _estimate_tokens(p, reply)
+            _reply_cache.set(key, (reply, int(tokens)), generation=generation)
+        logger.info("/api/chat response ip=%s reply_len=%d", ip, len(reply))
+        return ChatResponse(reply=reply)
     except Exception:
         # Graceful fallback so the endpoint works even without an AI service.
         # This keeps docs usable and confirms request plumbing during local dev.
         stub = f"[stub] VitalAI received: {p}"
         logger.warning("/api/chat stub-response ip=%s reply_len=%d", ip, len(stub))
-        return ChatResponse(reply=stub)
\ No newline at end of file
+        return ChatResponse(reply=stub)
+
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _upstream_deltas(response: httpx.Response, use_openai: bool) -> AsyncIterator[str]:
+    """Yield text deltas from a streaming AI backend response.
+
+    - OpenAI-compatible: SSE lines `data: {...choices[0].delta.content...}`
+      terminated by `data: [DONE]`.
+    - Simple backends: a JSON body (`reply`/`text`) is emitted whole;
+      anything else (chunked plain text) is relayed chunk by chunk.
+    """
+    content_type = response.headers.get("content-type", "")
+    if use_openai or "text/event-stream" in content_type:
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            chunk = line[5:].strip()
+            if chunk == "[DONE]":
+                break
+            try:
+                data = json.loads(chunk)
+            except ValueError:
+                continue
+            choice = (data.get("choices") or [{}])[0]
+            delta = (choice.get("delta") or {}).get("content") or data.get("reply") or data.get("text")
+            if delta:
+                yield delta
+    elif "application/json" in content_type:
+        data = json.loads(await response.aread())
+        reply = data.get("reply") or data.get("text") or str(data)
+        yield reply
+    else:
+        async for text in response.aiter_text():
+            if text:
+                yield text
+
+
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    dependencies=[Depends(_chat_rate_limit)],
+    responses={
+        200: {
+            "description": "Server-Sent Events: `data: {\"delta\": ...}` per token chunk, then `event: done`",
+            "content": {"text/event-stream": {"example": 'data: {"delta": "Hel"}\n\ndata: {"delta": "lo"}\n\nevent: done\ndata: {"reply_len": 5}\n\n'}},
+        }
+    },
+)
+async def chat_stream(req: ChatRequest, request: Request) -> StreamingResponse:
+    """Stream the AI reply as Server-Sent Events for fast time-to-first-token.
+
+    - Same validation, rate limit and backend detection as `POST /api/chat`;
+      the upstream call is made with `stream: true`.
+    - Each text chunk is sent as `data: {"delta": "..."}`; the stream ends
+      with `event: done` (`{"reply_len": N}`).
+    - Backpressure: the next upstream chunk is only read after the previous
+      one was handed to the client.
+    - Cancellation: if the client disconnects, the generator stops and the
+      upstream request is closed, so the backend stops generating.
+    - If the backend is unreachable before any text arrives, the stub reply is
+      streamed instead; a failure mid-stream sends `event: error`.
+    """
+    settings = get_settings()
+    base = settings.ai_service_url.rstrip("/")
+    p, ip = _prepare(req, request)
+    logger.info("/api/chat/stream request ip=%s prompt_len=%d", ip, len(p))
+
+    use_openai, target = _target(base)
+    if use_openai:
+        payload = {
+            "model": settings.ai_model,
+            "messages": [{"role": "user", "content": p}],
+            "stream": True,
+        }
+    else:
+        payload = {"prompt": p, "stream": True}
+
+    bypass = _cache_bypassed(request)
+    key = _cache_key(p, target, settings.ai_model if use_openai else "")
+    cached = None if bypass else _cached_reply(key)
+    generation = _reply_cache.generation
+
+    async def events() -> AsyncIterator[str]:
+        if cached is not None:
+            logger.info("/api/chat/stream cache-hit ip=%s reply_len=%d", ip, len(cached))
+            yield _sse({"delta": cached})
+            yield _sse({"reply_len": len(cached)}, event="done")
+            return
+        sent = 0
+        parts: list[str] = []
+        try:
+            client = await get_http_client()
+            async with client.stream("POST", target, json=payload, headers=_auth_headers(settings)) as r:
+                r.raise_for_status()
+                async for delta in _upstream_deltas(r, use_openai):
+                    if await request.is_disconnected():
+                        logger.info("/api/chat/stream client-disconnected ip=%s sent_len=%d", ip, sent)
+                        return
+                    sent += len(delta)
+                    parts.append(delta)
+                    yield _sse({"delta": delta})
+            if parts:
+                reply = "".join(parts)
+                _reply_cache.set(key, (reply, _estimate_tokens(p, reply)), generation=generation)
+        except Exception:
+            if sent:
+                logger.warning("/api/chat/stream upstream-error ip=%s sent_len=%d", ip, sent)
+                yield _sse({"detail": "AI backend stream interrupted"}, event="error")
+                return
+            # Graceful fallback, mirroring POST /api/chat.
+            stub = f"[stub] VitalAI received: {p}"
+            logger.warning("/api/chat/stream stub-response ip=%s reply_len=%d", ip, len(stub))
+            sent = len(stub)
+            yield _sse({"delta": stub})
+        logger.info("/api/chat/stream response ip=%s reply_len=%d", ip, sent)
+        yield _sse({"reply_len": sent}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            CACHE_STATUS_HEADER: "BYPASS" if bypass else ("HIT" if cached is not None else "MISS"),
+        },
+    )
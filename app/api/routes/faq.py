@@ -1,11 +1,21 @@
+import re
+
 from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.cache import TTLCache
 from app.config import get_settings
 from app.db_adapter import get_db
 
 router = APIRouter(prefix="/faq")
 
+# Read-through caches for the FAQ read paths; FAQ content changes rarely but
+# the chatbot frontend polls constantly. Every write below invalidates them.
+_settings = get_settings()
+_faq_items = TTLCache("faq_items", _settings.faq_cache_max_entries, _settings.faq_cache_ttl_seconds)
+_faq_lists = TTLCache("faq_lists", _settings.faq_cache_max_entries, _settings.faq_cache_ttl_seconds)
+
 
 class FAQCreate(BaseModel):
     question: str = Field(min_length=1, max_length=255)
@@ -42,6 +52,50 @@ class FAQ(BaseModel):
     })
 
 
+_SEARCH_TERM = re.compile(r"\w+")
+_MAX_SEARCH_TERMS = 16
+
+
+def _search_terms(q: str) -> list[str]:
+    """Split a free-text query into lowercase word tokens (unicode-aware).
+
+    Tokens contain only word characters, so they are safe to embed in FTS5
+    and MySQL boolean-mode match expressions without escaping.
+    """
+    return _SEARCH_TERM.findall(q.lower())[:_MAX_SEARCH_TERMS]
+
+
+def _search_sql(dialect: str, terms: list[str]) -> tuple[str, str, list]:
+    """Build `(count_sql, select_sql, params)` for a ranked FAQ search.
+
+    The select is ordered by relevance (bm25 on SQLite, with question matches
+    weighted above answer matches) and still needs `LIMIT ? OFFSET ?`. The
+    count query takes only the first parameter.
+    """
+    if dialect == "mysql":
+        expr = " ".join(f"+{t}*" for t in terms)
+        match = "MATCH(question, answer) AGAINST (? IN BOOLEAN MODE)"
+        count_sql = f"SELECT COUNT(*) FROM faq WHERE {match}"
+        sql = f"SELECT id, question, answer FROM faq WHERE {match} ORDER BY {match} DESC, id"
+        return count_sql, sql, [expr, expr]
+
+    expr = " ".join(f'"{t}"*' for t in terms)
+    count_sql = "SELECT COUNT(*) FROM faq_fts WHERE faq_fts MATCH ?"
+    sql = (
+        "SELECT faq.id, faq.question, faq.answer FROM faq_fts\n"
+        "JOIN faq ON faq.id = faq_fts.rowid\n"
+        "WHERE faq_fts MATCH ?\n"
+        "ORDER BY bm25(faq_fts, 2.0, 1.0), faq.id"
+    )
+    return count_sql, sql, [expr]
+
+
+def _invalidate(faq_id: int) -> None:
+    """Drop cached copies affected by a write to `faq_id`."""
+    _faq_items.pop(faq_id)
+    _faq_lists.clear()
+
+
 def _row_to_dict(row: tuple) -> dict:
     """Convert a DB tuple `(id, question, answer)` into a response dict."""
     return {
@@ -59,10 +113,14 @@ def _row_to_dict(row: tuple) -> dict:
             "description": "List of FAQs",
             "headers": {
                 "X-Total-Count": {
-                    "description": "Total FAQs matching filters",
+                    "description": "Total FAQs matching filters (omitted when include_total=false)",
                     "schema": {"type": "integer"},
                     "example": 2,
-                }
+                },
+                NEXT_CURSOR_HEADER: {
+                    "description": "Cursor for the next page (pass as `after`); only set when the page is full",
+                    "schema": {"type": "string"},
+                },
             },
             "content": {
                 "application/json": {
@@ -76,41 +134,75 @@ def _row_to_dict(row: tuple) -> dict:
     },
 )
 async def list_faq(
-    q: Optional[str] = Query(None, min_length=1, description="Search question/answer"),
+    q: Optional[str] = Query(None, min_length=1, description="Search question/answer (ranked, prefix match)"),
     limit: int = Query(20, ge=1, le=100, description="Max items to return"),
-    offset: int = Query(0, ge=0, description="Items to skip"),
+    offset: int = Query(0, ge=0, description="Items to skip (ignored when `after` is set)"),
+    after: Optional[str] = Query(None, description="Cursor from `X-Next-Cursor`; seeks past that FAQ id"),
+    include_total: bool = Query(True, description="Set false to skip the COUNT query behind X-Total-Count"),
     response: Response = None,
 ):
     """List FAQs with optional text search and pagination.
 
-    - Filters by `q` across `question` and `answer` using `LIKE`.
-    - Sets `X-Total-Count` header for UI pagination.
+    - Without `q`: all FAQs ordered by `id`.
+    - With `q`: full-text search across `question` and `answer` (FTS5 on
+      SQLite, FULLTEXT on MySQL). Every word must match, the last characters
+      of each word may be left off (prefix search), best matches come first.
+    - Pagination: `limit`/`offset`, or keyset mode with `after` (id order
+      only, so not combinable with `q`). Full pages set `X-Next-Cursor`.
+    - Sets `X-Total-Count` header for UI pagination unless `include_total=false`.
+    - Served from the in-process cache when possible, keyed by query + page.
     """
     settings = get_settings()
-    conds: list[str] = []
-    filter_params: list = []
-    if q:
-        conds.append("(question LIKE ? OR answer LIKE ?)")
-        like = f"%{q}%"
-        filter_params.extend([like, like])
+    terms = _search_terms(q) if q else []
+    if q and not terms:
+        # Nothing searchable (e.g. only punctuation) -> nothing can match.
+        if response is not None:
+            response.headers["X-Total-Count"] = "0"
+        return []
+    after_id: Optional[int] = None
+    if after:
+        if terms:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with q; use offset")
+        (after_id,) = decode_cursor(after, (int,))
 
-    count_sql = "SELECT COUNT(*) FROM faq"
-    if conds:
-        count_sql += " WHERE " + " AND ".join(conds)
+    key = (" ".join(terms), limit, offset if after_id is None else None, after_id, include_total)
+    cached = _faq_lists.get(key)
+    if cached is None:
+        generation = _faq_lists.generation
+        async with get_db() as db:
+            total: Optional[int] = None
+            if terms:
+                count_sql, sql, filter_params = _search_sql(db.dialect, terms)
+            else:
+                count_sql = "SELECT COUNT(*) FROM faq"
+                sql = "SELECT id, question, answer FROM faq"
+                filter_params = []
+                if after_id is not None:
+                    sql += " WHERE id > ?"
+                    filter_params.append(after_id)
+                sql += " ORDER BY id"
 
-    async with get_db() as db:
-        row = await db.fetchone(count_sql, filter_params)
-        total = row[0] if row else 0
-        if response is not None:
-            response.headers["X-Total-Count"] = str(total)
+            if include_total:
+                row = await db.fetchone(count_sql, filter_params[:1] if terms else [])
+                total = row[0] if row else 0
+
+            if after_id is None:
+                sql += " LIMIT ? OFFSET ?"
+                params = filter_params + [limit, offset]
+            else:
+                sql += " LIMIT ?"
+                params = filter_params + [limit]
+            rows = await db.fetchall(sql, params)
+        cached = ([_row_to_dict(r) for r in rows], total)
+        _faq_lists.set(key, cached, generation=generation)
 
-        sql = "SELECT id, question, answer FROM faq"
-        if conds:
-            sql += " WHERE " + " AND ".join(conds)
-        sql += " ORDER BY id LIMIT ? OFFSET ?"
-        params = filter_params + [limit, offset]
-        rows = await db.fetchall(sql, params)
-    return [_row_to_dict(r) for r in rows]
+    items, total = cached
+    if response is not None:
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
+        if len(items) == limit and not terms:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1]["id"])
+    return items
 
 
 @router.get(
@@ -132,8 +224,13 @@ async def list_faq(
     },
 )
 async def get_faq(faq_id: int):
-    """Fetch a single FAQ by numeric ID; 404 if missing."""
+    """Fetch a single FAQ by numeric ID (cached); 404 if missing."""
     settings = get_settings()
+    cached = _faq_items.get(faq_id)
+    if cached is not None:
+        return cached
+
+    generation = _faq_items.generation
     async with get_db() as db:
         row = await db.fetchone(
             "SELECT id, question, answer FROM faq WHERE id = ?",
@@ -141,7 +238,9 @@ async def get_faq(faq_id: int):
         )
     if not row:
         raise HTTPException(status_code=404, detail="FAQ not found")
-    return _row_to_dict(row)
+    item = _row_to_dict(row)
+    _faq_items.set(faq_id, item, generation=generation)
+    return item
 
 
 @router.post(
@@ -171,6 +270,7 @@ async def create_faq(req: FAQCreate):
             (req.question, req.answer),
         )
         await db.commit()
+        _faq_lists.clear()
         row = await db.fetchone(
             "SELECT id, question, answer FROM faq WHERE id = ?",
             (new_id,),
@@ -216,6 +316,7 @@ async def update_faq(faq_id: int, req: FAQUpdate):
             (updated["question"], updated["answer"], faq_id),
         )
         await db.commit()
+        _invalidate(faq_id)
     return updated
 
 
@@ -243,4 +344,5 @@ async def delete_faq(faq_id: int):
 
         await db.execute("DELETE FROM faq WHERE id = ?", (faq_id,))
         await db.commit()
+        _invalidate(faq_id)
     return {"status": "deleted", "id": faq_id}
\ No newline at end of file
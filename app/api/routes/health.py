@@ -2,12 +2,17 @@
 
 Provides a simple service health check and (optionally) reports connectivity to
 the configured AI backend. This helps diagnose why `/api/chat` might be
-returning stub responses.
+returning stub responses. Also reports DB connection pool occupancy
+(in-use/idle counts), in-process cache hit/miss counters and the appointment
+schedule index size/hit counters for monitoring.
 """
 
 from fastapi import APIRouter
-import httpx
+from app.cache import cache_stats
 from app.config import get_settings
+from app.db_adapter import pool_stats
+from app.http_client import get_http_client
+from app.schedule_index import schedule_index
 
 router = APIRouter()
 
@@ -34,10 +39,17 @@ async def health():
             # For simple backends, try hitting the root or `/health` if available
             target = base
 
-        async with httpx.AsyncClient(timeout=3) as client:
-            r = await client.get(target)
-            ai_status["status"] = "ok" if r.status_code < 500 else "unreachable"
+        client = await get_http_client()
+        r = await client.get(target, timeout=3)
+        ai_status["status"] = "ok" if r.status_code < 500 else "unreachable"
     except Exception:
         ai_status["status"] = "unreachable"
 
-    return {"status": "ok", "env": settings.env, "ai_backend": ai_status}
\ No newline at end of file
+    return {
+        "status": "ok",
+        "env": settings.env,
+        "ai_backend": ai_status,
+        "db_pool": pool_stats(),
+        "caches": cache_stats(),
+        "schedule_index": schedule_index.stats(),
+    }
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""Availability engine for `GET /api/appointments/slots`.
+
+Pure functions (no I/O) so they can be tested and benchmarked directly:
+
+- `clinic_windows` turns a date range into opening-hour windows (UTC epoch
+  seconds) using the clinic timezone, hours and weekdays from `Settings`.
+- `windows_from` drops the part of the windows that has already passed.
+- `merge_intervals` sorts and merges booked intervals.
+- `free_slots` sweeps the merged busy intervals against the windows and
+  chops each free gap into slots aligned to the slot grid from opening time.
+
+Cost per clinician is O(n log n + w + s) for n bookings, w windows and s
+emitted slots; the sort is skipped when bookings arrive ordered.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from time import gmtime, strftime
+from typing import Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+Interval = tuple[int, int]  # [start, end) in UTC epoch seconds
+
+_WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+# Timestamps repeat heavily (slot grids and bookings are shared across
+# clinicians), so parsing/formatting is memoised; it dominated route latency.
+@lru_cache(maxsize=65536)
+def to_epoch(value: str) -> int:
+    """Parse an ISO8601 timestamp to UTC epoch seconds (naive = UTC)."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+@lru_cache(maxsize=65536)
+def to_iso(epoch: int) -> str:
+    """Format UTC epoch seconds the way the API reports times (`...Z`)."""
+    return strftime("%Y-%m-%dT%H:%M:%SZ", gmtime(epoch))
+
+
+def parse_weekdays(spec: str) -> frozenset[int]:
+    """Parse "mon,tue,wed" (case-insensitive) into weekday numbers (Mon=0)."""
+    days = set()
+    for part in spec.split(","):
+        part = part.strip().lower()[:3]
+        if part:
+            if part not in _WEEKDAYS:
+                raise ValueError(f"Unknown weekday {part!r}")
+            days.add(_WEEKDAYS[part])
+    return frozenset(days)
+
+
+def clinic_windows(
+    date_from: date,
+    date_to: date,
+    tz: str,
+    opens: time,
+    closes: time,
+    weekdays: Iterable[int],
+) -> list[Interval]:
+    """Opening-hour windows for each open day in `[date_from, date_to]`.
+
+    Local wall-clock hours are converted per day, so DST changes in `tz` are
+    respected.
+    """
+    zone = ZoneInfo(tz)
+    open_days = set(weekdays)
+    windows: list[Interval] = []
+    day = date_from
+    while day <= date_to:
+        if day.weekday() in open_days:
+            start = datetime.combine(day, opens, zone)
+            end = datetime.combine(day, closes, zone)
+            if end > start:
+                windows.append((int(start.timestamp()), int(end.timestamp())))
+        day += timedelta(days=1)
+    return windows
+
+
+def merge_intervals(intervals: Iterable[Interval], presorted: bool = False) -> list[Interval]:
+    """Merge overlapping or touching intervals into a sorted, disjoint list."""
+    ordered = intervals if presorted else sorted(intervals)
+    merged: list[list[int]] = []
+    for start, end in ordered:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+
+def free_slots(busy: list[Interval], windows: list[Interval], slot_seconds: int) -> Iterator[Interval]:
+    """Yield free `[start, end)` slots of `slot_seconds` inside `windows`.
+
+    `busy` must be merged (see `merge_intervals`) and `windows` sorted and
+    disjoint. Slots start on the grid `window_start + k * slot_seconds`, so a
+    booking ending at 09:10 frees the 09:30 slot rather than a 09:10 one.
+    A single pointer walks `busy` across all windows (sweep line).
+    """
+    i = 0
+    n = len(busy)
+    for w_start, w_end in windows:
+        # Skip bookings that end before this window opens.
+        while i < n and busy[i][1] <= w_start:
+            i += 1
+        cursor = w_start
+        j = i
+        while cursor < w_end:
+            if j < n and busy[j][0] < w_end:
+                gap_end = busy[j][0]
+                next_cursor = busy[j][1]
+                j += 1
+            else:
+                gap_end = w_end
+                next_cursor = w_end
+            # Emit grid-aligned slots in the free gap [cursor, gap_end).
+            if gap_end > cursor:
+                offset = cursor - w_start
+                start = w_start + -(-offset // slot_seconds) * slot_seconds
+                while start + slot_seconds <= gap_end:
+                    yield (start, start + slot_seconds)
+                    start += slot_seconds
+            cursor = max(cursor, next_cursor)
+        # A booking running past closing time may also cover the next window.
+        i = j - 1 if j > i and busy[j - 1][1] > w_end else j
+
+
+def availability(
+    bookings: dict[str, list[Interval]],
+    clinicians: Iterable[str],
+    windows: list[Interval],
+    slot_seconds: int,
+    presorted: bool = False,
+    limit: Optional[int] = None,
+) -> Iterator[tuple[str, int, int]]:
+    """Yield `(clinician, start, end)` free slots for each clinician in order.
+
+    With `limit`, only each clinician's earliest `limit` slots are produced
+    (the sweep stops there).
+    """
+    for clinician in clinicians:
+        busy = merge_intervals(bookings.get(clinician, ()), presorted=presorted)
+        for start, end in islice(free_slots(busy, windows, slot_seconds), limit):
+            yield clinician, start, end
+
+
+def parse_clock(value: str) -> time:
+    """Parse "HH:MM" clinic hours."""
+    return time.fromisoformat(value)
+
+
+def windows_from(windows: list[Interval], now: int, slot_seconds: int) -> list[Interval]:
+    """`windows` without the part before `now`.
+
+    A window already open is moved to its first slot starting at or after
+    `now` on its own grid, so slot alignment is unchanged.
+    """
+    out: list[Interval] = []
+    for start, end in windows:
+        if start < now:
+            start += -(-(now - start) // slot_seconds) * slot_seconds
+        if start < end:
+            out.append((start, end))
+    return out
+
+
+def window_bounds(windows: list[Interval]) -> Optional[Interval]:
+    """Overall `[first open, last close]` span, or None when nothing is open."""
+    if not windows:
+        return None
+    return windows[0][0], windows[-1][1]
@@ -0,0 +1,94 @@
+"""In-process caches
+
+A small LRU + TTL cache used in front of hot read paths (FAQ lookups etc.).
+
+- Bounded: least-recently-used entries are evicted past `maxsize`.
+- Entries expire `ttl` seconds after being stored (per-entry override allowed).
+- Async-safe without locks: every operation is synchronous, so it cannot be
+  interleaved on the event loop. The one race that remains is a read that
+  awaits the database, gets overtaken by a write + invalidation, and then
+  stores stale data. `generation` guards against it: take it before the
+  read, pass it to `set`, and the store is dropped if the cache was
+  invalidated in between.
+- Hit/miss/eviction counters are exposed via `stats()`, and `cache_stats()`
+  reports every named cache (surfaced on `GET /api/health`).
+
+Caches are per process; with several workers, TTL bounds cross-worker staleness.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+_registry: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300.0):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.counters: dict[str, int] = {}  # cache-specific extras reported by stats()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> None:
+        """Store `value`; skipped if `generation` is given and no longer current."""
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Invalidate one key (and any in-flight read that would refill the cache)."""
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate everything."""
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.counters,
+        }
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Counters for every named cache in this process."""
+    return {name: cache.stats() for name, cache in _registry.items()}
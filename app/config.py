@@ -17,15 +17,44 @@ class Settings(BaseSettings):
     port: int = Field(default=8000)
     tz: str = Field(default="Africa/Johannesburg")
 
+    # Clinic opening hours (local to `tz`) used by GET /api/appointments/slots
+    clinic_opens_at: str = Field(default="08:00")
+    clinic_closes_at: str = Field(default="16:00")
+    clinic_days: str = Field(default="mon,tue,wed,thu,fri")
+
     # Data backends (optional in early scaffolding)
     mysql_url: str = Field(default="")
     mongo_url: str = Field(default="mongodb://localhost:27017/hospital_logs")
     sqlite_path: str = Field(default="./local_offline.db")
 
+    # Connection pool used by `app.db_adapter.get_db` (both SQLite and MySQL)
+    db_pool_min_size: int = Field(default=1)
+    db_pool_max_size: int = Field(default=10)
+    db_pool_acquire_timeout: float = Field(default=10.0)  # seconds to wait for a free connection
+    db_pool_recycle: int = Field(default=3600)  # MySQL only; seconds before a connection is recycled
+
+    # SQLite pragma profile applied to every pooled connection (see SQLiteConnection.initialize)
+    sqlite_busy_timeout_ms: int = Field(default=5000)  # writers wait for the lock instead of failing
+    sqlite_synchronous: str = Field(default="NORMAL")  # safe with WAL; FULL for maximum durability
+    sqlite_cache_size_kib: int = Field(default=65536)  # page cache per connection
+    sqlite_mmap_size: int = Field(default=268435456)  # bytes of the DB file to memory-map; 0 disables
+    sqlite_temp_store: str = Field(default="MEMORY")  # keep sort/temp b-trees off disk
+
+    # In-process FAQ read cache (see app.cache); writes invalidate it immediately
+    faq_cache_ttl_seconds: float = Field(default=60.0)
+    faq_cache_max_entries: int = Field(default=1024)
+
     # Security and CORS
     jwt_secret: str = Field(default="change_me")
+    jwt_cache_max_entries: int = Field(default=4096)  # verified-token cache shared by auth dependencies
     encryption_key: str = Field(default="change_me_base64_32bytes")
     allowed_origins: str = Field(default="")  # e.g., "*" or comma-separated list
+    # PBKDF2 cost for new hashes; older hashes are upgraded on the next login
+    password_hash_iterations: int = Field(default=120_000)
+    password_hash_workers: int = Field(default=4)  # threads hashing concurrently (off the event loop)
+    # Read-through cache of user rows for login (per worker; bounds cross-worker staleness)
+    user_cache_ttl_seconds: float = Field(default=30.0)
+    user_cache_max_entries: int = Field(default=4096)
 
     # AI service integration (managed defaults for beginner teams)
     # If you prefer local backends, override these in `.env`.
@@ -33,6 +62,30 @@ class Settings(BaseSettings):
     ai_model: str = Field(default="gpt-4o-mini")  # used for OpenAI-style endpoints
     ai_api_key: str = Field(default="")  # optional; adds Authorization header if set
 
+    # Shared AI HTTP client (app.http_client): keep-alive pool and per-phase timeouts
+    ai_http2: bool = Field(default=True)  # used only if the `h2` package is installed
+    ai_max_connections: int = Field(default=50)
+    ai_max_keepalive_connections: int = Field(default=20)
+    ai_keepalive_expiry: float = Field(default=30.0)
+    ai_connect_timeout: float = Field(default=5.0)
+    ai_read_timeout: float = Field(default=20.0)
+    ai_write_timeout: float = Field(default=10.0)
+    ai_pool_timeout: float = Field(default=5.0)  # wait for a free pooled connection
+
+    # Response cache for repeated chat prompts (exact match after normalising
+    # whitespace/case; per backend + model). Bypass with `Cache-Control: no-cache`.
+    chat_cache_enabled: bool = Field(default=True)
+    chat_cache_ttl_seconds: float = Field(default=3600.0)
+    chat_cache_max_entries: int = Field(default=2048)
+
+    # Rate limiting (app.rate_limit): sliding window per client IP.
+    # "redis" shares counters across workers; needs REDIS_URL and the `redis` package.
+    rate_limit_backend: str = Field(default="memory")  # "memory" or "redis"
+    redis_url: str = Field(default="")
+    rate_limit_max_keys: int = Field(default=100_000)  # memory backend bound
+    chat_rate_limit_requests: int = Field(default=30)
+    chat_rate_limit_window_seconds: float = Field(default=60.0)
+
     # Local AI module integration (optional)
     # ai_local_enabled: bool = Field(default=False)
     # ai_local_path: str = Field(default="")
@@ -1,18 +1,28 @@
 """
 SQLite database initialization and helpers.
 
-- Creates tables for `appointments` and `faq` on app startup.
+- Creates tables for `appointments`, `faq` and `users` on app startup.
+- Maintains an FTS5 index (`faq_fts`) over FAQ text for `GET /api/faq?q=`.
 - Provides simple DDL definitions and a utility initializer.
-- Uses ISO8601 strings for datetime fields to keep comparisons simple.
+- Appointment times are stored twice: canonical ISO8601 strings (UTC, `Z`)
+  for display and UTC epoch seconds (`starts_epoch`/`ends_epoch`) for
+  comparisons and indexes; `init_db` migrates older tables in place.
 
-Note: We open connections per request using `aiosqlite.connect` rather than
-sharing one global connection, which keeps concurrency straightforward.
+Note: Request handlers borrow connections from the pool in
+`app.db_adapter` (one connection per request, never shared concurrently);
+`init_db` itself uses a short-lived connection before the pool opens.
 """
 
 from __future__ import annotations
 
+import logging
+
 import aiosqlite
+from .availability import to_epoch, to_iso
 from .config import get_settings
+from .db_adapter import SQLiteConnection, get_db
+
+logger = logging.getLogger(__name__)
 
 
 # -- DDL definitions (kept simple; adjust as schema evolves) --
@@ -21,17 +31,61 @@ CREATE TABLE IF NOT EXISTS appointments (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     patient_name TEXT NOT NULL,
     clinician TEXT NOT NULL,
-    starts_at TEXT NOT NULL,  -- ISO8601 datetime string
-    ends_at TEXT NOT NULL,    -- ISO8601 datetime string
-    CHECK (starts_at < ends_at)
+    starts_at TEXT NOT NULL,  -- ISO8601, UTC, `YYYY-MM-DDTHH:MM:SSZ`
+    ends_at TEXT NOT NULL,    -- ISO8601, UTC, `YYYY-MM-DDTHH:MM:SSZ`
+    starts_epoch INTEGER NOT NULL,  -- UTC epoch seconds of starts_at
+    ends_epoch INTEGER NOT NULL,    -- UTC epoch seconds of ends_at
+    CHECK (starts_at < ends_at),
+    CHECK (starts_epoch < ends_epoch)
 );
 """
 
+# Overlap checks, per-clinician range scans (`clinician = ? AND ends_epoch > ?
+# AND starts_epoch < ?`) and per-clinician listings (`ORDER BY starts_epoch,
+# id`). `id` sits before `ends_epoch` so the listing order needs no sort step;
+# `ends_epoch` keeps the overlap and slots queries covered by the index.
 CREATE_APPOINTMENTS_INDEX = """
-CREATE INDEX IF NOT EXISTS idx_appointments_clinician_start_end
-ON appointments (clinician, starts_at, ends_at);
+CREATE INDEX IF NOT EXISTS idx_appointments_clinician_schedule
+ON appointments (clinician, starts_epoch, id, ends_epoch);
+"""
+
+# Time-ordered listings across all clinicians (keyset pagination seeks on
+# `(starts_epoch, id)`); `ends_epoch` lets the `end_to` filter and its
+# X-Total-Count be answered from the index alone.
+CREATE_APPOINTMENTS_START_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_appointments_schedule
+ON appointments (starts_epoch, id, ends_epoch);
 """
 
+# Indexes the current ones replace (dropped at startup): the ISO TEXT
+# indexes, then the first epoch indexes, which did not cover listings.
+LEGACY_APPOINTMENTS_INDEXES = (
+    "idx_appointments_clinician_start_end",
+    "idx_appointments_start",
+    "idx_appointments_clinician_epochs",
+    "idx_appointments_start_epoch",
+)
+
+# `migrate_appointment_epochs` adds the epoch columns with ALTER TABLE, which
+# cannot add NOT NULL or CHECK constraints; on migrated SQLite tables these
+# triggers enforce the same rules (as constraint errors, like the CHECK).
+CREATE_APPOINTMENTS_EPOCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS appointments_epochs_bi BEFORE INSERT ON appointments
+    WHEN NEW.starts_epoch IS NULL OR NEW.ends_epoch IS NULL OR NEW.starts_epoch >= NEW.ends_epoch
+    BEGIN
+        SELECT RAISE(ABORT, 'appointments: starts_epoch/ends_epoch required, starts_epoch < ends_epoch');
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS appointments_epochs_bu BEFORE UPDATE OF starts_epoch, ends_epoch ON appointments
+    WHEN NEW.starts_epoch IS NULL OR NEW.ends_epoch IS NULL OR NEW.starts_epoch >= NEW.ends_epoch
+    BEGIN
+        SELECT RAISE(ABORT, 'appointments: starts_epoch/ends_epoch required, starts_epoch < ends_epoch');
+    END;
+    """,
+)
+
 CREATE_FAQ_TABLE = """
 CREATE TABLE IF NOT EXISTS faq (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,38 +99,273 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_faq_question_unique
 ON faq (question);
 """
 
+# Auth accounts. Emails are stored lowercased; the unique index serves login
+# lookups and rejects duplicate registrations across workers.
+CREATE_USERS_TABLE = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'user',
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+CREATE_USERS_EMAIL_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_unique
+ON users (email);
+"""
+
+CREATE_USERS_TABLE_MYSQL = """
+CREATE TABLE IF NOT EXISTS users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    role VARCHAR(32) NOT NULL DEFAULT 'user',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY idx_users_email_unique (email)
+)
+"""
+
+# Full-text search over FAQ question/answer (SQLite FTS5, external content).
+# `faq_fts` stores only the index; rows live in `faq` and triggers keep the
+# two in sync on every insert/update/delete. `unicode61 remove_diacritics 2`
+# folds case and accents so non-English FAQs tokenize sensibly.
+CREATE_FAQ_FTS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS faq_fts USING fts5(
+    question, answer,
+    content='faq', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+CREATE_FAQ_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS faq_fts_ai AFTER INSERT ON faq BEGIN
+        INSERT INTO faq_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS faq_fts_ad AFTER DELETE ON faq BEGIN
+        INSERT INTO faq_fts (faq_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS faq_fts_au AFTER UPDATE ON faq BEGIN
+        INSERT INTO faq_fts (faq_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+        INSERT INTO faq_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+    END;
+    """,
+)
+
+# MySQL equivalent: a FULLTEXT index queried with MATCH ... AGAINST.
+CREATE_FAQ_FULLTEXT_INDEX_MYSQL = """
+ALTER TABLE faq ADD FULLTEXT INDEX idx_faq_fulltext (question, answer)
+"""
+
+
+# Columns the epoch migration reads. A table without them is not the app's
+# (e.g. the `appointments` table of the `data-engineer/` MySQL schema) and is
+# left untouched.
+APPOINTMENT_MIGRATION_COLUMNS = frozenset({"id", "starts_at", "ends_at"})
+
+
+async def _appointment_columns(db) -> set[str]:
+    if db.dialect == "mysql":
+        rows = await db.fetchall(
+            "SELECT column_name FROM information_schema.columns\n"
+            "WHERE table_schema = DATABASE() AND table_name = 'appointments'"
+        )
+        return {r[0] for r in rows}
+    return {r[1] for r in await db.fetchall("PRAGMA table_info(appointments)")}
+
+
+async def migrate_appointment_epochs(db) -> int:
+    """Add and backfill `starts_epoch`/`ends_epoch` on an older appointments table.
+
+    Rows without epochs get them from their ISO strings, which are rewritten
+    in canonical UTC form (same instant), so the string and epoch orders
+    agree. Rows whose timestamps do not parse, or whose interval is empty
+    once offsets are applied, are left without epochs and logged: they no
+    longer take part in conflict checks. Returns the number of rows filled.
+    A table lacking `APPOINTMENT_MIGRATION_COLUMNS` is logged and skipped
+    before any ALTER (MySQL commits DDL immediately).
+
+    The added columns are nullable and unchecked (ALTER TABLE cannot add the
+    constraints); new writes are still validated by the routes, and on SQLite
+    `init_db` adds `CREATE_APPOINTMENTS_EPOCH_TRIGGERS`.
+    """
+    columns = await _appointment_columns(db)
+    if not columns:
+        return 0
+    missing = APPOINTMENT_MIGRATION_COLUMNS - columns
+    if missing:
+        logger.warning("appointments table has no %s; not the app's schema, epoch migration skipped", sorted(missing))
+        return 0
+    column_type = "BIGINT" if db.dialect == "mysql" else "INTEGER"
+    for name in ("starts_epoch", "ends_epoch"):
+        if name not in columns:
+            await db.execute(f"ALTER TABLE appointments ADD COLUMN {name} {column_type}")
+
+    rows = await db.fetchall(
+        "SELECT id, starts_at, ends_at FROM appointments\n"
+        "WHERE starts_epoch IS NULL OR ends_epoch IS NULL"
+    )
+    updates, skipped = [], []
+    for appt_id, starts_at, ends_at in rows:
+        try:
+            start, end = to_epoch(starts_at), to_epoch(ends_at)
+        except (TypeError, ValueError):
+            start = end = None
+        if start is None or start >= end:
+            skipped.append(appt_id)
+        else:
+            updates.append((to_iso(start), to_iso(end), start, end, appt_id))
+    if updates:
+        await db.executemany(
+            "UPDATE appointments SET starts_at = ?, ends_at = ?, starts_epoch = ?, ends_epoch = ?\n"
+            "WHERE id = ?",
+            updates,
+        )
+    if skipped:
+        logger.warning("appointments without valid times left unmigrated: ids %s", skipped[:50])
+    return len(updates)
+
+
+async def _init_mysql_appointments() -> None:
+    """Epoch migration and indexes for the MySQL appointments table.
+
+    The routes only query the epoch columns, so a failed migration aborts
+    startup (the error propagates). Index changes are best-effort: a failure
+    is logged and the app starts with the indexes it has. An `appointments`
+    table with another schema is left alone (logged) and startup continues.
+    """
+    async with get_db() as db:
+        try:
+            columns = await _appointment_columns(db)
+            if columns and not APPOINTMENT_MIGRATION_COLUMNS <= columns:
+                logger.warning(
+                    "appointments table is not the app's schema (columns %s); "
+                    "epoch migration and indexes skipped",
+                    sorted(columns),
+                )
+                return
+            await migrate_appointment_epochs(db)
+            await db.commit()
+        except Exception:
+            logger.exception("MySQL appointments epoch migration failed")
+            raise
+        try:
+            rows = await db.fetchall(
+                "SELECT DISTINCT index_name FROM information_schema.statistics\n"
+                "WHERE table_schema = DATABASE() AND table_name = 'appointments'"
+            )
+            existing = {r[0] for r in rows}
+            if "idx_appointments_clinician_schedule" not in existing:
+                await db.execute(
+                    "CREATE INDEX idx_appointments_clinician_schedule\n"
+                    "ON appointments (clinician, starts_epoch, id, ends_epoch)"
+                )
+            if "idx_appointments_schedule" not in existing:
+                await db.execute(
+                    "CREATE INDEX idx_appointments_schedule\n"
+                    "ON appointments (starts_epoch, id, ends_epoch)"
+                )
+            for name in LEGACY_APPOINTMENTS_INDEXES:
+                if name in existing:
+                    await db.execute(f"DROP INDEX {name} ON appointments")
+            await db.commit()
+        except Exception:
+            logger.exception("MySQL appointments index setup failed")
+
+
+async def _init_mysql_search() -> None:
+    """Best-effort creation of the FAQ FULLTEXT index on MySQL.
+
+    MySQL schema is managed outside the app (see `data-engineer/`), so this
+    only adds the search index; failures (e.g. no table) are logged, not raised.
+    """
+    try:
+        async with get_db() as db:
+            row = await db.fetchone(
+                "SELECT COUNT(*) FROM information_schema.statistics\n"
+                "WHERE table_schema = DATABASE() AND table_name = 'faq'\n"
+                "AND index_name = 'idx_faq_fulltext'"
+            )
+            if row and row[0] == 0:
+                await db.execute(CREATE_FAQ_FULLTEXT_INDEX_MYSQL)
+                await db.commit()
+    except Exception:
+        logger.exception("MySQL FAQ FULLTEXT index setup failed; search will be unavailable")
+
+
+async def _init_mysql_users() -> None:
+    """Best-effort creation of the `users` table on MySQL (auth store)."""
+    try:
+        async with get_db() as db:
+            await db.execute(CREATE_USERS_TABLE_MYSQL)
+            await db.commit()
+    except Exception:
+        logger.exception("MySQL users table setup failed")
+
+
 async def init_db() -> None:
     """Initialize the SQLite database with required tables and seed data.
 
     Runs at application startup to ensure schema exists for local dev.
     If `MYSQL_URL` is set, skips SQLite init since MySQL will be used.
 
+    Migrations: appointment tables from before the epoch columns are
+    backfilled and re-indexed in place (`migrate_appointment_epochs`).
+
     Pragmas:
-    - foreign_keys=ON: plan for future relational constraints
-    - journal_mode=WAL: better concurrency during development
-    - synchronous=NORMAL: faster local writes at acceptable risk
+    - journal_mode=WAL: better concurrency; persistent, so set once here
+    - the per-connection profile (foreign_keys, synchronous, busy_timeout,
+      cache_size, mmap_size, temp_store) comes from `SQLiteConnection.pragmas`
+      and is also applied to every pooled connection
     """
     settings = get_settings()
     
     # Skip SQLite initialization if MySQL is configured
     if settings.mysql_url:
+        await _init_mysql_search()
+        await _init_mysql_users()
+        await _init_mysql_appointments()
         return
     
     async with aiosqlite.connect(settings.sqlite_path) as db:
-        # Enable foreign keys for future relational constraints.
-        await db.execute("PRAGMA foreign_keys = ON;")
-        # Use write-ahead logging for better concurrency in dev.
+        # Use write-ahead logging for better concurrency; persists in the file.
         await db.execute("PRAGMA journal_mode = WAL;")
-        # Relax synchronous for faster local writes; acceptable trade-off in dev.
-        await db.execute("PRAGMA synchronous = NORMAL;")
+        await SQLiteConnection.initialize(db, SQLiteConnection.pragmas(settings))
         await db.execute(CREATE_APPOINTMENTS_TABLE)
+        await migrate_appointment_epochs(SQLiteConnection(db))
+        async with db.execute("PRAGMA table_info(appointments)") as cur:
+            nullable = {row[1] for row in await cur.fetchall() if not row[3]}
+        if "starts_epoch" in nullable:
+            for trigger in CREATE_APPOINTMENTS_EPOCH_TRIGGERS:
+                await db.execute(trigger)
+        for name in LEGACY_APPOINTMENTS_INDEXES:
+            await db.execute(f"DROP INDEX IF EXISTS {name}")
         await db.execute(CREATE_APPOINTMENTS_INDEX)
+        await db.execute(CREATE_APPOINTMENTS_START_INDEX)
+        await db.execute(CREATE_USERS_TABLE)
+        await db.execute(CREATE_USERS_EMAIL_INDEX)
         await db.execute(CREATE_FAQ_TABLE)
         try:
             await db.execute(CREATE_FAQ_UNIQUE_INDEX)
         except Exception:
             # If duplicates already exist, this will fail; leave as-is.
             pass
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'faq_fts'"
+        ) as cur:
+            fts_exists = await cur.fetchone() is not None
+        await db.execute(CREATE_FAQ_FTS_TABLE)
+        for trigger in CREATE_FAQ_FTS_TRIGGERS:
+            await db.execute(trigger)
+        if not fts_exists:
+            # Index any FAQ rows that predate the search table.
+            await db.execute("INSERT INTO faq_fts (faq_fts) VALUES ('rebuild');")
         await db.commit()
 
         # Seed FAQ entries on first run for developer visibility.
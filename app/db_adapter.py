@@ -5,20 +5,35 @@ Database adapter providing a unified async interface for SQLite and MySQL.
 - Uses `aiomysql` for MySQL when `Settings.mysql_url` is configured
 - Accepts SQL with `?` placeholders; translates to `%s` for MySQL automatically
 - Exposes simple `fetchone`, `fetchall`, `execute`, `executemany`, `insert`, `commit`
+- Wrappers carry a `dialect` ("sqlite"/"mysql") for the few queries that differ
+- `transaction(lock=...)` runs a block as one serialised write transaction
+  (`BEGIN IMMEDIATE` on SQLite, `GET_LOCK` advisory lock + transaction on MySQL)
+- Hands out connections from a pool opened at app startup (`init_pool`) and
+  closed at shutdown (`close_pool`), so requests skip connection setup
 
 This lets route handlers remain mostly database-agnostic.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import sqlite3
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import Any, Iterable, Optional
+from typing import Any, Iterable, Optional, Union
 from urllib.parse import urlparse
 
 import aiosqlite
 import aiomysql
+import pymysql
+from fastapi import HTTPException
 
 from .config import get_settings
 
+# Constraint violations (e.g. a UNIQUE index) from either driver, for
+# `except IntegrityError:` in handlers that race on inserts.
+IntegrityError = (sqlite3.IntegrityError, pymysql.err.IntegrityError)
+
 
 def _parse_mysql_url(url: str) -> dict[str, Any]:
     """Parse a SQLAlchemy-style MySQL URL into connection kwargs for aiomysql.
@@ -47,10 +62,39 @@ class SQLiteConnection:
 
     Returns tuple rows; route code maps to dicts for responses.
     """
+    dialect = "sqlite"
+    supports_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
     def __init__(self, conn: aiosqlite.Connection):
         self.conn = conn
         # tuple-like rows by default; route code converts explicitly
 
+    @staticmethod
+    def pragmas(settings: Any = None) -> dict[str, Any]:
+        """Per-connection pragma profile built from `Settings`.
+
+        These pragmas are connection-scoped in SQLite, so setting them once in
+        `init_db` is not enough: every new connection needs them.
+        (`journal_mode=WAL` is persistent and stays in `init_db`.)
+        """
+        settings = settings or get_settings()
+        return {
+            "foreign_keys": "ON",
+            "busy_timeout": int(settings.sqlite_busy_timeout_ms),
+            "synchronous": settings.sqlite_synchronous,
+            "cache_size": -abs(int(settings.sqlite_cache_size_kib)),  # negative = KiB, not pages
+            "mmap_size": int(settings.sqlite_mmap_size),
+            "temp_store": settings.sqlite_temp_store,
+        }
+
+    @staticmethod
+    async def initialize(conn: aiosqlite.Connection, pragmas: Optional[dict[str, Any]] = None) -> None:
+        """Connection-initialisation hook: apply the pragma profile to `conn`."""
+        for name, value in (SQLiteConnection.pragmas() if pragmas is None else pragmas).items():
+            if not name.isidentifier() or not str(value).lstrip("-").isalnum():
+                raise ValueError(f"Invalid SQLite pragma {name}={value!r}")
+            await conn.execute(f"PRAGMA {name} = {value};")
+
     async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[tuple]:
         async with self.conn.execute(sql, tuple(params)) as cur:
             return await cur.fetchone()
@@ -72,6 +116,23 @@ class SQLiteConnection:
     async def commit(self) -> None:
         await self.conn.commit()
 
+    @asynccontextmanager
+    async def transaction(self, lock: Union[str, Iterable[str], None] = None):
+        """Serialised write transaction; commits on success, rolls back on error.
+
+        `BEGIN IMMEDIATE` takes the database write lock before the first read,
+        so a check-then-write inside the block cannot interleave with another
+        writer (others wait up to `busy_timeout`). `lock` is accepted for
+        parity with MySQL; SQLite has a single database-wide write lock.
+        """
+        await self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            await self.conn.rollback()
+            raise
+        await self.conn.commit()
+
     async def close(self) -> None:
         await self.conn.close()
 
@@ -81,6 +142,10 @@ class MySQLConnection:
 
     Exposes fetchone, fetchall, execute, executemany, insert, commit, close.
     """
+    dialect = "mysql"
+    supports_returning = False
+    lock_timeout = 10  # seconds to wait for a named lock in `transaction`
+
     def __init__(self, conn: aiomysql.Connection):
         self.conn = conn
 
@@ -115,13 +180,314 @@ class MySQLConnection:
     async def commit(self) -> None:
         await self.conn.commit()
 
+    @asynccontextmanager
+    async def transaction(self, lock: Union[str, Iterable[str], None] = None):
+        """Transaction serialised per `lock` name via a MySQL advisory lock.
+
+        Writers using the same name (e.g. one clinician's schedule) queue on
+        `GET_LOCK`; others proceed in parallel. Several names (bulk writes)
+        are taken in sorted order so overlapping sets cannot deadlock. Raises
+        503 if a lock is not granted within `lock_timeout`.
+        """
+        locks = [lock] if isinstance(lock, str) else sorted(set(lock or ()))
+        # Lock names are limited to 64 characters.
+        names = ["vitalai:" + hashlib.sha1(name.encode("utf-8")).hexdigest() for name in locks]
+        held: list[str] = []
+        try:
+            for name in names:
+                row = await self.fetchone("SELECT GET_LOCK(?, ?)", (name, self.lock_timeout))
+                if not row or row[0] != 1:
+                    raise HTTPException(status_code=503, detail="Database busy, please retry")
+                held.append(name)
+            await self.conn.begin()
+            try:
+                yield self
+            except BaseException:
+                await self.conn.rollback()
+                raise
+            await self.conn.commit()
+        finally:
+            for name in reversed(held):
+                await self.execute("SELECT RELEASE_LOCK(?)", (name,))
+
     async def close(self) -> None:
         self.conn.close()
 
 
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled connection frees up within the acquire timeout."""
+
+
+class SQLitePool:
+    """Bounded set of long-lived aiosqlite connections.
+
+    aiosqlite runs each connection on its own thread, so opening one per
+    request means a thread spawn plus a file open. The pool keeps up to
+    `maxsize` connections alive and hands them out one request at a time.
+
+    - `minsize` connections are opened eagerly by `open()`.
+    - `acquire()` waits at most `acquire_timeout` seconds for a free slot.
+    - Idle connections are health-checked (`SELECT 1`) on checkout and
+      replaced if broken.
+    - Uncommitted work is rolled back on release so the next borrower starts clean.
+    - Each new connection runs `SQLiteConnection.initialize` with `pragmas`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        minsize: int = 1,
+        maxsize: int = 10,
+        acquire_timeout: float = 10.0,
+        pragmas: Optional[dict[str, Any]] = None,
+    ):
+        self.path = path
+        self.pragmas = pragmas
+        self.maxsize = max(1, maxsize)
+        self.minsize = max(0, min(minsize, self.maxsize))
+        self.acquire_timeout = acquire_timeout
+        self.loop = asyncio.get_running_loop()
+        self._idle: deque[aiosqlite.Connection] = deque()
+        self._slots = asyncio.Semaphore(self.maxsize)
+        self._size = 0
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        return self._size - len(self._idle)
+
+    async def open(self) -> None:
+        while self._size < self.minsize:
+            self._idle.append(await self._connect())
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = aiosqlite.connect(self.path)
+        # Pooled connections outlive requests; a daemon worker thread keeps an
+        # unclosed pool (e.g. no shutdown hook ran) from blocking interpreter exit.
+        conn.daemon = True
+        await conn
+        try:
+            await SQLiteConnection.initialize(conn, self.pragmas)
+        except BaseException:
+            await conn.close()
+            raise
+        self._size += 1
+        return conn
+
+    async def _discard(self, conn: aiosqlite.Connection) -> None:
+        self._size -= 1
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _healthy(conn: aiosqlite.Connection) -> bool:
+        try:
+            async with conn.execute("SELECT 1") as cur:
+                await cur.fetchone()
+            return True
+        except Exception:
+            return False
+
+    async def acquire(self) -> aiosqlite.Connection:
+        if self._closed:
+            raise RuntimeError("SQLite pool is closed")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError("Timed out waiting for a database connection")
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if await self._healthy(conn):
+                    return conn
+                await self._discard(conn)
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn: aiosqlite.Connection) -> None:
+        try:
+            if self._closed:
+                await self._discard(conn)
+                return
+            try:
+                if conn.in_transaction:
+                    await conn.rollback()
+                self._idle.append(conn)
+            except Exception:
+                await self._discard(conn)
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        self._closed = True
+        while self._idle:
+            await self._discard(self._idle.pop())
+
+
+class MySQLPool:
+    """Thin wrapper over `aiomysql.create_pool` matching `SQLitePool`'s API.
+
+    Adds an acquire timeout and a `ping` health check on checkout; aiomysql
+    itself recycles connections older than `pool_recycle` seconds.
+    Uncommitted work (including the implicit transaction a plain SELECT
+    opens) is rolled back on release, so the connection goes back to the pool.
+    """
+
+    def __init__(self, pool: aiomysql.Pool, acquire_timeout: float = 10.0):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.loop = asyncio.get_running_loop()
+
+    @classmethod
+    async def create(cls, url: str, minsize: int, maxsize: int, acquire_timeout: float, recycle: int) -> "MySQLPool":
+        kwargs = _parse_mysql_url(url)
+        maxsize = max(1, maxsize)
+        pool = await aiomysql.create_pool(
+            minsize=max(0, min(minsize, maxsize)),
+            maxsize=maxsize,
+            pool_recycle=recycle,
+            **kwargs,
+        )
+        return cls(pool, acquire_timeout)
+
+    @property
+    def minsize(self) -> int:
+        return self._pool.minsize
+
+    @property
+    def maxsize(self) -> int:
+        return self._pool.maxsize
+
+    @property
+    def size(self) -> int:
+        return self._pool.size
+
+    @property
+    def idle(self) -> int:
+        return self._pool.freesize
+
+    @property
+    def in_use(self) -> int:
+        return self._pool.size - self._pool.freesize
+
+    async def acquire(self) -> aiomysql.Connection:
+        try:
+            conn = await asyncio.wait_for(self._pool.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError("Timed out waiting for a database connection")
+        try:
+            await conn.ping(reconnect=True)
+        except Exception:
+            conn.close()
+            self._pool.release(conn)
+            raise
+        return conn
+
+    async def release(self, conn: aiomysql.Connection) -> None:
+        # With autocommit off, InnoDB opens a transaction on the first SELECT;
+        # aiomysql closes connections released mid-transaction, so read-only
+        # requests would cost a reconnect each. End it here instead.
+        if not conn.closed and conn.get_transaction_status():
+            try:
+                await conn.rollback()
+            except Exception:
+                conn.close()
+        await self._pool.release(conn)
+
+    async def close(self) -> None:
+        self._pool.close()
+        await self._pool.wait_closed()
+
+
+_pool: Optional[Union[SQLitePool, MySQLPool]] = None
+
+
+def _mysql_url() -> str:
+    url = (get_settings().mysql_url or "").strip()
+    return url if url.lower().startswith("mysql") else ""
+
+
+async def init_pool() -> Union[SQLitePool, MySQLPool]:
+    """Open the connection pool for the configured backend (idempotent).
+
+    Called from the app startup hook. The pool is bound to the running event
+    loop, so a call from a different loop (e.g. a fresh test client) replaces it.
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is not None and _pool.loop is loop:
+        return _pool
+    if _pool is not None:
+        old, _pool = _pool, None
+        try:
+            await old.close()
+        except Exception:
+            pass
+
+    settings = get_settings()
+    mysql_url = _mysql_url()
+    if mysql_url:
+        pool: Union[SQLitePool, MySQLPool] = await MySQLPool.create(
+            mysql_url,
+            minsize=settings.db_pool_min_size,
+            maxsize=settings.db_pool_max_size,
+            acquire_timeout=settings.db_pool_acquire_timeout,
+            recycle=settings.db_pool_recycle,
+        )
+    else:
+        pool = SQLitePool(
+            settings.sqlite_path,
+            minsize=settings.db_pool_min_size,
+            maxsize=settings.db_pool_max_size,
+            acquire_timeout=settings.db_pool_acquire_timeout,
+            pragmas=SQLiteConnection.pragmas(settings),
+        )
+        await pool.open()
+    if _pool is not None and _pool.loop is loop:
+        # Another request initialised the pool while we were connecting.
+        await pool.close()
+        return _pool
+    _pool = pool
+    return pool
+
+
+async def close_pool() -> None:
+    """Close every pooled connection; called from the app shutdown hook."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+def pool_stats() -> dict[str, Any]:
+    """Return pool occupancy for monitoring (exposed by `GET /api/health`)."""
+    if _pool is None:
+        return {"status": "not_started"}
+    return {
+        "backend": "mysql" if isinstance(_pool, MySQLPool) else "sqlite",
+        "size": _pool.size,
+        "in_use": _pool.in_use,
+        "idle": _pool.idle,
+        "min_size": _pool.minsize,
+        "max_size": _pool.maxsize,
+    }
+
+
 @asynccontextmanager
 async def get_db():
-    """Yield an async DB connection (MySQL when configured, otherwise SQLite).
+    """Yield a pooled async DB connection (MySQL when configured, otherwise SQLite).
 
     Selection:
     - When `Settings.mysql_url` is non-empty and starts with `mysql`, use aiomysql.
@@ -130,24 +496,18 @@ async def get_db():
     Behavior:
     - Provides a thin wrapper (`MySQLConnection` or `SQLiteConnection`) with consistent API.
     - MySQL mode converts `?` placeholders to `%s` automatically.
-    - Connections are closed after the context exits.
+    - Connections are borrowed from the pool and returned when the context exits;
+      the pool is opened lazily if the startup hook has not run.
+    - Raises 503 if no connection frees up within `db_pool_acquire_timeout`.
     """
-    settings = get_settings()
-    mysql_url = (settings.mysql_url or "").strip()
-    use_mysql = mysql_url.lower().startswith("mysql")
-
-    if use_mysql:
-        kwargs = _parse_mysql_url(mysql_url)
-        conn = await aiomysql.connect(**kwargs)
-        wrapper = MySQLConnection(conn)
-        try:
-            yield wrapper
-        finally:
-            await wrapper.close()
-    else:
-        conn = await aiosqlite.connect(settings.sqlite_path)
-        wrapper = SQLiteConnection(conn)
-        try:
-            yield wrapper
-        finally:
-            await wrapper.close()
\ No newline at end of file
+    pool = await init_pool()
+    try:
+        conn = await pool.acquire()
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy, try again shortly")
+
+    wrapper = MySQLConnection(conn) if isinstance(pool, MySQLPool) else SQLiteConnection(conn)
+    try:
+        yield wrapper
+    finally:
+        await pool.release(conn)
@@ -0,0 +1,80 @@
+"""Shared outbound HTTP client for the AI backend.
+
+One `httpx.AsyncClient` per process instead of one per request, so chat
+messages reuse warm keep-alive connections (no DNS/TCP/TLS setup each time).
+
+- Opened on app startup (`init_http_client`) and closed on shutdown
+  (`close_http_client`); `get_http_client()` opens it lazily otherwise.
+- Pool limits and per-phase timeouts (connect/read/write/pool) come from
+  `Settings`; callers may still pass a tighter `timeout=` per request.
+- HTTP/2 is negotiated when enabled and the optional `h2` package is installed.
+- Like the DB pool, the client is bound to the running event loop and is
+  replaced if called from a different loop (e.g. a fresh test client).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import httpx
+
+from .config import get_settings
+
+try:  # HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`)
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=settings.ai_http2 and _HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=settings.ai_max_connections,
+            max_keepalive_connections=settings.ai_max_keepalive_connections,
+            keepalive_expiry=settings.ai_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.ai_connect_timeout,
+            read=settings.ai_read_timeout,
+            write=settings.ai_write_timeout,
+            pool=settings.ai_pool_timeout,
+        ),
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Open the shared client for the running loop (idempotent)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client_loop is loop:
+        return _client
+    if _client is not None:
+        old, _client = _client, None
+        try:
+            await old.aclose()
+        except Exception:
+            pass
+    _client = _build_client()
+    _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client; called from the app shutdown hook."""
+    global _client, _client_loop
+    if _client is not None:
+        client, _client, _client_loop = _client, None, None
+        await client.aclose()
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, opening it if the startup hook has not run."""
+    return await init_http_client()
@@ -5,6 +5,10 @@ import logging
 
 from .config import get_settings
 from .db import init_db  # initialize SQLite tables on app startup
+from .db_adapter import init_pool, close_pool
+from .http_client import init_http_client, close_http_client
+from .schedule_index import schedule_index
+from .security import shutdown_password_hasher
 
 
 # Load app settings from `.env` via pydantic-settings. Cached by get_settings().
@@ -57,8 +61,22 @@ async def on_startup():
     """Create required SQLite tables if they don't exist yet.
 
     Keeps onboarding easy and avoids separate migration steps initially.
+    Then opens the shared DB connection pool used by `get_db()` and the
+    keep-alive HTTP client used to reach the AI backend, and builds the
+    in-memory schedule index used for appointment conflict checks.
     """
     await init_db()
+    await init_pool()
+    await schedule_index.load()
+    await init_http_client()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Close pooled DB and HTTP connections so the process exits cleanly."""
+    await close_http_client()
+    await close_pool()
+    shutdown_password_hasher()
 
 
 @app.get("/health")
@@ -0,0 +1,219 @@
+"""Rate limiting
+
+Reusable sliding-window rate limiter with pluggable storage, usable from any
+route as a FastAPI dependency:
+
+    @router.post("", dependencies=[Depends(rate_limit("chat", 30, 60))])
+
+Algorithm: sliding-window counter. Each key keeps the hit count of the
+current and previous fixed windows; the estimate is
+`previous * (1 - elapsed_fraction) + current`. That is O(1) time and memory
+per key and avoids the burst-at-the-boundary problem of fixed windows.
+Rejected requests are not counted.
+
+Backends:
+- `MemoryBackend` (default): per-process dict ordered by last hit. Expired
+  keys are swept periodically from the old end, and `max_keys` hard-caps
+  memory, so a bot flood of fresh IPs cannot grow it without bound.
+- `RedisBackend`: shared across workers; needs a Redis-protocol async client
+  (`redis.asyncio`, or any object with async `get`/`incr`/`decr`/`expire`,
+  e.g. a local fake in tests). Keys expire via Redis TTLs.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Protocol
+
+from fastapi import HTTPException, Request
+
+from .config import get_settings
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until a request would be admitted (0 if allowed)
+
+
+def _estimate(previous: int, current: int, window: float, now: float, window_index: int) -> float:
+    elapsed = (now - window_index * window) / window
+    return previous * (1.0 - elapsed) + current
+
+
+def _retry_after(previous: int, current: int, limit: int, window: float, now: float, window_index: int) -> float:
+    """Seconds until the weighted previous window has decayed enough for one more hit."""
+    window_end = (window_index + 1) * window
+    if previous <= 0 or current + 1 > limit:
+        return max(0.0, window_end - now)
+    # previous * (1 - t/window) + current + 1 <= limit  ->  solve for t
+    t = window * (1.0 - (limit - current - 1) / previous)
+    return max(0.0, window_index * window + t - now)
+
+
+def _result(allowed: bool, estimate: float, limit: int, retry_after: float) -> RateLimitResult:
+    return RateLimitResult(allowed, limit, max(0, int(limit - math.ceil(estimate))), retry_after)
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, limit: int, window: float, now: float) -> RateLimitResult: ...
+
+
+class MemoryBackend:
+    """In-process sliding-window counters with bounded memory."""
+
+    def __init__(self, sweep_interval: float = 60.0, max_keys: int = 100_000):
+        self.sweep_interval = sweep_interval
+        self.max_keys = max(1, max_keys)
+        # key -> [window_index, current, previous, expires_at]; oldest hit first
+        self._state: OrderedDict[str, list] = OrderedDict()
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def sweep(self, now: float) -> int:
+        """Drop keys whose windows have both expired; returns how many."""
+        removed = 0
+        while self._state:
+            key, entry = next(iter(self._state.items()))
+            if entry[3] > now:
+                break
+            del self._state[key]
+            removed += 1
+        return removed
+
+    def hit_sync(self, key: str, limit: int, window: float, now: float) -> RateLimitResult:
+        if now >= self._next_sweep:
+            self.sweep(now)
+            self._next_sweep = now + self.sweep_interval
+
+        index = int(now // window)
+        entry = self._state.get(key)
+        if entry is None:
+            entry = [index, 0, 0, 0.0]
+        elif entry[0] != index:
+            # Roll forward: the old current window becomes previous if adjacent.
+            entry = [index, 0, entry[1] if entry[0] == index - 1 else 0, 0.0]
+
+        estimate = _estimate(entry[2], entry[1], window, now, index)
+        if estimate + 1 > limit:
+            retry = _retry_after(entry[2], entry[1], limit, window, now, index)
+            result = _result(False, estimate, limit, retry)
+        else:
+            entry[1] += 1
+            result = _result(True, estimate + 1, limit, 0.0)
+
+        entry[3] = (index + 2) * window  # both windows gone after this
+        self._state[key] = entry
+        self._state.move_to_end(key)
+        while len(self._state) > self.max_keys:
+            self._state.popitem(last=False)
+        return result
+
+    async def hit(self, key: str, limit: int, window: float, now: float) -> RateLimitResult:
+        return self.hit_sync(key, limit, window, now)
+
+
+class RedisBackend:
+    """Sliding-window counters in a Redis-protocol store shared by all workers."""
+
+    def __init__(self, client: Any, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: float, now: float) -> RateLimitResult:
+        index = int(now // window)
+        current_key = f"{self.prefix}:{key}:{index}"
+        previous = int(await self.client.get(f"{self.prefix}:{key}:{index - 1}") or 0)
+        # INCR first so concurrent workers cannot both slip under the limit.
+        current = int(await self.client.incr(current_key))
+        if current == 1:
+            await self.client.expire(current_key, int(math.ceil(window * 2)))
+        estimate = _estimate(previous, current, window, now, index)
+        if estimate > limit:
+            await self.client.decr(current_key)
+            retry = _retry_after(previous, current - 1, limit, window, now, index)
+            return _result(False, estimate - 1, limit, retry)
+        return _result(True, estimate, limit, 0.0)
+
+
+_backend: Optional[RateLimitBackend] = None
+
+
+def get_backend() -> RateLimitBackend:
+    """Process-wide backend chosen by `Settings.rate_limit_backend`.
+
+    "redis" needs `REDIS_URL` and the optional `redis` package; otherwise the
+    in-memory backend is used.
+    """
+    global _backend
+    if _backend is None:
+        settings = get_settings()
+        if settings.rate_limit_backend == "redis" and settings.redis_url:
+            import redis.asyncio as redis  # optional dependency
+
+            _backend = RedisBackend(redis.from_url(settings.redis_url))
+        else:
+            _backend = MemoryBackend(max_keys=settings.rate_limit_max_keys)
+    return _backend
+
+
+def set_backend(backend: Optional[RateLimitBackend]) -> None:
+    """Swap the process-wide backend (e.g. a fake Redis in tests)."""
+    global _backend
+    _backend = backend
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Limit `limit` hits per `window` seconds for each key within `scope`."""
+
+    def __init__(self, scope: str, limit: int, window: float, backend: Optional[RateLimitBackend] = None):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self._backend = backend
+
+    async def hit(self, key: str) -> RateLimitResult:
+        backend = self._backend or get_backend()
+        return await backend.hit(f"{self.scope}:{key}", self.limit, self.window, time.time())
+
+
+def rate_limit(
+    scope: str,
+    limit: int,
+    window: float,
+    key_func: Callable[[Request], str] = client_ip,
+    backend: Optional[RateLimitBackend] = None,
+):
+    """Build a FastAPI dependency enforcing `limit` requests per `window` seconds.
+
+    Keys default to the client IP. Over the limit it raises 429 with
+    `Retry-After` and `X-RateLimit-*` headers.
+    """
+    limiter = RateLimiter(scope, limit, window, backend)
+
+    async def dependency(request: Request) -> RateLimitResult:
+        result = await limiter.hit(key_func(request))
+        if not result.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded. Try again later.",
+                headers={
+                    "Retry-After": str(max(1, math.ceil(result.retry_after))),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
+            )
+        return result
+
+    return dependency
@@ -0,0 +1,152 @@
+"""In-memory schedule index for appointment conflict checks.
+
+Per clinician, bookings are kept as parallel arrays sorted by start (UTC
+epoch seconds). A clinician's bookings never overlap (the booking rule), so
+"does [s, e) conflict?" is one binary search: the only candidate is the last
+booking starting before `e`. Free/busy lookups over a range are two binary
+searches plus the slice. Both are O(log n) per clinician, against the index
+range scan the database needs for the overlap predicate.
+
+The database stays the authority; the index only lets the routes reject
+conflicts without opening a write transaction:
+
+- a "free" answer is always followed by the atomic conditional write, which
+  re-checks in SQL (bookings made by other workers are caught there)
+- a "conflict" answer names the booking in the way; the route confirms it
+  with a primary-key lookup before returning 409, and drops or refreshes the
+  entry when another worker has moved or deleted it (`stale`)
+
+The index is built at startup (`load`) and kept in sync by the write routes.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+from .db_adapter import get_db
+
+Booking = tuple[int, int, int]  # (start, end, id)
+
+
+class ClinicianSchedule:
+    """One clinician's bookings as start-sorted parallel arrays."""
+
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.ids: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: int, end: int, appt_id: int) -> None:
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, appt_id)
+
+    def remove(self, start: int, appt_id: int) -> None:
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.ids[i] == appt_id:
+                del self.starts[i], self.ends[i], self.ids[i]
+                return
+            i += 1
+
+    def conflict(self, start: int, end: int, exclude_id: Optional[int] = None) -> Optional[int]:
+        """Id of a booking overlapping `[start, end)`, or None."""
+        i = bisect_left(self.starts, end) - 1
+        # Disjoint bookings mean one candidate; the loop only continues past
+        # `exclude_id` or a stale entry that overlaps its neighbour.
+        while i >= 0 and self.ends[i] > start:
+            if self.ids[i] != exclude_id:
+                return self.ids[i]
+            i -= 1
+        return None
+
+    def busy(self, start: int, end: int) -> list[Booking]:
+        """Bookings overlapping `[start, end)`, ordered by start."""
+        hi = bisect_left(self.starts, end)
+        lo = bisect_left(self.starts, start, hi=hi)
+        while lo > 0 and self.ends[lo - 1] > start:
+            lo -= 1
+        return [
+            (self.starts[i], self.ends[i], self.ids[i])
+            for i in range(lo, hi)
+            if self.ends[i] > start
+        ]
+
+
+class ScheduleIndex:
+    def __init__(self) -> None:
+        self.loaded = False
+        self._schedules: dict[str, ClinicianSchedule] = {}
+        self._by_id: dict[int, tuple[str, int, int]] = {}
+        self.hits = 0  # conflicts answered from the index
+        self.stale = 0  # index conflicts the database did not confirm
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    async def load(self) -> None:
+        """(Re)build from the database with one ordered scan."""
+        async with get_db() as db:
+            rows = await db.fetchall(
+                "SELECT id, clinician, starts_epoch, ends_epoch FROM appointments\n"
+                "WHERE starts_epoch IS NOT NULL ORDER BY clinician, starts_epoch"
+            )
+        # Build aside and swap, so concurrent lookups never see a partial index.
+        fresh = ScheduleIndex()
+        for appt_id, clinician, start, end in rows:
+            fresh.add(appt_id, clinician, start, end)
+        self._schedules, self._by_id = fresh._schedules, fresh._by_id
+        self.loaded = True
+
+    async def ensure_loaded(self) -> None:
+        if not self.loaded:
+            await self.load()
+
+    def get(self, appt_id: int) -> Optional[tuple[str, int, int]]:
+        """`(clinician, start, end)` of an indexed booking."""
+        return self._by_id.get(appt_id)
+
+    def add(self, appt_id: int, clinician: str, start: Optional[int], end: Optional[int]) -> None:
+        """Index (or re-index) a booking; rows without epochs are left to the DB."""
+        self.remove(appt_id)
+        if start is None or end is None:
+            return
+        self._schedules.setdefault(clinician, ClinicianSchedule()).add(start, end, appt_id)
+        self._by_id[appt_id] = (clinician, start, end)
+
+    def remove(self, appt_id: int) -> None:
+        entry = self._by_id.pop(appt_id, None)
+        if entry is not None:
+            clinician, start, _ = entry
+            schedule = self._schedules[clinician]
+            schedule.remove(start, appt_id)
+            if not schedule:
+                del self._schedules[clinician]
+
+    def conflict(self, clinician: str, start: int, end: int, exclude_id: Optional[int] = None) -> Optional[int]:
+        schedule = self._schedules.get(clinician)
+        return schedule.conflict(start, end, exclude_id) if schedule else None
+
+    def busy(self, clinician: str, start: int, end: int) -> list[Booking]:
+        schedule = self._schedules.get(clinician)
+        return schedule.busy(start, end) if schedule else []
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "bookings": len(self._by_id),
+            "clinicians": len(self._schedules),
+            "conflict_hits": self.hits,
+            "stale": self.stale,
+        }
+
+
+# Process-wide; holds no connections, so it is shared across event loops.
+schedule_index = ScheduleIndex()
@@ -1,13 +1,21 @@
+import asyncio
 import datetime
 import hashlib
 import secrets
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
 
 import jwt
 from fastapi import HTTPException, Request, Depends
 
+from app.cache import TTLCache
 from app.config import get_settings
 
+# Verified token claims, keyed by a digest of the token (never the raw bearer
+# secret) and expiring with the token's own `exp`. Dashboards send bursts of
+# requests with the same token; a hit skips the JWT parse + HMAC check.
+_token_cache = TTLCache("jwt_claims", get_settings().jwt_cache_max_entries, ttl=300.0)
+
 
 def _pbkdf2_hash(password: str, salt_hex: str, iterations: int = 120_000) -> str:
     salt = bytes.fromhex(salt_hex)
@@ -15,8 +23,8 @@ def _pbkdf2_hash(password: str, salt_hex: str, iterations: int = 120_000) -> str
     return dk.hex()
 
 
-def hash_password(password: str) -> str:
-    iterations = 120_000
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    iterations = iterations or get_settings().password_hash_iterations
     salt_hex = secrets.token_hex(16)
     hash_hex = _pbkdf2_hash(password, salt_hex, iterations)
     return f"pbkdf2_sha256${iterations}${salt_hex}${hash_hex}"
@@ -34,6 +42,49 @@ def verify_password(password: str, hashed: str) -> bool:
         return False
 
 
+def needs_rehash(hashed: str) -> bool:
+    """True if `hashed` was made with a different iteration count than configured."""
+    try:
+        return int(hashed.split("$")[1]) != get_settings().password_hash_iterations
+    except (IndexError, ValueError):
+        return True
+
+
+# PBKDF2 is CPU-bound (tens of ms per call) and would block the event loop, so
+# async handlers run it on a small dedicated thread pool. hashlib releases the
+# GIL while hashing, so threads run in parallel, and the pool size caps how
+# many cores login spikes can take.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=max(1, get_settings().password_hash_workers),
+            thread_name_prefix="password-hash",
+        )
+    return _hash_executor
+
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password` off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_executor(), hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """`verify_password` off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_executor(), verify_password, password, hashed)
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the hashing threads; called from the app shutdown hook."""
+    global _hash_executor
+    if _hash_executor is not None:
+        executor, _hash_executor = _hash_executor, None
+        executor.shutdown(wait=False)
+
+
 def create_access_token(subject: str, role: str = "user", expires_minutes: int = 60) -> str:
     settings = get_settings()
     now = datetime.datetime.now(datetime.timezone.utc)
@@ -53,12 +104,22 @@ def create_access_token(subject: str, role: str = "user", expires_minutes: int =
 
 def decode_access_token(token: str) -> Dict[str, Any]:
     settings = get_settings()
+    # The secret is part of the key so rotating JWT_SECRET invalidates entries.
+    key = hashlib.sha256(f"{settings.jwt_secret}\0{token}".encode("utf-8")).digest()
+    claims = _token_cache.get(key)
+    if claims is not None:
+        return dict(claims)
     try:
-        return jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+        claims = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    exp = claims.get("exp")
+    ttl = exp - datetime.datetime.now(datetime.timezone.utc).timestamp() if isinstance(exp, (int, float)) else None
+    if ttl is None or ttl > 0:
+        _token_cache.set(key, claims, ttl=ttl)
+    return dict(claims)
 
 
 def get_bearer_token(request: Request) -> str:
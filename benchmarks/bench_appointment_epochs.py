@@ -0,0 +1,148 @@
+"""Benchmark: appointment range queries on ISO TEXT vs integer epoch columns.
+
+Seeds two SQLite databases with the same `--rows` appointments:
+
+- text:  the previous schema, times only as ISO8601 TEXT, indexed as
+         `(clinician, starts_at, ends_at)` and `(starts_at)`
+- epoch: the current `app.db` schema, comparisons and indexes on
+         `starts_epoch`/`ends_epoch` INTEGER columns
+
+and reports, for each, the on-disk size of the two indexes (from `dbstat`)
+and queries/sec for the route queries:
+
+- overlap: the booking conflict check (`clinician = ? AND ends > ? AND starts < ?`)
+- range:   a day of one clinician's bookings, as GET /slots loads them
+- listing: the first page of all bookings from a start time, ordered by start
+
+Usage:
+    python benchmarks/bench_appointment_epochs.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.availability import to_iso  # noqa: E402
+from app.db import CREATE_APPOINTMENTS_INDEX, CREATE_APPOINTMENTS_START_INDEX, CREATE_APPOINTMENTS_TABLE  # noqa: E402
+
+CLINICIANS = [f"DR.{i:03d}" for i in range(200)]
+BASE = 1_735_689_600  # 2025-01-01T00:00:00Z
+
+TEXT_SCHEMA = (
+    """
+    CREATE TABLE appointments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        patient_name TEXT NOT NULL,
+        clinician TEXT NOT NULL,
+        starts_at TEXT NOT NULL,
+        ends_at TEXT NOT NULL,
+        CHECK (starts_at < ends_at)
+    )
+    """,
+    "CREATE INDEX idx_appointments_clinician_start_end ON appointments (clinician, starts_at, ends_at)",
+    "CREATE INDEX idx_appointments_start ON appointments (starts_at)",
+)
+EPOCH_SCHEMA = (CREATE_APPOINTMENTS_TABLE, CREATE_APPOINTMENTS_INDEX, CREATE_APPOINTMENTS_START_INDEX)
+
+# Per layout: the index names, then (name, SQL, params(clinician, start)) per query.
+LAYOUTS = {
+    "text": (
+        ("idx_appointments_clinician_start_end", "idx_appointments_start"),
+        (
+            ("overlap", "SELECT EXISTS (SELECT 1 FROM appointments WHERE clinician = ? AND ends_at > ? AND starts_at < ?)",
+             lambda c, s: (c, to_iso(s), to_iso(s + 1800))),
+            # GET /slots padded the TEXT range by a day for mixed offsets.
+            ("range", "SELECT clinician, starts_at, ends_at FROM appointments WHERE clinician = ? AND starts_at < ? AND ends_at > ?",
+             lambda c, s: (c, to_iso(s + 2 * 86400), to_iso(s - 86400))),
+            ("listing", "SELECT id, clinician, starts_at, ends_at FROM appointments WHERE starts_at >= ? ORDER BY starts_at, id LIMIT 20",
+             lambda c, s: (to_iso(s),)),
+        ),
+    ),
+    "epoch": (
+        ("idx_appointments_clinician_schedule", "idx_appointments_schedule"),
+        (
+            ("overlap", "SELECT EXISTS (SELECT 1 FROM appointments WHERE clinician = ? AND ends_epoch > ? AND starts_epoch < ?)",
+             lambda c, s: (c, s, s + 1800)),
+            ("range", "SELECT clinician, starts_epoch, ends_epoch FROM appointments WHERE clinician = ? AND starts_epoch < ? AND ends_epoch > ?",
+             lambda c, s: (c, s + 86400, s)),
+            ("listing", "SELECT id, clinician, starts_at, ends_at FROM appointments WHERE starts_epoch >= ? ORDER BY starts_epoch, id LIMIT 20",
+             lambda c, s: (s,)),
+        ),
+    ),
+}
+
+
+def seed(path: str, layout: str, rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    for ddl in TEXT_SCHEMA if layout == "text" else EPOCH_SCHEMA:
+        conn.execute(ddl)
+    conn.execute("BEGIN")
+    batch = []
+    for i in range(rows):
+        start = BASE + 1800 * (i // len(CLINICIANS))
+        row = (f"patient-{i}", CLINICIANS[i % len(CLINICIANS)], to_iso(start), to_iso(start + 1800))
+        batch.append(row if layout == "text" else row + (start, start + 1800))
+        if len(batch) == 50_000:
+            _insert(conn, layout, batch)
+            batch.clear()
+    _insert(conn, layout, batch)
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    return conn
+
+
+def _insert(conn: sqlite3.Connection, layout: str, batch: list) -> None:
+    if batch:
+        columns = "patient_name, clinician, starts_at, ends_at" + ("" if layout == "text" else ", starts_epoch, ends_epoch")
+        marks = ", ".join("?" for _ in batch[0])
+        conn.executemany(f"INSERT INTO appointments ({columns}) VALUES ({marks})", batch)
+
+
+def index_bytes(conn: sqlite3.Connection, name: str) -> int:
+    return conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (name,)).fetchone()[0] or 0
+
+
+def rate(conn: sqlite3.Connection, sql: str, params, span: int, seconds: float) -> float:
+    rnd = random.Random(1)
+    n = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = BASE + 60 * rnd.randrange(span // 60)
+        conn.execute(sql, params(rnd.choice(CLINICIANS), start)).fetchall()
+        n += 1
+    return n / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Per query and layout")
+    args = parser.parse_args()
+
+    span = 1800 * (args.rows // len(CLINICIANS))
+    tmp = tempfile.mkdtemp(prefix="vitalai-epochs-")
+    results = {}
+    for layout, (indexes, queries) in LAYOUTS.items():
+        conn = seed(os.path.join(tmp, f"{layout}.db"), layout, args.rows)
+        results[layout] = {
+            "index_mib": sum(index_bytes(conn, name) for name in indexes) / 2**20,
+            **{name: rate(conn, sql, params, span, args.seconds) for name, sql, params in queries},
+        }
+        conn.close()
+
+    print(f"{args.rows:,} appointments, {len(CLINICIANS)} clinicians")
+    print(f"{'layout':8s} {'index MiB':>10s} {'overlap/s':>10s} {'range/s':>10s} {'listing/s':>10s}")
+    for layout, r in results.items():
+        print(f"{layout:8s} {r['index_mib']:10.1f} {r['overlap']:10,.0f} {r['range']:10,.0f} {r['listing']:10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark: concurrent appointment booking through POST /api/appointments.
+
+Fires `--requests` bookings (`--concurrency` in flight) through the ASGI app
+and reports bookings/sec for two workloads:
+
+- contended: every request targets the same overlapping slot; exactly one
+  may win, the rest must get 409
+- spread:    `--clinicians` clinicians with non-overlapping slots; all win
+- bulk:      the same number of fresh spread bookings sent through
+             POST /api/appointments/bulk (`--bulk-size` rows per request)
+
+Usage:
+    python benchmarks/bench_booking.py --requests 2000 --concurrency 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="vitalai-bench-")
+os.environ["SQLITE_PATH"] = os.path.join(_tmp, "booking.db")
+os.environ["MYSQL_URL"] = ""
+
+import httpx  # noqa: E402
+
+from app.availability import to_iso  # noqa: E402
+from app.db import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def contended(i: int, args) -> dict:
+    return {"patient_name": f"P{i}", "clinician": "DR.HOT", "starts_at": "2026-01-05T09:00:00Z", "ends_at": "2026-01-05T09:30:00Z"}
+
+
+def spread(i: int, args) -> dict:
+    start = 1_767_600_000 + (i // args.clinicians) * 1800
+    return {"patient_name": f"P{i}", "clinician": f"DR.{i % args.clinicians:03d}", "starts_at": to_iso(start), "ends_at": to_iso(start + 1800)}
+
+
+async def run(make, args) -> tuple[float, Counter]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def book(i: int) -> int:
+            async with sem:
+                return (await client.post("/api/appointments", json=make(i, args))).status_code
+
+        t0 = time.perf_counter()
+        codes = await asyncio.gather(*(book(i) for i in range(args.requests)))
+        return args.requests / (time.perf_counter() - t0), Counter(codes)
+
+
+async def run_bulk(args) -> tuple[float, Counter]:
+    rows = [spread(i, args) for i in range(args.requests, 2 * args.requests)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        t0 = time.perf_counter()
+        statuses: Counter = Counter()
+        for i in range(0, len(rows), args.bulk_size):
+            r = await client.post("/api/appointments/bulk", json={"appointments": rows[i:i + args.bulk_size]})
+            statuses.update(res["status"] for res in r.json()["results"])
+        return len(rows) / (time.perf_counter() - t0), statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--clinicians", type=int, default=50)
+    parser.add_argument("--bulk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(init_db())
+    for name, make in (("contended", contended), ("spread", spread)):
+        rate, codes = asyncio.run(run(make, args))
+        print(f"{name:10s} {rate:8.0f} requests/s   status codes: {dict(sorted(codes.items()))}")
+    rate, statuses = asyncio.run(run_bulk(args))
+    print(f"{'bulk':10s} {rate:8.0f} rows/s       results: {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
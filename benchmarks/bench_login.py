@@ -0,0 +1,108 @@
+"""Benchmark: login throughput and event-loop stalls during a login spike.
+
+Registers `--users` users, then fires `--logins` concurrent logins
+(`--concurrency` at a time) through the ASGI app while a probe keeps calling
+`GET /health`. Reported per mode:
+
+- offload: PBKDF2 on the password-hash thread pool (what the app does)
+- inline:  PBKDF2 called directly in the handler (the old behaviour)
+
+Probe latency shows how long every other endpoint waits during the spike.
+
+Usage:
+    python benchmarks/bench_login.py --logins 200 --concurrency 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="vitalai-bench-")
+os.environ["SQLITE_PATH"] = os.path.join(_tmp, "login.db")
+os.environ["MYSQL_URL"] = ""
+
+import httpx  # noqa: E402
+
+from app import security  # noqa: E402
+from app.api.routes import auth  # noqa: E402
+from app.db import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def _inline_verify(password: str, hashed: str) -> bool:
+    return security.verify_password(password, hashed)
+
+
+async def run(args, password: str = "secret123") -> tuple[float, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        sem = asyncio.Semaphore(args.concurrency)
+        done = asyncio.Event()
+        probes: list[float] = []
+
+        async def login(i: int) -> None:
+            async with sem:
+                r = await client.post("/api/auth/login", json={"email": f"user{i % args.users}@bench.test", "password": password})
+                r.raise_for_status()
+
+        async def probe() -> None:
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/health")
+                probes.append((time.perf_counter() - t0) * 1000)
+                await asyncio.sleep(0.005)
+
+        prober = asyncio.create_task(probe())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await prober
+    return args.logins / elapsed, probes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(init_db())
+    import sqlite3
+
+    stored = security.hash_password("secret123")
+    conn = sqlite3.connect(os.environ["SQLITE_PATH"])
+    conn.executemany(
+        "INSERT INTO users (email, password_hash) VALUES (?, ?)",
+        [(f"user{i}@bench.test", stored) for i in range(args.users)],
+    )
+    conn.commit()
+    conn.close()
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}, {security.get_settings().password_hash_iterations:,} iterations")
+    offloaded = auth.verify_password_async
+    for mode, verify in (("offload", offloaded), ("inline", _inline_verify)):
+        auth.verify_password_async = verify
+        rate, probes = asyncio.run(run(args))
+        probes.sort()
+        p99 = probes[min(len(probes) - 1, int(len(probes) * 0.99))] if probes else float("nan")
+        print(
+            f"{mode:8s} {rate:8.1f} logins/s   /health probe: n={len(probes):4d} "
+            f"median={statistics.median(probes) if probes else float('nan'):7.1f} ms  p99={p99:7.1f} ms"
+        )
+    auth.verify_password_async = offloaded
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark: availability engine behind GET /api/appointments/slots.
+
+Builds synthetic schedules (`--clinicians` clinicians, `--days` days, each
+clinician booked for a random ~60% of the clinic day in 15-60 minute
+appointments) and times:
+
+- engine: `app.availability` merge + sweep on already-loaded bookings
+- query:  the route's booking range query alone (sqlite3, no event loop)
+- route:  the full HTTP request (range query, engine and JSON) through
+          FastAPI's TestClient, which adds its own transport overhead; once
+          with the route's default per-clinician `limit` and once with
+          `--limit` (default: every slot in the range)
+
+The schedule starts on the Monday after today, since the route leaves out
+slots that have already started.
+
+Usage:
+    python benchmarks/bench_slots.py --clinicians 200 --days 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="vitalai-bench-")
+os.environ["SQLITE_PATH"] = os.path.join(_tmp, "slots.db")
+os.environ["MYSQL_URL"] = ""
+
+from app.availability import (  # noqa: E402
+    availability,
+    clinic_windows,
+    parse_clock,
+    parse_weekdays,
+    to_iso,
+)
+from app.api.routes.appointments import DEFAULT_SLOTS_PER_CLINICIAN, MAX_SLOTS_PER_CLINICIAN  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.db import init_db  # noqa: E402
+
+
+def build_schedules(clinicians: list[str], windows: list[tuple[int, int]], seed: int = 7):
+    rnd = random.Random(seed)
+    bookings: dict[str, list[tuple[int, int]]] = {}
+    for name in clinicians:
+        items = []
+        for w_start, w_end in windows:
+            t = w_start
+            while t < w_end:
+                length = rnd.choice((15, 30, 45, 60)) * 60
+                if rnd.random() < 0.6 and t + length <= w_end:
+                    items.append((t, t + length))
+                t += length
+        bookings[name] = items
+    return bookings
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clinicians", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--slot-minutes", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=MAX_SLOTS_PER_CLINICIAN, help="Per-clinician slot limit for the second route run")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    clinicians = [f"DR.{i:03d}" for i in range(args.clinicians)]
+    today = date.today()
+    date_from = today + timedelta(days=7 - today.weekday())
+    date_to = date_from + timedelta(days=args.days - 1)
+    windows = clinic_windows(
+        date_from,
+        date_to,
+        settings.tz,
+        parse_clock(settings.clinic_opens_at),
+        parse_clock(settings.clinic_closes_at),
+        parse_weekdays(settings.clinic_days),
+    )
+    bookings = build_schedules(clinicians, windows)
+    n_bookings = sum(len(v) for v in bookings.values())
+    slot_seconds = args.slot_minutes * 60
+
+    def engine():
+        return sum(1 for _ in availability(bookings, clinicians, windows, slot_seconds))
+
+    n_slots = engine()
+    print(f"{args.clinicians} clinicians x {args.days} days: {n_bookings:,} bookings, {n_slots:,} free slots")
+    print(f"engine (merge + sweep):     {timeit(engine, args.repeat):8.1f} ms")
+
+    asyncio.run(init_db())
+    import sqlite3
+
+    conn = sqlite3.connect(settings.sqlite_path)
+    conn.executemany(
+        "INSERT INTO appointments (patient_name, clinician, starts_at, ends_at, starts_epoch, ends_epoch)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [("bench", name, to_iso(s), to_iso(e), s, e) for name, items in bookings.items() for s, e in items],
+    )
+    conn.commit()
+
+    placeholders = ", ".join("?" for _ in clinicians)
+    lo, hi = windows[0][0], windows[-1][1]
+
+    def query():
+        return conn.execute(
+            "SELECT clinician, starts_epoch, ends_epoch FROM appointments\n"
+            f"WHERE clinician IN ({placeholders})\n"
+            "AND starts_epoch < ? AND ends_epoch > ?",
+            (*clinicians, hi, lo),
+        ).fetchall()
+
+    label = f"query ({len(query()):,} rows):"
+    print(f"{label:28s}{timeit(query, args.repeat):8.1f} ms")
+    conn.close()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    params = [("clinician", c) for c in clinicians] + [
+        ("date_from", date_from.isoformat()),
+        ("date_to", date_to.isoformat()),
+        ("slot_minutes", args.slot_minutes),
+    ]
+    with TestClient(app) as client:
+        for limit in (DEFAULT_SLOTS_PER_CLINICIAN, args.limit):
+            def route():
+                r = client.get("/api/appointments/slots", params=params + [("limit", limit)])
+                r.raise_for_status()
+                return r
+
+            expected = sum(1 for _ in availability(bookings, clinicians, windows, slot_seconds, limit=limit))
+            assert len(route().json()["slots"]) == expected
+            label = f"route (limit={limit}, {expected:,} slots):"
+            print(f"{label:28s}{timeit(route, args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
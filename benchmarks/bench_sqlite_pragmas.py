@@ -0,0 +1,187 @@
+"""Benchmark: SQLite read/write throughput with default vs tuned pragmas.
+
+Seeds an `appointments` table (same DDL and index as `app.db`) with `--rows`
+rows, then measures for each pragma profile:
+
+- reads/sec: clinician + time-range queries through the composite index
+- writes/sec: single-row INSERT + COMMIT transactions (what the API does)
+- contended writes: several threads inserting at once; counts
+  `database is locked` failures (the tuned profile's busy_timeout queues them)
+
+Usage:
+    python benchmarks/bench_sqlite_pragmas.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Settings  # noqa: E402
+from app.db import CREATE_APPOINTMENTS_INDEX, CREATE_APPOINTMENTS_TABLE  # noqa: E402
+from app.db_adapter import SQLiteConnection  # noqa: E402
+
+# SQLite's own defaults (rollback journal, FULL sync, ~2 MB cache, no mmap)
+# and no busy timeout, i.e. what a bare connection gets.
+DEFAULT_PROFILE = {"journal_mode": "DELETE", "busy_timeout": 0}
+TUNED_PROFILE = {"journal_mode": "WAL", **SQLiteConnection.pragmas(Settings())}
+
+CLINICIANS = [f"DR.{i:03d}" for i in range(200)]
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+INSERT_SQL = (
+    "INSERT INTO appointments (patient_name, clinician, starts_at, ends_at, starts_epoch, ends_epoch)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _row(patient: str, clinician: str, start: datetime, minutes: int) -> tuple:
+    end = start + timedelta(minutes=minutes)
+    return (patient, clinician, _iso(start), _iso(end), int(start.timestamp()), int(end.timestamp()))
+
+
+def _connect(path: str, profile: dict) -> sqlite3.Connection:
+    # timeout=0 disables Python's implicit busy handler so only the pragma counts.
+    conn = sqlite3.connect(path, timeout=0, check_same_thread=False, isolation_level=None)
+    for name, value in profile.items():
+        # journal_mode is persistent and needs an exclusive lock; it is set once in main().
+        if name != "journal_mode":
+            conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def seed(path: str, rows: int) -> None:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute(CREATE_APPOINTMENTS_TABLE)
+    conn.execute(CREATE_APPOINTMENTS_INDEX)
+    conn.execute("BEGIN")
+    batch = []
+    for i in range(rows):
+        clinician = CLINICIANS[i % len(CLINICIANS)]
+        start = BASE + timedelta(minutes=30 * (i // len(CLINICIANS)))
+        batch.append(_row(f"patient-{i}", clinician, start, 30))
+        if len(batch) == 50_000:
+            conn.executemany(
+                INSERT_SQL,
+                batch,
+            )
+            batch.clear()
+    if batch:
+        conn.executemany(
+            INSERT_SQL,
+            batch,
+        )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def bench_reads(conn: sqlite3.Connection, seconds: float, span_minutes: int) -> float:
+    rnd = random.Random(1)
+    n = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = BASE + timedelta(minutes=rnd.randrange(span_minutes))
+        conn.execute(
+            "SELECT id, patient_name, clinician, starts_at, ends_at FROM appointments "
+            "WHERE clinician = ? AND starts_epoch >= ? AND starts_epoch < ? ORDER BY starts_epoch LIMIT 20",
+            (rnd.choice(CLINICIANS), int(start.timestamp()), int(start.timestamp()) + 86400),
+        ).fetchall()
+        n += 1
+    return n / seconds
+
+
+def bench_writes(conn: sqlite3.Connection, count: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(count):
+        start = BASE - timedelta(days=1, minutes=30 * (i + 1))
+        conn.execute("BEGIN")
+        conn.execute(
+            INSERT_SQL,
+            _row("bench", "DR.BENCH", start, 15),
+        )
+        conn.execute("COMMIT")
+    return count / (time.perf_counter() - t0)
+
+
+def bench_contended_writes(path: str, profile: dict, threads: int, per_thread: int) -> tuple[float, int]:
+    failures = 0
+    lock = threading.Lock()
+
+    def worker(tid: int) -> None:
+        nonlocal failures
+        conn = _connect(path, profile)
+        for i in range(per_thread):
+            start = BASE - timedelta(days=30 + tid, minutes=30 * (i + 1))
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    INSERT_SQL,
+                    _row("bench", f"DR.T{tid}", start, 15),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                with lock:
+                    failures += 1
+        conn.close()
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return (threads * per_thread - failures) / elapsed, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--read-seconds", type=float, default=3.0)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="vitalai-bench-")
+    template = os.path.join(workdir, "template.db")
+    t0 = time.perf_counter()
+    seed(template, args.rows)
+    print(f"seeded {args.rows:,} appointments in {time.perf_counter() - t0:.1f}s")
+    span_minutes = 30 * (args.rows // len(CLINICIANS))
+
+    print(f"{'profile':<8} {'reads/s':>10} {'writes/s':>10} {'contended w/s':>14} {'locked':>7}")
+    for name, profile in (("default", DEFAULT_PROFILE), ("tuned", TUNED_PROFILE)):
+        path = os.path.join(workdir, f"{name}.db")
+        with open(template, "rb") as src, open(path, "wb") as dst:
+            dst.write(src.read())
+        setup = sqlite3.connect(path)
+        setup.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        setup.close()
+        conn = _connect(path, profile)
+        reads = bench_reads(conn, args.read_seconds, span_minutes)
+        writes = bench_writes(conn, args.writes)
+        conn.close()
+        contended, locked = bench_contended_writes(path, profile, args.threads, args.writes // args.threads)
+        print(f"{name:<8} {reads:>10,.0f} {writes:>10,.0f} {contended:>14,.0f} {locked:>7}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark: triage text preprocessing, full vs trimmed spaCy pipeline.
+
+Runs `preprocess` over the `ai-and-nlp/triage2.csv` corpus with:
+
+- full:    `en_core_web_sm` with every component, one `nlp(text)` per row
+           (the original `preprocess()`)
+- trimmed: parser/NER/senter excluded, batched through `nlp.pipe`
+           (`triage_preprocess.Preprocessor`, memoisation off for a fair
+           docs/sec; the cached rate is reported separately)
+
+Each mode runs in its own subprocess, so resident memory (peak RSS) is
+measured per pipeline. Needs spaCy and `en_core_web_sm` installed.
+
+Usage:
+    python benchmarks/bench_triage_preprocess.py --repeat 3 --n-process 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AI_DIR = os.path.join(ROOT, "ai-and-nlp")
+sys.path.insert(0, AI_DIR)
+
+CORPUS = os.path.join(AI_DIR, "triage2.csv")
+
+
+def load_corpus() -> list[str]:
+    with open(CORPUS, newline="", encoding="utf-8") as f:
+        return [row["text"] for row in csv.DictReader(f) if row.get("text")]
+
+
+def peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def child(mode: str, repeat: int, n_process: int) -> dict:
+    from triage_preprocess import Preprocessor, lemmas, load_nlp
+
+    texts = load_corpus()
+    nlp = load_nlp(trimmed=mode == "trimmed")
+    if mode == "full":
+        def run():
+            return [lemmas(nlp(t.lower())) for t in texts]
+    else:
+        def run():
+            return Preprocessor(nlp, n_process=n_process, cache_size=0).batch(texts)
+
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = run()
+        best = min(best, time.perf_counter() - t0)
+    result = {
+        "mode": mode,
+        "components": nlp.pipe_names,
+        "docs": len(texts),
+        "docs_per_s": len(texts) / best,
+        "peak_rss_mib": peak_rss_mib(),
+        "sample": out[0],
+    }
+    if mode == "trimmed":
+        cached = Preprocessor(nlp)
+        cached.batch(texts)
+        t0 = time.perf_counter()
+        cached.batch(texts)
+        result["cached_docs_per_s"] = len(texts) / (time.perf_counter() - t0)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--child", choices=("full", "trimmed"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.repeat, args.n_process)))
+        return
+
+    results = {}
+    for mode in ("full", "trimmed"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--repeat", str(args.repeat), "--n-process", str(args.n_process)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    full, trimmed = results["full"], results["trimmed"]
+    print(f"corpus: {full['docs']} docs from {os.path.relpath(CORPUS, ROOT)}")
+    for r in (full, trimmed):
+        print(f"{r['mode']:8s} {r['docs_per_s']:9.0f} docs/s  peak RSS {r['peak_rss_mib']:7.1f} MiB  [{', '.join(r['components'])}]")
+    print(f"trimmed, memoised repeat pass: {trimmed['cached_docs_per_s']:,.0f} docs/s")
+    print(f"speed-up {trimmed['docs_per_s'] / full['docs_per_s']:.2f}x, same output: {full['sample'] == trimmed['sample']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,31 @@
-from fastapi import HTTPException, Request # type: ignore
+from fastapi import HTTPException # type: ignore
 import time
 
 class MobileRateLimiter:
     def __init__(self):
+        # device_id -> [hour, requests this hour, requests last hour]
         self.requests = {}
+        self.swept_hour = None
     
     def check_rate_limit(self, device_id: str, max_requests: int = 100):
         current_time = time.time()
-        key = f"{device_id}_{int(current_time // 3600)}"
+        hour = int(current_time // 3600)
         
-        if key not in self.requests:
-            self.requests[key] = 0
+        if hour != self.swept_hour:
+            # Once an hour, drop devices idle long enough to no longer count.
+            self.requests = {d: s for d, s in self.requests.items() if s[0] >= hour - 1}
+            self.swept_hour = hour
         
-        self.requests[key] += 1
+        state = self.requests.get(device_id)
+        if state is None or state[0] < hour - 1:
+            state = [hour, 0, 0]
+        elif state[0] < hour:
+            state = [hour, 0, state[1]]
+        self.requests[device_id] = state
         
-        if self.requests[key] > max_requests:
-            raise HTTPException(status_code=429, detail="Too many requests")
\ No newline at end of file
+        # Sliding window: last hour's count, weighted by how much of it is still inside the window.
+        elapsed = current_time / 3600 - hour
+        if state[2] * (1 - elapsed) + state[1] + 1 > max_requests:
+            raise HTTPException(status_code=429, detail="Too many requests")
+        
+        state[1] += 1
\ No newline at end of file
@@ -0,0 +1,18 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway SQLite file before `app.main` is imported
+# (settings are cached on first use), then create the schema once.
+_tmpdir = tempfile.mkdtemp(prefix="vitalai-tests-")
+os.environ["SQLITE_PATH"] = os.path.join(_tmpdir, "test.db")
+os.environ["MYSQL_URL"] = ""
+
+from app.db import init_db  # noqa: E402
+
+asyncio.run(init_db())
+
+# ai-and-nlp/ is a directory of scripts whose modules import each other by
+# name; tests import them the same way.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai-and-nlp"))
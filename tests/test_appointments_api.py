@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 from app.main import app
+from app.schedule_index import schedule_index
 
 client = TestClient(app)
 
@@ -67,4 +68,414 @@ def test_appointments_crud_and_conflicts():
     r = client.get(f"/api/appointments/id/{a_id}")
     assert r.status_code == 404
     r = client.get(f"/api/appointments/id/{c_id}")
-    assert r.status_code == 404
\ No newline at end of file
+    assert r.status_code == 404
+
+def test_appointments_cursor_pagination():
+    created = []
+    for hour in (13, 9, 11, 10, 12):
+        r = client.post("/api/appointments", json={
+            "patient_name": f"Patient {hour}",
+            "clinician": "Dr. Cursor",
+            "starts_at": f"2025-11-03T{hour:02d}:00:00Z",
+            "ends_at": f"2025-11-03T{hour:02d}:30:00Z",
+        })
+        assert r.status_code == 200, r.text
+        created.append(r.json())
+
+    seen = []
+    params = {"clinician": "Dr. Cursor", "limit": 2, "include_total": "false"}
+    while True:
+        r = client.get("/api/appointments", params=params)
+        assert r.status_code == 200, r.text
+        assert "X-Total-Count" not in r.headers
+        seen.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+    assert [a["starts_at"][11:13] for a in seen] == ["09", "10", "11", "12", "13"]
+
+    r = client.get("/api/appointments", params={"after": "not-a-cursor"})
+    assert r.status_code == 400
+
+    for appt in created:
+        client.delete(f"/api/appointments/id/{appt['id']}")
+
+
+def _freeze_slots_clock(monkeypatch, iso):
+    from types import SimpleNamespace
+
+    import app.api.routes.appointments as routes
+    from app.availability import to_epoch
+
+    monkeypatch.setattr(routes, "time", SimpleNamespace(time=lambda: to_epoch(iso)))
+
+
+def test_slots_exclude_bookings_and_respect_clinic_hours(monkeypatch):
+    # 2025-10-13 is a Monday; default clinic hours are 08:00-16:00 Africa/Johannesburg (UTC+2).
+    _freeze_slots_clock(monkeypatch, "2025-10-12T00:00:00Z")
+    r = client.post("/api/appointments", json={
+        "patient_name": "Slot Patient",
+        "clinician": "Dr. Slots",
+        "starts_at": "2025-10-13T09:00:00+02:00",
+        "ends_at": "2025-10-13T09:30:00+02:00",
+    })
+    assert r.status_code == 200, r.text
+    booked = r.json()
+
+    r = client.get("/api/appointments/slots", params=[
+        ("clinician", "Dr. Slots"), ("clinician", "Dr. Free"),
+        ("date_from", "2025-10-12"), ("date_to", "2025-10-13"), ("slot_minutes", 60),
+    ])
+    assert r.status_code == 200, r.text
+    slots = r.json()["slots"]
+    busy = [s["starts_at"] for s in slots if s["clinician"] == "Dr. Slots"]
+    free = [s["starts_at"] for s in slots if s["clinician"] == "Dr. Free"]
+    # Sunday is closed; Monday runs 06:00Z-14:00Z in 60-minute slots.
+    assert free == [f"2025-10-13T{h:02d}:00:00Z" for h in range(6, 14)]
+    assert busy == [f for f in free if f != "2025-10-13T07:00:00Z"]
+
+    # Today: slots that already started are left out, the grid is kept.
+    _freeze_slots_clock(monkeypatch, "2025-10-13T07:10:00Z")
+    r = client.get("/api/appointments/slots", params={"clinician": "Dr. Free", "date_from": "2025-10-13", "slot_minutes": 60})
+    assert [s["starts_at"] for s in r.json()["slots"]] == [f"2025-10-13T{h:02d}:00:00Z" for h in range(8, 14)]
+    _freeze_slots_clock(monkeypatch, "2025-10-13T14:00:00Z")
+    r = client.get("/api/appointments/slots", params={"clinician": "Dr. Free", "date_from": "2025-10-13"})
+    assert r.json() == {"slots": []}
+
+    # At most `limit` (earliest) slots per clinician.
+    _freeze_slots_clock(monkeypatch, "2025-10-12T00:00:00Z")
+    r = client.get("/api/appointments/slots", params=[
+        ("clinician", "Dr. Slots"), ("clinician", "Dr. Free"),
+        ("date_from", "2025-10-13"), ("date_to", "2025-10-17"), ("limit", 2),
+    ])
+    assert [(s["clinician"], s["starts_at"]) for s in r.json()["slots"]] == [
+        ("Dr. Slots", "2025-10-13T06:00:00Z"), ("Dr. Slots", "2025-10-13T06:30:00Z"),
+        ("Dr. Free", "2025-10-13T06:00:00Z"), ("Dr. Free", "2025-10-13T06:30:00Z"),
+    ]
+    r = client.get("/api/appointments/slots", params={"clinician": "Dr. Free", "date_from": "2025-10-13", "date_to": "2025-10-31"})
+    assert len(r.json()["slots"]) == 50
+    # Loaded a few days at a time; a larger limit continues past the first chunk.
+    r = client.get("/api/appointments/slots", params=[
+        ("clinician", "Dr. Slots"), ("clinician", "Dr. Free"),
+        ("date_from", "2025-10-13"), ("date_to", "2025-10-31"), ("limit", 120),
+    ])
+    starts = {c: [s["starts_at"] for s in r.json()["slots"] if s["clinician"] == c] for c in ("Dr. Slots", "Dr. Free")}
+    assert len(starts["Dr. Free"]) == 120 and starts["Dr. Free"] == sorted(set(starts["Dr. Free"]))
+    assert starts["Dr. Free"][-1] == "2025-10-22T09:30:00Z"  # 16 slots per weekday: 7.5 days
+    assert starts["Dr. Slots"] == [t for t in starts["Dr. Free"] if t != "2025-10-13T07:00:00Z"] + ["2025-10-22T10:00:00Z"]
+    assert client.get("/api/appointments/slots", params={"clinician": "Dr. Free", "limit": 0}).status_code == 422
+
+    r = client.get("/api/appointments/slots", params={"clinician": "Dr. Slots", "date_from": "2025-10-14", "date_to": "2025-10-13"})
+    assert r.status_code == 400
+    r = client.get("/api/appointments/slots")
+    assert r.status_code == 422
+
+    client.delete(f"/api/appointments/id/{booked['id']}")
+
+
+def test_concurrent_overlapping_bookings_exactly_one_wins():
+    import asyncio
+
+    import httpx
+
+    async def storm():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            requests = [
+                ac.post("/api/appointments", json={
+                    "patient_name": f"P{i}",
+                    "clinician": "Dr. Race",
+                    # Every booking overlaps every other one (all cover 10:00-10:05).
+                    "starts_at": f"2025-12-01T09:{i % 60:02d}:00Z",
+                    "ends_at": "2025-12-01T10:05:00Z",
+                })
+                for i in range(300)
+            ]
+            return await asyncio.gather(*requests)
+
+    responses = asyncio.run(storm())
+    codes = [r.status_code for r in responses]
+    assert codes.count(200) == 1, codes
+    assert codes.count(409) == 299
+
+    winner = next(r.json() for r in responses if r.status_code == 200)
+    r = client.put(f"/api/appointments/id/{winner['id']}", json={"ends_at": "2025-12-01T10:30:00Z"})
+    assert r.status_code == 200 and r.json()["ends_at"] == "2025-12-01T10:30:00Z"
+    r = client.put(f"/api/appointments/id/{winner['id']}", json={"starts_at": "2025-12-01T11:00:00Z"})
+    assert r.status_code == 400  # starts after ends
+    assert client.put("/api/appointments/id/999999", json={"patient_name": "X"}).status_code == 404
+
+
+def test_bulk_create_reports_per_row_results():
+    existing = client.post("/api/appointments", json={
+        "patient_name": "Existing", "clinician": "Dr. Bulk",
+        "starts_at": "2025-12-02T09:00:00Z", "ends_at": "2025-12-02T09:30:00Z",
+    })
+    assert existing.status_code == 200, existing.text
+
+    def row(clinician, start, end):
+        return {"patient_name": "P", "clinician": clinician,
+                "starts_at": f"2025-12-02T{start}:00Z", "ends_at": f"2025-12-02T{end}:00Z"}
+
+    rows = [
+        row("Dr. Bulk", "10:00", "10:30"),   # 0 created
+        row("Dr. Bulk", "09:15", "09:45"),   # 1 conflicts with the existing booking
+        row("Dr. Bulk", "10:15", "10:45"),   # 2 overlaps row 0
+        row("Dr. Bulk", "09:45", "10:00"),   # 3 created (touches both neighbours)
+        row("Dr. Bulk2", "09:15", "09:45"),  # 4 created (other clinician)
+        row("Dr. Bulk2", "11:00", "10:00"),  # 5 invalid
+    ]
+    r = client.post("/api/appointments/bulk", json={"appointments": rows})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    statuses = [res["status"] for res in body["results"]]
+    assert statuses == ["created", "conflict", "conflict", "created", "created", "invalid"]
+    assert body["results"][2]["detail"] == "Overlaps row 0 of this request"
+    assert (body["created"], body["rejected"]) == (3, 3)
+
+    for res in body["results"]:
+        if res["status"] == "created":
+            got = client.get(f"/api/appointments/id/{res['id']}").json()
+            assert got["starts_at"] == rows[res["index"]]["starts_at"]
+    # Bulk rows are visible to later single bookings.
+    assert client.post("/api/appointments", json=row("Dr. Bulk", "10:20", "10:25")).status_code == 409
+
+
+def test_bulk_create_reports_malformed_rows_per_row():
+    good = {"patient_name": "P", "clinician": "Dr. Malformed",
+            "starts_at": "2025-12-05T09:00:00Z", "ends_at": "2025-12-05T09:30:00Z"}
+    rows = [
+        good,
+        {**good, "starts_at": "05/12/2025 10:00"},
+        {k: v for k, v in good.items() if k != "clinician"},
+        {**good, "starts_at": "2025-12-05T10:00:00Z", "ends_at": "2025-12-05T10:30:00Z"},
+    ]
+    r = client.post("/api/appointments/bulk", json={"appointments": rows})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [res["status"] for res in body["results"]] == ["created", "invalid", "invalid", "created"]
+    assert body["results"][1]["detail"].startswith("starts_at: ")
+    assert "ISO8601" in body["results"][1]["detail"]
+    assert body["results"][2]["detail"].startswith("clinician: ")
+    assert (body["created"], body["rejected"]) == (2, 2)
+    assert client.post("/api/appointments/bulk", json={"appointments": []}).status_code == 422
+
+
+def test_bulk_create_many_rows():
+    rows = [
+        {"patient_name": f"P{k}", "clinician": f"Dr. Many{k % 20}",
+         "starts_at": f"2025-12-03T{8 + (k // 20) // 2:02d}:{(k // 20) % 2 * 30:02d}:00Z",
+         "ends_at": f"2025-12-03T{8 + (k // 20) // 2:02d}:{(k // 20) % 2 * 30 + 30 - 1:02d}:00Z"}
+        for k in range(400)
+    ]
+    r = client.post("/api/appointments/bulk", json={"appointments": rows})
+    assert r.status_code == 200, r.text
+    assert r.json()["created"] == 400
+    assert len({res["id"] for res in r.json()["results"]}) == 400
+
+
+def test_times_are_normalised_to_utc_and_compared_as_epochs():
+    r = client.post("/api/appointments", json={
+        "patient_name": "Offset", "clinician": "Dr. Offset",
+        "starts_at": "2025-12-04T11:00:00+02:00", "ends_at": "2025-12-04T09:30:00",
+    })
+    assert r.status_code == 200, r.text
+    assert (r.json()["starts_at"], r.json()["ends_at"]) == ("2025-12-04T09:00:00Z", "2025-12-04T09:30:00Z")
+
+    # Same instant written with another offset still conflicts.
+    r = client.post("/api/appointments", json={
+        "patient_name": "Clash", "clinician": "Dr. Offset",
+        "starts_at": "2025-12-04T04:15:00-05:00", "ends_at": "2025-12-04T04:45:00-05:00",
+    })
+    assert r.status_code == 409
+
+    r = client.get("/api/appointments", params={"clinician": "Dr. Offset", "start_from": "2025-12-04T10:59:00+02:00"})
+    assert [a["patient_name"] for a in r.json()] == ["Offset"]
+    r = client.get("/api/appointments", params={"clinician": "Dr. Offset", "start_from": "2025-12-04T11:01:00+02:00"})
+    assert r.json() == []
+    assert client.get("/api/appointments", params={"start_from": "yesterday"}).status_code == 400
+
+    r = client.post("/api/appointments", json={
+        "patient_name": "Bad", "clinician": "Dr. Offset", "starts_at": "not a time", "ends_at": "2025-12-04T10:00:00Z",
+    })
+    assert r.status_code == 422
+
+
+def test_legacy_text_rows_are_migrated_to_epochs(tmp_path):
+    import asyncio
+    import sqlite3
+
+    import aiosqlite
+
+    from app.db import migrate_appointment_epochs
+    from app.db_adapter import SQLiteConnection
+
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE appointments (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_name TEXT NOT NULL,"
+        " clinician TEXT NOT NULL, starts_at TEXT NOT NULL, ends_at TEXT NOT NULL, CHECK (starts_at < ends_at))"
+    )
+    conn.executemany(
+        "INSERT INTO appointments (patient_name, clinician, starts_at, ends_at) VALUES (?, ?, ?, ?)",
+        [
+            ("A", "DR", "2025-10-13T09:00:00+02:00", "2025-10-13T09:30:00+02:00"),
+            ("B", "DR", "2025-10-13T08:00:00Z", "2025-10-13T08:30:00Z"),
+            ("C", "DR", "garbage", "more garbage"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    async def migrate():
+        async with aiosqlite.connect(path) as db:
+            filled = await migrate_appointment_epochs(SQLiteConnection(db))
+            await db.commit()
+            return filled
+
+    assert asyncio.run(migrate()) == 2
+    rows = sqlite3.connect(path).execute(
+        "SELECT patient_name, starts_at, starts_epoch, ends_epoch FROM appointments ORDER BY id"
+    ).fetchall()
+    assert rows[0] == ("A", "2025-10-13T07:00:00Z", 1760338800, 1760340600)
+    assert rows[1][2] == 1760342400
+    assert rows[2][2:] == (None, None)
+    assert asyncio.run(migrate()) == 0
+
+
+def test_create_and_update_without_returning(monkeypatch):
+    # SQLite before 3.35 has no RETURNING; writes take the check-then-write path.
+    from app.db_adapter import SQLiteConnection
+
+    monkeypatch.setattr(SQLiteConnection, "supports_returning", False)
+    base = {"patient_name": "Old SQLite", "clinician": "Dr. NoReturning"}
+    r = client.post("/api/appointments", json={**base, "starts_at": "2025-12-01T09:00:00Z", "ends_at": "2025-12-01T09:30:00Z"})
+    assert r.status_code == 200, r.text
+    a_id = r.json()["id"]
+    r = client.post("/api/appointments", json={**base, "starts_at": "2025-12-01T10:00:00Z", "ends_at": "2025-12-01T10:30:00Z"})
+    assert r.status_code == 200, r.text
+    b_id = r.json()["id"]
+
+    r = client.put(f"/api/appointments/id/{a_id}", json={"patient_name": "Renamed"})
+    assert r.status_code == 200, r.text
+    assert r.json()["patient_name"] == "Renamed"
+    r = client.put(f"/api/appointments/id/{a_id}", json={"starts_at": "2025-12-01T11:00:00Z", "ends_at": "2025-12-01T11:30:00Z"})
+    assert r.status_code == 200, r.text
+    assert client.get(f"/api/appointments/id/{a_id}").json()["starts_at"] == "2025-12-01T11:00:00Z"
+
+    # Conflict detected by the SQL check, not the schedule index.
+    schedule_index.remove(b_id)
+    r = client.put(f"/api/appointments/id/{a_id}", json={"starts_at": "2025-12-01T10:15:00Z", "ends_at": "2025-12-01T10:45:00Z"})
+    assert r.status_code == 409, r.text
+    assert client.put("/api/appointments/id/999999999", json={"patient_name": "x"}).status_code == 404
+
+
+def test_migrated_table_enforces_epoch_rules(tmp_path):
+    # ALTER TABLE cannot add NOT NULL/CHECK; init_db adds triggers instead.
+    import asyncio
+    import sqlite3
+
+    import pytest
+
+    from app.config import get_settings
+    from app.db import init_db
+
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE appointments (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_name TEXT NOT NULL,"
+        " clinician TEXT NOT NULL, starts_at TEXT NOT NULL, ends_at TEXT NOT NULL, CHECK (starts_at < ends_at))"
+    )
+    conn.execute("INSERT INTO appointments (patient_name, clinician, starts_at, ends_at)"
+                 " VALUES ('A', 'DR', '2025-10-13T09:00:00Z', '2025-10-13T09:30:00Z')")
+    conn.commit()
+    conn.close()
+
+    settings = get_settings()
+    original = settings.sqlite_path
+    settings.sqlite_path = path
+    try:
+        asyncio.run(init_db())
+    finally:
+        settings.sqlite_path = original
+
+    conn = sqlite3.connect(path)
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO appointments (patient_name, clinician, starts_at, ends_at)"
+                     " VALUES ('B', 'DR', '2025-10-14T09:00:00Z', '2025-10-14T09:30:00Z')")
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE appointments SET ends_epoch = starts_epoch")
+    conn.execute("UPDATE appointments SET ends_epoch = ends_epoch + 60")
+    conn.close()
+
+
+def test_create_rejects_empty_interval():
+    r = client.post("/api/appointments", json={"patient_name": "Z", "clinician": "Dr. Zero",
+                                               "starts_at": "2025-12-02T09:00:00Z", "ends_at": "2025-12-02T09:00:00Z"})
+    assert r.status_code == 400, r.text
+
+
+def test_mysql_init_failures_are_logged(monkeypatch, caplog):
+    import asyncio
+
+    import pytest
+
+    import app.db as db_module
+
+    # get_db serves SQLite here: the migration succeeds, then the
+    # information_schema query fails and is only logged.
+    with caplog.at_level("ERROR", logger="app.db"):
+        asyncio.run(db_module._init_mysql_appointments())
+    assert "index setup failed" in caplog.text
+
+    async def broken(db):
+        raise RuntimeError("ALTER TABLE denied")
+
+    monkeypatch.setattr(db_module, "migrate_appointment_epochs", broken)
+    with caplog.at_level("ERROR", logger="app.db"), pytest.raises(RuntimeError):
+        asyncio.run(db_module._init_mysql_appointments())
+    assert "epoch migration failed" in caplog.text
+
+
+def test_foreign_appointments_table_is_left_alone(tmp_path, monkeypatch, caplog):
+    # Same shape as the data-engineer MySQL schema's `appointments`.
+    import asyncio
+    import sqlite3
+
+    import aiosqlite
+
+    import app.db as db_module
+    from app.db_adapter import SQLiteConnection
+
+    path = str(tmp_path / "foreign.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE appointments (appointment_id INTEGER PRIMARY KEY, patient_id INTEGER NOT NULL,"
+        " department TEXT, appointment_date TEXT, appointment_time TEXT, status TEXT)"
+    )
+    conn.commit()
+    conn.close()
+
+    async def migrate():
+        async with aiosqlite.connect(path) as db:
+            return await db_module.migrate_appointment_epochs(SQLiteConnection(db))
+
+    with caplog.at_level("WARNING", logger="app.db"):
+        assert asyncio.run(migrate()) == 0
+    assert "epoch migration skipped" in caplog.text
+    columns = {r[1] for r in sqlite3.connect(path).execute("PRAGMA table_info(appointments)")}
+    assert "starts_epoch" not in columns and "ends_epoch" not in columns
+
+    async def foreign_columns(db):
+        return {"appointment_id", "patient_id", "appointment_date"}
+
+    async def must_not_run(db):
+        raise AssertionError("migration ran on a foreign table")
+
+    monkeypatch.setattr(db_module, "_appointment_columns", foreign_columns)
+    monkeypatch.setattr(db_module, "migrate_appointment_epochs", must_not_run)
+    caplog.clear()
+    with caplog.at_level("WARNING", logger="app.db"):
+        asyncio.run(db_module._init_mysql_appointments())
+    assert "not the app's schema" in caplog.text
@@ -0,0 +1,79 @@
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from app.api.routes import auth
+from app.config import get_settings
+from app.main import app
+from app.security import create_access_token
+
+client = TestClient(app)
+
+
+def _stored_hash(email: str) -> str:
+    conn = sqlite3.connect(get_settings().sqlite_path)
+    try:
+        return conn.execute("SELECT password_hash FROM users WHERE email = ?", (email,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_login_rehashes_when_iterations_change(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "password_hash_iterations", 1_000)
+    r = client.post("/api/auth/register", json={"email": "Rehash@Example.org", "password": "secret123"})
+    assert r.status_code == 200
+    assert _stored_hash("rehash@example.org").startswith("pbkdf2_sha256$1000$")
+
+    assert client.post("/api/auth/login", json={"email": "rehash@example.org", "password": "wrong123"}).status_code == 401
+
+    monkeypatch.setattr(settings, "password_hash_iterations", 2_000)
+    r = client.post("/api/auth/login", json={"email": "rehash@example.org", "password": "secret123"})
+    assert r.status_code == 200 and r.json()["access_token"]
+    assert _stored_hash("rehash@example.org").startswith("pbkdf2_sha256$2000$")
+    assert client.post("/api/auth/login", json={"email": "rehash@example.org", "password": "secret123"}).status_code == 200
+
+
+def test_verified_token_cache_shared_by_auth_dependencies():
+    from app.cache import cache_stats
+    from app.security import create_access_token
+
+    token = create_access_token("admin@example.org", role="admin")
+    headers = {"Authorization": f"Bearer {token}"}
+    before = cache_stats()["jwt_claims"]
+    assert client.get("/api/auth/me", headers=headers).json() == {"email": "admin@example.org", "role": "admin"}
+    for _ in range(5):
+        assert client.get("/api/auth/users", headers=headers).status_code == 200
+    after = cache_stats()["jwt_claims"]
+    assert after["hits"] - before["hits"] >= 5
+    assert after["misses"] - before["misses"] == 1
+
+    # Tampered and expired tokens are never served from the cache.
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token[:-2]}xx"}).status_code == 401
+    expired = create_access_token("admin@example.org", role="admin", expires_minutes=-1)
+    r = client.get("/api/auth/me", headers={"Authorization": f"Bearer {expired}"})
+    assert r.status_code == 401 and r.json()["detail"] == "Token expired"
+
+
+def test_users_persist_in_db_and_paginate():
+    for i in range(5):
+        r = client.post("/api/auth/register", json={"email": f"page{i}@example.org", "password": "secret123"})
+        assert r.status_code == 200
+    assert client.post("/api/auth/register", json={"email": "PAGE0@example.org", "password": "secret123"}).status_code == 409
+
+    # Another worker has its own (empty) cache but the same table.
+    auth._users_by_email.clear()
+    assert client.post("/api/auth/login", json={"email": "page3@example.org", "password": "secret123"}).status_code == 200
+
+    headers = {"Authorization": f"Bearer {create_access_token('admin@example.org', role='admin')}"}
+    emails, after = [], None
+    while True:
+        params = {"limit": 2, **({"after": after} if after else {})}
+        r = client.get("/api/auth/users", params=params, headers=headers)
+        assert r.status_code == 200
+        emails += [u["email"] for u in r.json()["users"]]
+        after = r.headers.get("X-Next-Cursor")
+        if not after:
+            break
+    assert [e for e in emails if e.startswith("page")] == [f"page{i}@example.org" for i in range(5)]
+    assert len(emails) == len(set(emails))
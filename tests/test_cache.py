@@ -0,0 +1,23 @@
+from app.cache import TTLCache, cache_stats
+
+
+def test_ttl_cache_lru_ttl_and_generation():
+    cache = TTLCache("test_cache", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)  # evicts "b"
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+    # Expired entries are misses.
+    cache.set("short", 0, ttl=-1)
+    assert cache.get("short") is None
+
+    # A read that started before an invalidation must not store stale data.
+    generation = cache.generation
+    cache.pop("a")
+    cache.set("a", "stale", generation=generation)
+    assert cache.get("a") is None
+
+    assert cache_stats()["test_cache"]["evictions"] >= 1
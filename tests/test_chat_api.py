@@ -13,4 +13,100 @@ def test_chat_stub_response():
     assert "reply" in data
     # With no configured external AI key, the route should fall back to stub
     assert "hello world" in data["reply"], data
-    assert data["reply"].startswith("[stub]") or data["reply"].startswith("{"), data["reply"]
\ No newline at end of file
+    assert data["reply"].startswith("[stub]") or data["reply"].startswith("{"), data["reply"]
+
+def test_chat_reuses_shared_http_client(monkeypatch):
+    import httpx
+    from app import http_client
+    from app.config import get_settings
+
+    calls = []
+    built = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        return httpx.Response(200, json={"reply": "pong"})
+
+    def build():
+        built.append(1)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(http_client, "_build_client", build)
+    monkeypatch.setattr(get_settings(), "ai_service_url", "http://ai.local")
+    with TestClient(app) as c:
+        for i in range(3):
+            r = c.post("/api/chat", json={"prompt": f"ping {i}"})
+            assert r.json() == {"reply": "pong"}
+    assert len(calls) == 3
+    assert len(built) == 1
+
+
+def test_chat_stream_relays_openai_tokens_as_sse(monkeypatch):
+    import httpx
+    from app import http_client
+    from app.config import get_settings
+
+    upstream = (
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=upstream.encode())
+
+    monkeypatch.setattr(http_client, "_build_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(get_settings(), "ai_service_url", "http://ai.local/v1")
+    with TestClient(app) as c:
+        r = c.post("/api/chat/stream", json={"prompt": "hi"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert requests[0]["stream"] is True
+    assert r.text == (
+        'data: {"delta": "Hel"}\n\n'
+        'data: {"delta": "lo"}\n\n'
+        'event: done\ndata: {"reply_len": 5}\n\n'
+    )
+
+
+def test_chat_stream_falls_back_to_stub():
+    r = client.post("/api/chat/stream", json={"prompt": "hello stream"})
+    assert r.status_code == 200
+    assert "[stub] VitalAI received: hello stream" in r.text
+    assert r.text.endswith("event: done\ndata: {\"reply_len\": 37}\n\n")
+
+
+def test_chat_reply_cache_normalises_prompts_and_can_be_bypassed(monkeypatch):
+    import httpx
+    from app import http_client
+    from app.api.routes import chat as chat_module
+    from app.config import get_settings
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": "Mon-Fri 08:00-16:00"}}],
+            "usage": {"total_tokens": 42},
+        })
+
+    monkeypatch.setattr(http_client, "_build_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(get_settings(), "ai_service_url", "http://cache.local/v1")
+    saved_before = chat_module._reply_cache.counters["tokens_saved"]
+    with TestClient(app) as c:
+        r = c.post("/api/chat", json={"prompt": "Clinic hours?"})
+        assert r.headers["X-Chat-Cache"] == "MISS"
+        r = c.post("/api/chat", json={"prompt": "  clinic   HOURS? "})
+        assert r.headers["X-Chat-Cache"] == "HIT"
+        assert r.json() == {"reply": "Mon-Fri 08:00-16:00"}
+        r = c.post("/api/chat/stream", json={"prompt": "clinic hours?"})
+        assert r.headers["X-Chat-Cache"] == "HIT"
+        assert '"delta": "Mon-Fri 08:00-16:00"' in r.text
+        r = c.post("/api/chat", json={"prompt": "Clinic hours?"}, headers={"Cache-Control": "no-cache"})
+        assert r.headers["X-Chat-Cache"] == "BYPASS"
+    assert len(calls) == 2
+    assert chat_module._reply_cache.counters["tokens_saved"] - saved_before == 84
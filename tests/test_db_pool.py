@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+import aiomysql
+import pytest
+
+from app.db_adapter import MySQLConnection, MySQLPool, PoolTimeoutError, SQLitePool
+
+
+def test_sqlite_pool_reuses_and_bounds_connections():
+    async def scenario():
+        pool = SQLitePool(os.environ["SQLITE_PATH"], minsize=1, maxsize=2, acquire_timeout=0.05)
+        await pool.open()
+        assert (pool.size, pool.idle, pool.in_use) == (1, 1, 0)
+
+        first = await pool.acquire()
+        second = await pool.acquire()
+        assert pool.in_use == 2 and pool.idle == 0
+
+        # Pool is exhausted: the next checkout times out instead of opening a third connection.
+        with pytest.raises(PoolTimeoutError):
+            await pool.acquire()
+
+        await pool.release(first)
+        again = await pool.acquire()
+        assert again is first
+        assert pool.size == 2
+
+        await pool.release(again)
+        await pool.release(second)
+        assert pool.idle == 2 and pool.in_use == 0
+        await pool.close()
+        assert pool.size == 0
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_pool_applies_pragma_profile():
+    async def scenario():
+        pragmas = {"busy_timeout": 1234, "synchronous": "NORMAL", "temp_store": "MEMORY"}
+        pool = SQLitePool(os.environ["SQLITE_PATH"], minsize=0, maxsize=1, pragmas=pragmas)
+        conn = await pool.acquire()
+        try:
+            async with conn.execute("PRAGMA busy_timeout") as cur:
+                assert (await cur.fetchone())[0] == 1234
+            async with conn.execute("PRAGMA synchronous") as cur:
+                assert (await cur.fetchone())[0] == 1  # NORMAL
+            async with conn.execute("PRAGMA temp_store") as cur:
+                assert (await cur.fetchone())[0] == 2  # MEMORY
+        finally:
+            await pool.release(conn)
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+class _InnoDBConnection:
+    """Just the state aiomysql's pool inspects, after a read-only request.
+
+    With autocommit off, the SELECT left an implicit transaction open.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self.in_transaction = True
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.in_transaction
+
+    async def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_mysql_pool_keeps_connection_after_read_only_request():
+    async def scenario():
+        raw = aiomysql.Pool(minsize=0, maxsize=1, echo=False, pool_recycle=-1, loop=asyncio.get_running_loop())
+        pool = MySQLPool(raw)
+        conn = _InnoDBConnection()
+        raw._used.add(conn)
+
+        await pool.release(conn)
+        assert conn.rollbacks == 1 and not conn.closed
+        assert pool.idle == 1 and pool.in_use == 0
+        assert raw._free[0] is conn
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_MYSQL_URL"), reason="TEST_MYSQL_URL not set")
+def test_mysql_pool_reuses_connection_after_select():
+    async def scenario():
+        pool = await MySQLPool.create(os.environ["TEST_MYSQL_URL"], minsize=0, maxsize=1, acquire_timeout=5, recycle=-1)
+        try:
+            first = await pool.acquire()
+            assert await MySQLConnection(first).fetchone("SELECT 1") == (1,)
+            await pool.release(first)
+            again = await pool.acquire()
+            assert again is first and not again.closed
+            await pool.release(again)
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
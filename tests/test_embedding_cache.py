@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    """Deterministic stand-in for `SentenceTransformer.encode`."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        self.calls.append(list(texts))
+        return np.array([[len(t) + i for i in range(self.dim)] for t in texts], dtype=np.float32)
+
+
+def test_empty_batch_returns_empty_matrix():
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(encoder, "ns")
+    out = cache.encode([])
+    assert out.shape == (0, 8) and out.dtype == np.float32
+    cache.encode(["fever"])
+    assert cache.encode([]).shape == (0, 8)
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 1
+
+
+def test_unseen_texts_encoded_once(tmp_path):
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(encoder, "ns", store_dir=str(tmp_path))
+    first = cache.encode(["fever", "cough", "fever"])
+    assert encoder.calls == [["fever", "cough"]]
+    np.testing.assert_array_equal(first[0], first[2])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # A new process (empty memory) reads the disk store instead of encoding.
+    reopened = EmbeddingCache(encoder, "ns", store_dir=str(tmp_path))
+    np.testing.assert_array_equal(reopened.encode(["cough", "fever"]), first[[1, 0]])
+    assert len(encoder.calls) == 1
+    assert reopened.encode([]).shape == (0, 8)
+
+
+def test_counters_are_consistent_across_threads():
+    cache = EmbeddingCache(CountingEncoder(), "ns")
+    texts = [f"symptom {i % 20}" for i in range(50)]
+
+    def worker():
+        for _ in range(20):
+            cache.encode(texts)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.hits + cache.misses == 8 * 20 * len(texts)
+
+
+def test_memory_entries_do_not_pin_their_batch():
+    cache = EmbeddingCache(CountingEncoder(dim=4), "ns", maxsize=3)
+    cache.encode([f"text {i}" for i in range(100)])
+    assert len(cache._memory) == 3
+    for vec in cache._memory.values():
+        assert vec.base is None and vec.nbytes == 4 * 4
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from embedding_quant import EmbeddingCodec
+
+
+def _embeddings(n: int = 2000, dim: int = 384, seed: int = 0) -> np.ndarray:
+    """Unit vectors near a low-dimensional subspace, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(n, 32)) @ rng.normal(size=(32, dim))
+    X = latent + 0.5 * rng.normal(size=(n, dim))
+    return (X / np.linalg.norm(X, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return a @ b.T
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def test_float32_is_identity():
+    X = _embeddings(50)
+    codec = EmbeddingCodec().fit(X)
+    assert codec.identity and codec.tag == "f32"
+    np.testing.assert_array_equal(codec.decode(codec.encode(X)), X)
+
+
+def test_float16_round_trip_error():
+    X = _embeddings()
+    codec = EmbeddingCodec("float16").fit(X)
+    codes = codec.encode(X)
+    assert codes.dtype == np.float16 and codes.nbytes == X.nbytes // 2
+    decoded = codec.decode(codes)
+    assert decoded.dtype == np.float32
+    # Half precision keeps 11 significant bits: relative error <= 2**-11.
+    assert np.all(np.abs(decoded - X) <= np.abs(X) * 2.0**-11 + 1e-7)
+
+
+def test_int8_round_trip_error():
+    X = _embeddings()
+    codec = EmbeddingCodec("int8").fit(X)
+    codes = codec.encode(X)
+    assert codes.dtype == np.int8 and codes.nbytes == X.nbytes // 4
+    # Within the fitted range, rounding costs at most half a step per dimension.
+    assert np.all(np.abs(codec.decode(codes) - X) <= codec.scale / 2 + 1e-7)
+    # Values beyond the range are clipped to it, not wrapped.
+    assert np.all(np.abs(codec.decode(codec.encode(3 * X))) <= 127 * codec.scale + 1e-6)
+
+
+def test_pca_round_trip_error():
+    pytest.importorskip("sklearn")
+    X = _embeddings()
+    for dtype in ("float32", "float16", "int8"):
+        codec = EmbeddingCodec(dtype, n_components=64).fit(X)
+        codes = codec.encode(X)
+        assert codes.shape == (len(X), 64)
+        assert codec.bytes_per_vector() == 64 * np.dtype(dtype).itemsize
+        projected = codec.pca.transform(X).astype(np.float32)
+        step = codec.scale / 2 if dtype == "int8" else np.abs(projected) * 2.0**-11
+        assert np.all(np.abs(codec.decode(codes) - projected) <= step + 1e-6)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_cosine_ranking_is_preserved(dtype):
+    X = _embeddings()
+    queries, corpus = X[:100], X[100:]
+    codec = EmbeddingCodec(dtype).fit(corpus)
+    exact = _cosine(queries, corpus)
+    approx = _cosine(codec.decode(codec.encode(queries)), codec.decode(codec.encode(corpus)))
+
+    assert np.abs(approx - exact).max() < (1e-3 if dtype == "float16" else 2e-2)
+    top_exact, top_approx = _top_k(exact, 10), _top_k(approx, 10)
+    assert np.mean(top_exact[:, 0] == top_approx[:, 0]) >= 0.95
+    overlap = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(top_exact, top_approx)])
+    assert overlap >= 0.9
+
+
+def test_pca_keeps_cosine_ranking():
+    pytest.importorskip("sklearn")
+    X = _embeddings()
+    queries, corpus = X[:100], X[100:]
+    codec = EmbeddingCodec("int8", n_components=64).fit(corpus)
+    exact = _top_k(_cosine(queries, corpus), 10)
+    approx = _top_k(_cosine(codec.decode(codec.encode(queries)), codec.decode(codec.encode(corpus))), 10)
+    assert np.mean([len(set(a) & set(b)) / 10 for a, b in zip(exact, approx)]) >= 0.85
+
+
+def test_tag_tracks_fitted_parameters():
+    X = _embeddings(200)
+    a = EmbeddingCodec("int8").fit(X)
+    b = EmbeddingCodec("int8").fit(X * 0.5)
+    assert a.tag != b.tag and a.tag.startswith("int8-full-")
+    assert EmbeddingCodec("float16").fit(X).tag != a.tag
+    with pytest.raises(ValueError):
+        EmbeddingCodec("bfloat16")
@@ -39,4 +39,51 @@ def test_faq_crud_flow():
 
     # Ensure deleted
     r = client.get(f"/api/faq/id/{faq_id}")
-    assert r.status_code == 404
\ No newline at end of file
+    assert r.status_code == 404
+
+def test_faq_search_is_ranked_prefix_and_stays_in_sync():
+    a = client.post("/api/faq", json={"question": "Where is the pharmacy located?", "answer": "Ground floor, east wing."}).json()
+    b = client.post("/api/faq", json={"question": "Can I park here?", "answer": "Ask the pharmacy desk for a parking voucher."}).json()
+
+    # Prefix match ("pharm" -> "pharmacy"); question hits rank above answer hits.
+    r = client.get("/api/faq", params={"q": "pharm"})
+    assert r.status_code == 200
+    ids = [item["id"] for item in r.json()]
+    assert ids.index(a["id"]) < ids.index(b["id"])
+    assert r.headers["X-Total-Count"] == str(len(ids))
+
+    # Every word must match.
+    r = client.get("/api/faq", params={"q": "pharmacy voucher"})
+    assert [item["id"] for item in r.json()] == [b["id"]]
+
+    # Updates and deletes are reflected in the search index.
+    client.put(f"/api/faq/id/{b['id']}", json={"answer": "Street parking only."})
+    r = client.get("/api/faq", params={"q": "voucher"})
+    assert r.json() == [] and r.headers["X-Total-Count"] == "0"
+    client.delete(f"/api/faq/id/{a['id']}")
+    r = client.get("/api/faq", params={"q": "pharmacy"})
+    assert all(item["id"] != a["id"] for item in r.json())
+    client.delete(f"/api/faq/id/{b['id']}")
+
+    # Punctuation-only queries match nothing rather than erroring.
+    r = client.get("/api/faq", params={"q": "?!"})
+    assert r.status_code == 200 and r.json() == []
+
+
+def test_faq_cursor_pagination():
+    r = client.get("/api/faq", params={"limit": 100})
+    total = int(r.headers["X-Total-Count"])
+    all_ids = [item["id"] for item in r.json()]
+
+    seen = []
+    params = {"limit": 1}
+    while True:
+        r = client.get("/api/faq", params=params)
+        seen.extend(item["id"] for item in r.json())
+        if "X-Next-Cursor" not in r.headers:
+            break
+        params["after"] = r.headers["X-Next-Cursor"]
+    assert seen == all_ids and len(seen) == total
+
+    r = client.get("/api/faq", params={"q": "hours", "after": params.get("after", "MQ")})
+    assert r.status_code == 400
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from micro_batcher import MicroBatcher, QueueFullError
+
+
+def test_results_come_back_in_order_across_batches():
+    seen = []
+
+    def process(items):
+        seen.append(list(items))
+        return [x * 10 for x in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(scenario()) == [i * 10 for i in range(10)]
+    assert [len(b) for b in seen] == [4, 4, 2]
+    assert [x for b in seen for x in b] == list(range(10))
+
+
+def test_full_batch_flushes_without_waiting():
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items, max_batch_size=3, max_wait_ms=5000)
+        started = time.perf_counter()
+        await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        elapsed = time.perf_counter() - started
+        await batcher.stop()
+        return elapsed, batcher.batches
+
+    elapsed, batches = asyncio.run(scenario())
+    assert elapsed < 1.0 and batches == 1
+
+
+def test_partial_batch_flushes_after_max_wait():
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items, max_batch_size=32, max_wait_ms=50)
+        started = time.perf_counter()
+        assert await batcher.submit("only") == "only"
+        elapsed = time.perf_counter() - started
+        await batcher.stop()
+        return elapsed
+
+    assert 0.04 <= asyncio.run(scenario()) < 1.0
+
+
+def test_exception_reaches_every_waiter():
+    def process(items):
+        raise ValueError("model failed")
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)), return_exceptions=True)
+        # The worker survives a failed batch.
+        batcher.process = lambda items: items
+        assert await batcher.submit("next") == "next"
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(results) == 5 and all(isinstance(r, ValueError) for r in results)
+
+
+def test_queue_bound():
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items, max_batch_size=1, max_wait_ms=0, max_queue=1)
+        batcher.start()
+        first = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0)  # let `first` enqueue before the worker takes it
+        with pytest.raises(QueueFullError):
+            await batcher.submit(2)
+        assert await first == 1
+        await batcher.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_batch_in_flight():
+    release = threading.Event()
+
+    def process(items):
+        release.wait(5)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=0)
+        waiters = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)  # first batch is in `process`, the third item queued
+        await asyncio.wait_for(batcher.stop(), 1)
+        release.set()
+        done, pending = await asyncio.wait(waiters, timeout=1)
+        return done, pending
+
+    done, pending = asyncio.run(scenario())
+    assert not pending
+    assert all(w.cancelled() for w in done)
@@ -0,0 +1,257 @@
+"""Query-plan regression tests for the appointment and FAQ routes.
+
+Every statement the routes send is captured while a scripted set of requests
+runs, then `EXPLAIN QUERY PLAN` is taken for it on a separate database with
+the app schema and a seeded dataset (`ANALYZE`d, so the planner sees
+realistic statistics). A plan step that scans a whole table or index, or
+sorts with a temp B-tree, fails the test unless it is one of the shapes in
+`ALLOWED`, each of which states why the scan is bounded or inherent.
+
+`test_mysql_plans` runs the same statements through MySQL `EXPLAIN` when
+`TEST_MYSQL_URL` points at a MySQL-compatible server holding the app tables;
+it is skipped otherwise.
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.db import init_db
+from app.db_adapter import SQLiteConnection
+from app.main import app
+
+client = TestClient(app)
+
+SEED_APPOINTMENTS = 20_000
+SEED_CLINICIANS = 200
+SEED_FAQS = 2_000
+BASE = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+# (reason, statement pattern, plan-step pattern): a plan step matching a
+# "scan" rule is accepted only when both patterns match.
+ALLOWED = [
+    (
+        "X-Total-Count without filters has to count every row (include_total=false skips it)",
+        r"^SELECT COUNT\(\*\) FROM (appointments|faq)$",
+        r"^SCAN (appointments|faq)( USING COVERING INDEX \w+)?$",
+    ),
+    (
+        "unfiltered pages walk the table/index in output order and stop after OFFSET + LIMIT rows",
+        r"^SELECT .* FROM (appointments|faq) ORDER BY \w+(, id)? LIMIT \? OFFSET \?$",
+        r"^SCAN (appointments|faq)( USING INDEX idx_appointments_schedule)?$",
+    ),
+    (
+        "the schedule index is built from every booking at startup, in index order",
+        r"^SELECT id, clinician, starts_epoch, ends_epoch FROM appointments WHERE starts_epoch IS NOT NULL ORDER BY clinician, starts_epoch$",
+        r"^SCAN appointments USING COVERING INDEX idx_appointments_clinician_schedule$",
+    ),
+    (
+        "search results are ranked by bm25, which is only known after matching",
+        r"ORDER BY bm25\(",
+        r"^USE TEMP B-TREE FOR ORDER BY$",
+    ),
+]
+
+# Plan steps that read a whole table/index or sort an unbounded result.
+SCAN_STEP = re.compile(r"^(SCAN (?!\w+ VIRTUAL TABLE|CONSTANT ROW)|USE TEMP B-TREE)")
+
+
+def _flat(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def plan_problems(sql: str, plan: list[str]) -> list[str]:
+    """Plan steps of `sql` that scan and are not covered by `ALLOWED`."""
+    flat = _flat(sql)
+    problems = []
+    for step in plan:
+        if SCAN_STEP.match(step) and not any(
+            re.search(stmt, flat) and re.search(step_pattern, step) for _, stmt, step_pattern in ALLOWED
+        ):
+            problems.append(step)
+    return problems
+
+
+@contextmanager
+def captured_statements():
+    """Record `(sql, params)` of every statement the routes execute."""
+    seen: dict[str, tuple] = {}
+    originals = {}
+
+    def wrap(name):
+        original = getattr(SQLiteConnection, name)
+        originals[name] = original
+
+        async def recorder(self, sql, params=(), *args, **kwargs):
+            if name == "executemany":
+                params = list(params)
+                seen.setdefault(sql, tuple(params[0]) if params else ())
+            else:
+                params = tuple(params)
+                seen.setdefault(sql, params)
+            return await original(self, sql, params, *args, **kwargs)
+
+        setattr(SQLiteConnection, name, recorder)
+
+    for name in ("fetchone", "fetchall", "execute", "executemany", "insert"):
+        wrap(name)
+    try:
+        yield seen
+    finally:
+        for name, original in originals.items():
+            setattr(SQLiteConnection, name, original)
+
+
+def exercise_routes() -> None:
+    """One request per query shape in appointments.py and faq.py."""
+    def appt(name, clinician, start, minutes=30):
+        from app.availability import to_iso
+
+        return {"patient_name": name, "clinician": clinician, "starts_at": to_iso(start), "ends_at": to_iso(start + 60 * minutes)}
+
+    day = BASE + 40 * 86400
+    a = client.post("/api/appointments", json=appt("Plan A", "Dr. Plan", day + 9 * 3600)).json()
+    assert client.post("/api/appointments", json=appt("Plan B", "Dr. Plan", day + 9 * 3600)).status_code == 409
+    client.put(f"/api/appointments/id/{a['id']}", json={"starts_at": appt("", "", day + 10 * 3600)["starts_at"],
+                                                        "ends_at": appt("", "", day + 10 * 3600)["ends_at"]})
+    client.put(f"/api/appointments/id/{a['id']}", json={"patient_name": "Plan A2"})
+    client.put("/api/appointments/id/999999999", json={"patient_name": "nobody"})
+    client.get(f"/api/appointments/id/{a['id']}")
+    client.post("/api/appointments/bulk", json={"appointments": [
+        appt("Bulk 1", "Dr. Plan", day + 11 * 3600), appt("Bulk 2", "Dr. Plan2", day + 11 * 3600),
+    ]})
+
+    start_from = appt("", "", day)["starts_at"]
+    end_to = appt("", "", day + 86400)["ends_at"]
+    for params in (
+        {},
+        {"clinician": "Dr. Plan"},
+        {"start_from": start_from},
+        {"end_to": end_to},
+        {"start_from": start_from, "end_to": end_to},
+        {"clinician": "Dr. Plan", "start_from": start_from, "end_to": end_to},
+    ):
+        r = client.get("/api/appointments", params={**params, "limit": 1})
+        assert r.status_code == 200, r.text
+        if r.headers.get("X-Next-Cursor"):
+            client.get("/api/appointments", params={**params, "limit": 1, "after": r.headers["X-Next-Cursor"]})
+    client.get("/api/appointments/slots", params=[("clinician", "Dr. Plan"), ("clinician", "Dr. Plan2"),
+                                                  ("date_from", "2036-02-12"), ("date_to", "2036-02-14")])
+    client.delete(f"/api/appointments/id/{a['id']}")
+    client.delete("/api/appointments/id/999999999")
+
+    faq = client.post("/api/faq", json={"question": "Plan question?", "answer": "Plan answer"}).json()
+    client.get(f"/api/faq/id/{faq['id']}")
+    client.put(f"/api/faq/id/{faq['id']}", json={"answer": "Plan answer 2"})
+    r = client.get("/api/faq", params={"limit": 1})
+    client.get("/api/faq", params={"limit": 1, "after": r.headers["X-Next-Cursor"]})
+    client.get("/api/faq", params={"q": "plan answer", "limit": 5})
+    client.delete(f"/api/faq/id/{faq['id']}")
+
+
+@pytest.fixture(scope="module")
+def statements():
+    with captured_statements() as seen:
+        exercise_routes()
+    return {sql: params for sql, params in seen.items() if not sql.lstrip().upper().startswith(("BEGIN", "PRAGMA"))}
+
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    """App schema (via `init_db`) plus a seeded, analysed dataset."""
+    from app.availability import to_iso
+
+    path = str(tmp_path_factory.mktemp("plans") / "plans.db")
+    settings = get_settings()
+    original = settings.sqlite_path
+    settings.sqlite_path = path
+    try:
+        asyncio.run(init_db())
+    finally:
+        settings.sqlite_path = original
+
+    conn = sqlite3.connect(path)
+    rows = []
+    for i in range(SEED_APPOINTMENTS):
+        start = BASE + 1800 * (i // SEED_CLINICIANS)
+        rows.append((f"P{i}", f"DR.{i % SEED_CLINICIANS:03d}", to_iso(start), to_iso(start + 1800), start, start + 1800))
+    conn.executemany(
+        "INSERT INTO appointments (patient_name, clinician, starts_at, ends_at, starts_epoch, ends_epoch)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.executemany(
+        "INSERT INTO faq (question, answer) VALUES (?, ?)",
+        [(f"Question {i} about clinic topic {i % 50}?", f"Answer {i} for topic {i % 50}.") for i in range(SEED_FAQS)],
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    yield conn
+    conn.close()
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: tuple) -> list[str]:
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def test_routes_were_exercised(statements):
+    tables = " ".join(statements)
+    for fragment in ("FROM appointments", "INSERT INTO appointments", "UPDATE appointments",
+                     "DELETE FROM appointments", "faq_fts MATCH", "FROM faq", "UPDATE faq", "DELETE FROM faq"):
+        assert fragment in tables, fragment
+
+
+def test_no_full_scans_in_route_queries(statements, seeded_db):
+    failures = []
+    for sql, params in statements.items():
+        plan = explain(seeded_db, sql, params)
+        problems = plan_problems(sql, plan)
+        if problems:
+            failures.append(f"{_flat(sql)}\n    plan: {plan}\n    scans: {problems}")
+    assert not failures, "Full scans in route queries:\n" + "\n".join(failures)
+
+
+def test_plan_checker_flags_scans():
+    assert plan_problems("SELECT * FROM appointments WHERE patient_name = ?", ["SCAN appointments"])
+    assert plan_problems("SELECT id FROM appointments WHERE ends_epoch <= ? ORDER BY starts_epoch",
+                         ["SCAN appointments USING INDEX idx_appointments_schedule"])
+    assert plan_problems("SELECT id FROM faq ORDER BY question", ["SCAN faq", "USE TEMP B-TREE FOR ORDER BY"])
+    assert not plan_problems("SELECT id FROM appointments WHERE clinician = ?",
+                             ["SEARCH appointments USING COVERING INDEX idx_appointments_clinician_schedule (clinician=?)"])
+    assert not plan_problems("SELECT COUNT(*) FROM faq_fts WHERE faq_fts MATCH ?", ["SCAN faq_fts VIRTUAL TABLE INDEX 0:M3"])
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_MYSQL_URL"), reason="TEST_MYSQL_URL not set")
+def test_mysql_plans(statements):
+    """MySQL `EXPLAIN`: no `type=ALL` (full table scan) for portable SELECTs."""
+    import pymysql
+
+    from app.api.routes.faq import _search_sql
+    from app.db_adapter import MySQLConnection, _parse_mysql_url
+
+    queries = {sql: params for sql, params in statements.items()
+               if _flat(sql).startswith("SELECT") and "faq_fts" not in sql}
+    count_sql, search_sql, search_params = _search_sql("mysql", ["clinic"])
+    queries[count_sql] = tuple(search_params[:1])
+    queries[search_sql] = tuple(search_params)
+
+    conn = pymysql.connect(**_parse_mysql_url(os.environ["TEST_MYSQL_URL"]))
+    failures = []
+    try:
+        with conn.cursor(pymysql.cursors.DictCursor) as cur:
+            for sql, params in queries.items():
+                cur.execute("EXPLAIN " + MySQLConnection._conv(sql), params)
+                plan = cur.fetchall()
+                full = [f"{row['table']}: type=ALL" for row in plan if row.get("type") == "ALL"]
+                steps = [f"SCAN {row['table']}" for row in plan if row.get("type") == "ALL"]
+                if full and plan_problems(sql, steps):
+                    failures.append(f"{_flat(sql)}\n    {full}")
+    finally:
+        conn.close()
+    assert not failures, "Full scans in MySQL plans:\n" + "\n".join(failures)
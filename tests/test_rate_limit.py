@@ -0,0 +1,73 @@
+import asyncio
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.rate_limit import MemoryBackend, RedisBackend, rate_limit
+
+
+class FakeRedis:
+    """The slice of the redis.asyncio API the limiter uses."""
+
+    def __init__(self):
+        self.data: dict[str, int] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def decr(self, key):
+        self.data[key] -= 1
+        return self.data[key]
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+
+def _admitted(backend, key, times, limit, window, now):
+    async def run():
+        return [(await backend.hit(key, limit, window, now)).allowed for _ in range(times)]
+
+    return sum(asyncio.run(run()))
+
+
+def test_sliding_window_counts_previous_window():
+    for backend in (MemoryBackend(), RedisBackend(FakeRedis())):
+        assert _admitted(backend, "ip", 15, limit=10, window=60, now=6000) == 10
+        # A quarter into the next window, 75% of the previous 10 still count.
+        assert _admitted(backend, "ip", 5, limit=10, window=60, now=6075) == 2
+        result = asyncio.run(backend.hit("ip", 10, 60, 6075))
+        assert not result.allowed and 0 < result.retry_after <= 45
+        # Two windows later everything has expired.
+        assert _admitted(backend, "ip", 10, limit=10, window=60, now=6200) == 10
+
+
+def test_memory_backend_sweeps_and_bounds_keys():
+    backend = MemoryBackend(sweep_interval=0, max_keys=1000)
+    for i in range(5000):  # flood of distinct IPs
+        backend.hit_sync(f"bot{i}", 5, 60, 6000)
+    assert len(backend) == 1000
+    backend.hit_sync("later", 5, 60, 6200)
+    assert len(backend) == 1
+
+    redis = FakeRedis()
+    asyncio.run(RedisBackend(redis).hit("ip", 5, 60, 6000))
+    assert set(redis.ttls.values()) == {120}
+
+
+def test_rate_limit_dependency_returns_429():
+    app = FastAPI()
+
+    @app.get("/ping", dependencies=[Depends(rate_limit("ping", 2, 60, backend=MemoryBackend()))])
+    def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert [client.get("/ping").status_code for _ in range(3)] == [200, 200, 429]
+    r = client.get("/ping")
+    assert int(r.headers["Retry-After"]) >= 1
+    assert r.headers["X-RateLimit-Limit"] == "2"
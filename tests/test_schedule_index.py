@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+
+from app.availability import to_epoch
+from app.main import app
+from app.schedule_index import ScheduleIndex, schedule_index
+
+client = TestClient(app)
+
+
+def _book(clinician: str, start: str, end: str, name: str = "P"):
+    return client.post(
+        "/api/appointments",
+        json={"patient_name": name, "clinician": clinician, "starts_at": start, "ends_at": end},
+    )
+
+
+def test_conflict_and_busy_lookups():
+    t = to_epoch
+    index = ScheduleIndex()
+    index.add(1, "DR.A", t("2025-11-03T09:00:00Z"), t("2025-11-03T09:30:00Z"))
+    index.add(2, "DR.A", t("2025-11-03T10:00:00Z"), t("2025-11-03T10:30:00Z"))
+    index.add(3, "DR.B", t("2025-11-03T09:00:00Z"), t("2025-11-03T09:30:00Z"))
+
+    assert index.conflict("DR.A", t("2025-11-03T09:15:00Z"), t("2025-11-03T09:45:00Z")) == 1
+    assert index.conflict("DR.A", t("2025-11-03T09:30:00Z"), t("2025-11-03T10:00:00Z")) is None  # touching
+    assert index.conflict("DR.A", t("2025-11-03T08:00:00Z"), t("2025-11-03T11:00:00Z")) is not None
+    assert index.conflict("DR.A", t("2025-11-03T09:00:00Z"), t("2025-11-03T09:30:00Z"), exclude_id=1) is None
+    assert index.conflict("DR.C", t("2025-11-03T09:00:00Z"), t("2025-11-03T09:30:00Z")) is None
+
+    busy = index.busy("DR.A", t("2025-11-03T09:10:00Z"), t("2025-11-03T10:10:00Z"))
+    assert [b[2] for b in busy] == [1, 2]
+
+    # Moving and removing keep the arrays consistent.
+    index.add(1, "DR.B", t("2025-11-03T11:00:00Z"), t("2025-11-03T11:30:00Z"))
+    assert index.conflict("DR.A", t("2025-11-03T09:00:00Z"), t("2025-11-03T09:30:00Z")) is None
+    assert [b[2] for b in index.busy("DR.B", t("2025-11-03T00:00:00Z"), t("2025-11-04T00:00:00Z"))] == [3, 1]
+    index.remove(3)
+    index.remove(1)
+    assert index.stats()["clinicians"] == 1 and len(index) == 1
+
+
+def test_routes_use_and_maintain_the_index():
+    r = _book("Dr. Index", "2025-11-10T09:00:00Z", "2025-11-10T09:30:00Z")
+    assert r.status_code == 200, r.text
+    a_id = r.json()["id"]
+    assert schedule_index.get(a_id)[0] == "Dr. Index"
+
+    hits = schedule_index.hits
+    assert _book("Dr. Index", "2025-11-10T09:15:00Z", "2025-11-10T09:45:00Z").status_code == 409
+    assert schedule_index.hits == hits + 1
+
+    # Moving updates the index; the old slot frees up immediately.
+    r = client.put(f"/api/appointments/id/{a_id}", json={"starts_at": "2025-11-10T10:00:00Z", "ends_at": "2025-11-10T10:30:00Z"})
+    assert r.status_code == 200, r.text
+    assert _book("Dr. Index", "2025-11-10T09:00:00Z", "2025-11-10T09:30:00Z").status_code == 200
+    assert client.put(f"/api/appointments/id/{a_id}", json={"starts_at": "2025-11-10T09:10:00Z"}).status_code == 409
+
+    assert client.delete(f"/api/appointments/id/{a_id}").status_code == 200
+    assert schedule_index.get(a_id) is None
+
+
+def test_stale_index_entry_does_not_block_booking():
+    # An entry the database no longer has (e.g. deleted by another worker).
+    schedule_index.add(10_000_000, "Dr. Ghost", to_epoch("2025-11-11T09:00:00Z"), to_epoch("2025-11-11T09:30:00Z"))
+    stale = schedule_index.stale
+    r = _book("Dr. Ghost", "2025-11-11T09:00:00Z", "2025-11-11T09:30:00Z")
+    assert r.status_code == 200, r.text
+    assert schedule_index.stale == stale + 1
+    assert schedule_index.get(10_000_000) is None
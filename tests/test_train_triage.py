@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+from datetime import datetime as real_datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("joblib")
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+import train_triage  # noqa: E402
+
+
+class FakeNLP:
+    """Whitespace tokeniser; lemma = token."""
+
+    def pipe(self, texts, batch_size=256, n_process=1):
+        for text in texts:
+            yield [SimpleNamespace(lemma_=w, is_alpha=w.isalpha(), is_stop=False) for w in text.split()]
+
+
+class StubEncoder:
+    """Stands in for `LazyEncoder`: separable vectors, no SentenceTransformer."""
+
+    def __init__(self, path, batch_size):
+        self.encoded = 0
+
+    def __call__(self, texts):
+        self.encoded += len(texts)
+        return np.array(
+            [[t.count("severe"), t.count("mild"), len(t) % 5, 1.0] for t in texts], dtype=np.float32
+        )
+
+
+class FrozenDatetime(real_datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return real_datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=tz)
+
+
+def _tag(i):
+    """Alpha-only per-row word (FakeNLP drops digits), so every row cleans to a distinct text."""
+    return "".join(chr(ord("a") + int(d)) for d in str(i))
+
+
+def _write_csv(path, rows=40):
+    lines = ["text,severity"]
+    for i in range(rows):
+        lines.append(f"severe chest pain case {_tag(i)},high" if i % 2 else f"mild cough case {_tag(i)},low")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_training_smoke(tmp_path, monkeypatch):
+    data = tmp_path / "triage.csv"
+    _write_csv(data)
+    monkeypatch.setattr(train_triage, "load_nlp", FakeNLP)
+    monkeypatch.setattr(train_triage, "LazyEncoder", StubEncoder)
+    monkeypatch.setattr(train_triage, "ensure_embedder", lambda path: None)
+    out = tmp_path / "artefacts"
+    argv = [
+        "train_triage.py",
+        "--data", str(data),
+        "--out", str(out),
+        "--embedder", str(tmp_path / "embedder"),
+        "--store", str(tmp_path / "store"),
+        "--chunksize", "7",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+    train_triage.main()
+
+    version = (out / "LATEST").read_text()
+    assert sorted(os.listdir(out / version)) == ["classifier.joblib", "codec.joblib", "manifest.json", "metrics.json"]
+    manifest = json.loads((out / version / "manifest.json").read_text())
+    assert manifest["version"] == version
+    assert manifest["data"]["rows"] == 40 and manifest["data"]["newly_embedded"] == 40
+    assert set(manifest["labels"]) == {"high", "low"}
+    assert json.loads((out / version / "metrics.json").read_text())["accuracy"] == 1.0
+
+    # Second run: every row comes from the embedding store.
+    train_triage.main()
+    latest = (out / "LATEST").read_text()
+    assert latest != version
+    assert json.loads((out / latest / "manifest.json").read_text())["data"]["newly_embedded"] == 0
+
+
+def test_same_timestamp_gets_distinct_versions(tmp_path, monkeypatch):
+    monkeypatch.setattr(train_triage, "datetime", FrozenDatetime)
+    codec = train_triage.EmbeddingCodec("float32", None)
+    paths = [train_triage.write_artefacts(str(tmp_path), {"clf": i}, codec, {}, {}) for i in range(3)]
+    versions = [os.path.basename(p) for p in paths]
+    assert versions == ["20260102T030405678901Z", "20260102T030405678901Z-1", "20260102T030405678901Z-2"]
+    assert (tmp_path / "LATEST").read_text() == versions[-1]
+    for v in versions:
+        assert json.loads((tmp_path / v / "manifest.json").read_text())["version"] == v
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".")]
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from triage_preprocess import Preprocessor, lemmas
+
+STOP_WORDS = {"i", "have", "a", "and", "my", "is"}
+
+
+class FakeNLP:
+    """Tokenises on whitespace; lemma = lower-cased token. Records what it is asked to process."""
+
+    def __init__(self):
+        self.processed: list[str] = []
+
+    def pipe(self, texts, batch_size=256, n_process=1):
+        for text in texts:
+            self.processed.append(text)
+            yield [
+                SimpleNamespace(lemma_=word, is_alpha=word.isalpha(), is_stop=word in STOP_WORDS)
+                for word in text.split()
+            ]
+
+
+def test_batch_preserves_order_and_cleans_text():
+    pre = Preprocessor(FakeNLP())
+    assert pre.batch(["I have a Headache", "fever and 39 chills"]) == ["headache", "fever chills"]
+    assert pre("My chest is sore") == "chest sore"
+
+
+def test_duplicates_in_a_batch_are_hits():
+    nlp = FakeNLP()
+    pre = Preprocessor(nlp)
+    out = pre.batch(["Fever", "fever", "cough", "FEVER"])
+    assert out == ["fever", "fever", "cough", "fever"]
+    assert nlp.processed == ["fever", "cough"]
+    assert (pre.hits, pre.misses) == (2, 2)
+
+    pre.batch(["cough", "rash", "rash"])
+    assert nlp.processed == ["fever", "cough", "rash"]
+    assert (pre.hits, pre.misses) == (4, 3)
+
+
+def test_lru_is_bounded_and_cache_can_be_disabled():
+    nlp = FakeNLP()
+    pre = Preprocessor(nlp, cache_size=2)
+    pre.batch(["ache", "burn", "cramp"])
+    pre.batch(["ache"])  # evicted, processed again
+    assert nlp.processed == ["ache", "burn", "cramp", "ache"]
+    assert len(pre._cache) == 2
+
+    uncached = Preprocessor(FakeNLP(), cache_size=0)
+    assert uncached.batch(["itch", "itch"]) == ["itch", "itch"]
+    assert uncached.batch(["itch"]) == ["itch"]
+    assert (uncached.hits, uncached.misses) == (1, 2)
+
+
+def test_trimmed_pipeline_matches_full_pipeline():
+    pytest.importorskip("spacy")
+    from triage_preprocess import load_nlp
+
+    try:
+        full, trimmed = load_nlp(trimmed=False), load_nlp()
+    except Exception as exc:  # model not installed and no network to download it
+        pytest.skip(f"spaCy model unavailable: {exc}")
+    assert not {"parser", "ner", "senter"} & set(trimmed.pipe_names)
+    texts = [
+        "I have had a severe headache and fever since yesterday",
+        "Chest pains when breathing, shortness of breath",
+        "My child is vomiting and has diarrhoea",
+        "Twisted my ankle running; it is swollen",
+    ]
+    assert [lemmas(trimmed(t.lower())) for t in texts] == [lemmas(full(t.lower())) for t in texts]